@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_TOLERANCE = 0.25
+
+
+def write_universe(path, size):
+    """Write a universe CSV file with ``size`` synthetic symbols."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Symbol"])
+        for i in range(size):
+            writer.writerow([f"S{i:06d}"])
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def timed_calls(module, name, latencies):
+    """Record the duration of every call to the coroutine ``module.name``."""
+    original = getattr(module, name)
+
+    async def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    setattr(module, name, timed)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+async def _end_to_end(size, workdir, seed):
+    import strong_business_tester
+    from database import DatabaseManager
+    from providers import SyntheticProvider
+
+    csv_file = os.path.join(workdir, f"universe_{size}.csv")
+    write_universe(csv_file, size)
+    args = strong_business_tester.parse_args(
+        [
+            "-c",
+            csv_file,
+            "--provider",
+            "synthetic",
+            "--seed",
+            str(seed),
+            "--db-path",
+            os.path.join(workdir, f"screen_{size}.db"),
+            "--rate-limit",
+            "0",
+        ]
+    )
+    db = DatabaseManager(
+        args.db_path,
+        batch_size=args.db_batch_size,
+        flush_interval=args.db_flush_ms / 1000,
+    )
+    provider = SyntheticProvider(seed=seed)
+    latencies = []
+
+    with timed_calls(strong_business_tester, "test_strong_buy", latencies):
+        start = time.perf_counter()
+        strong_businesses = await strong_business_tester.screen(
+            args, db=db, provider=provider
+        )
+        elapsed = time.perf_counter() - start
+
+    return {
+        "symbols": size,
+        "seconds": elapsed,
+        "symbols_per_sec": size / elapsed,
+        "p50_latency_ms": percentile(latencies, 50) * 1000,
+        "p99_latency_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb(),
+        "db_transactions": db.commits,
+        "provider_requests": provider.requests,
+        "strong_businesses": len(strong_businesses),
+    }
+
+
+def run_end_to_end(size, workdir, seed=0):
+    """Screen a synthetic universe of ``size`` symbols end to end."""
+    logging.getLogger().setLevel(logging.WARNING)
+    return asyncio.run(_end_to_end(size, workdir, seed))
+
+
+async def _database_benchmarks(workdir, size):
+    from database import DatabaseManager
+
+    results = {}
+    symbols = [f"S{i:06d}" for i in range(size)]
+    now = datetime.now()
+
+    db_path = os.path.join(workdir, "unbuffered.db")
+    count = min(size, 1000)
+    async with DatabaseManager(db_path) as db:
+        start = time.perf_counter()
+        for symbol in symbols[:count]:
+            await db.insert_data(symbol, now)
+        elapsed = time.perf_counter() - start
+    results["db_insert_unbuffered"] = {
+        "rows_per_sec": count / elapsed,
+        "db_transactions": db.commits,
+    }
+
+    db_path = os.path.join(workdir, "buffered.db")
+    async with DatabaseManager(db_path, batch_size=500) as db:
+        start = time.perf_counter()
+        for symbol in symbols:
+            await db.insert_data(symbol, now)
+        await db.flush()
+        elapsed = time.perf_counter() - start
+        results["db_insert_buffered"] = {
+            "rows_per_sec": size / elapsed,
+            "db_transactions": db.commits,
+        }
+
+        start = time.perf_counter()
+        await db.stale_symbols(symbols + [f"N{i:06d}" for i in range(size)], 180)
+        results["db_stale_symbols"] = {"seconds": time.perf_counter() - start}
+
+    csv_file = os.path.join(workdir, "refresh.csv")
+    write_universe(csv_file, size)
+    start = time.perf_counter()
+    await DatabaseManager.refresh(csv_file, db_path)
+    elapsed = time.perf_counter() - start
+    results["db_refresh"] = {"seconds": elapsed, "rows_per_sec": size / elapsed}
+    return results
+
+
+def _metrics_benchmarks(size):
+    import metrics
+    import strong_business_tester
+    from financial_series import project
+    from providers import SyntheticProvider
+
+    provider = SyntheticProvider()
+    symbols = [f"S{i:06d}" for i in range(size)]
+    cash_flow = project(provider.cash_flow(symbols))
+    balance_sheet = project(provider.balance_sheet(symbols))
+    quarterly = project(provider.balance_sheet(symbols, frequency="Quarterly"))
+
+    start = time.perf_counter()
+    metrics.compute_metrics(cash_flow, balance_sheet, quarterly)
+    elapsed = time.perf_counter() - start
+    results = {"metrics_vectorized": {"symbols_per_sec": size / elapsed}}
+
+    # The per-symbol predicates on pre-fetched data, as used by the screener
+    count = min(size, 1000)
+    batch = strong_business_tester.TickerBatch(symbols[:count], provider=provider)
+    batch.fetch("cash_flow", "Annual")
+    batch.fetch("balance_sheet", "Annual")
+    batch.fetch("balance_sheet", "Quarterly")
+    start = time.perf_counter()
+    for symbol in symbols[:count]:
+        view = batch.view(symbol)
+        strong_business_tester.has_good_return_on_equity(view, 0.17)
+        strong_business_tester.has_consistently_low_debt_ratios(view, False)
+    elapsed = time.perf_counter() - start
+    results["metrics_per_symbol"] = {"symbols_per_sec": count / elapsed}
+    return results
+
+
+def run_micro(workdir, size=10000):
+    """Micro-benchmarks of DatabaseManager operations and metric computations."""
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(_database_benchmarks(workdir, size))
+    results.update(_metrics_benchmarks(size))
+    return results
+
+
+def _lower_is_better(metric):
+    return metric == "seconds" or metric.endswith(("_ms", "_mb", "transactions"))
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return a description of every metric in ``results`` that is more than
+    ``tolerance`` worse than in ``baseline``.
+    """
+    regressions = []
+    for name, values in results.items():
+        for metric, value in values.items():
+            base = baseline.get(name, {}).get(metric)
+            if not base or metric in ("symbols", "strong_businesses"):
+                continue
+            if metric.endswith("_per_sec"):
+                change = (base - value) / base
+            elif _lower_is_better(metric):
+                change = (value - base) / base
+            else:
+                continue
+            if change > tolerance:
+                regressions.append(
+                    f"{name}.{metric}: {value:.4g} vs baseline {base:.4g} "
+                    f"({change:.0%} worse)"
+                )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the screening pipeline against synthetic data."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=DEFAULT_SIZES,
+        help="Universe sizes for the end-to-end runs (default: 1000 10000 100000)",
+    )
+    parser.add_argument(
+        "--micro-size",
+        type=int,
+        default=10000,
+        help="Number of symbols used by the micro-benchmarks (default: 10000)",
+    )
+    parser.add_argument(
+        "--skip-micro", action="store_true", help="Only run end-to-end benchmarks"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="benchmark_results.json",
+        help="Path of the JSON results file (default: benchmark_results.json)",
+    )
+    parser.add_argument(
+        "--baseline", help="JSON results file to compare against for regressions"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative slowdown before a regression is reported",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    results = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Each size runs in a fresh process so peak RSS is measured per size
+        context = multiprocessing.get_context("spawn")
+        for size in args.sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[f"end_to_end_{size}"] = pool.submit(
+                    run_end_to_end, size, workdir
+                ).result()
+            logging.info(f"end_to_end_{size}: {results[f'end_to_end_{size}']}")
+
+        if not args.skip_micro:
+            results.update(run_micro(workdir, args.micro_size))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Wrote benchmark results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            logging.error(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
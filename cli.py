@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import importlib
+import logging
+import sys
+from logging.handlers import RotatingFileHandler
+
+# Command name: (module providing main(argv), log file, description). Only
+# the module of the chosen command is imported, so --help and the database
+# commands start without loading pandas or yahooquery.
+COMMANDS = {
+    "screen": (
+        "strong_business_tester",
+        "strong_business_tester.log",
+        "Screen the universe for strong businesses",
+    ),
+    "refresh": (
+        "database",
+        None,
+        "Forget the symbols of a CSV file so they are screened again",
+    ),
+    "sweep": (
+        "sweep",
+        None,
+        "Count the symbols passing a grid of ROE and volatility thresholds",
+    ),
+    "stats": ("stats", None, "Summarize the screening database"),
+    "export-snapshot": (
+        "snapshot",
+        None,
+        "Write cached fundamentals and metrics to a memory-mapped snapshot",
+    ),
+}
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def configure_logging(log_file=None, level=logging.INFO):
+    """
+    Log to the console and, when ``log_file`` is given, to that file as well,
+    keeping three earlier log files.
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(RotatingFileHandler(log_file, maxBytes=0, backupCount=3))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Screen stocks for strong businesses.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n"
+        + "\n".join(
+            f"  {name:<17}{description}"
+            for name, (_, _, description) in COMMANDS.items()
+        )
+        + "\n\nRun a command with --help to see its options.",
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Options of the command")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    module_name, log_file, _ = COMMANDS[args.command]
+    configure_logging(log_file)
+    module = importlib.import_module(module_name)
+    return module.main(args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
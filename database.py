@@ -3,93 +3,581 @@ import asyncio
 import logging
 import csv
 import argparse
+import json
 import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
 
 import aiosqlite
 
-# Set up basic logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+from instrumentation import registry
+
+# Connection tuning: WAL lets readers proceed while a write is in progress,
+# and NORMAL synchronous is durable across application crashes in WAL mode.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+# Version 1 stored tested_at as DATETIME text, version 2 as epoch seconds,
+# version 3 added the results table, version 4 the runs and jobs journal and
+# version 5 the realized volatility and max drawdown results
+SCHEMA_VERSION = 5
+# Columns of the rows read_results returns, after the symbol
+RESULT_COLUMNS = (
+    "roe",
+    "volatility",
+    "low",
+    "high",
+    "market",
+    "low_debt",
+    "realized_volatility",
+    "max_drawdown",
 )
+# Columns the volatility range of read_results may apply to
+VOLATILITY_COLUMNS = ("volatility", "realized_volatility")
+JOB_STATES = ("pending", "in_flight", "done", "failed")
+DAY = 24 * 60 * 60
+
+
+def to_epoch(value):
+    """
+    Convert a datetime, an ISO formatted string or a number to epoch seconds.
+    """
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(value)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp())
 
 
 class DatabaseManager:
-    def __init__(self, db_path="test.db", lock=None):
+    """
+    Async access to the stocks database.
+
+    One manager holds a single connection for its lifetime. Entering it again
+    while it is open reuses that connection, so a screening run can share one
+    manager across all symbols.
+
+    With ``batch_size`` set, writes are buffered and flushed with executemany
+    in a single transaction every ``batch_size`` rows, every ``flush_interval``
+    seconds and when the manager is closed. Reads flush pending writes first.
+    """
+
+    def __init__(
+        self, db_path="test.db", lock=None, batch_size=None, flush_interval=None
+    ):
         self.db_path = db_path
         self.conn = None
         self.lock = lock or asyncio.Lock()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.commits = 0
+        self._users = 0
+        self._pending = []
+        self._flusher = None
 
     async def __aenter__(self):
-        try:
-            self.conn = await aiosqlite.connect(self.db_path)
-            await self.create_table()
-        except aiosqlite.Error as e:
-            logging.error(f"Error connecting to database: {e}")
-            raise
+        self._users += 1
+        if self.conn is None:
+            try:
+                self.conn = await aiosqlite.connect(self.db_path)
+                for pragma in PRAGMAS:
+                    await self.conn.execute(pragma)
+                await self.create_table()
+            except aiosqlite.Error as e:
+                self._users -= 1
+                self.conn = None
+                logging.error(f"Error connecting to database: {e}")
+                raise
+            if self.batch_size and self.flush_interval:
+                self._flusher = asyncio.create_task(self._flush_periodically())
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        if self.conn:
+        self._users -= 1
+        if self.conn and self._users == 0:
             try:
+                if self._flusher:
+                    # Under the lock the flusher is sleeping or waiting for
+                    # the lock, never holding rows it took out of the buffer
+                    async with self._locked():
+                        self._flusher.cancel()
+                    await asyncio.gather(self._flusher, return_exceptions=True)
+                    self._flusher = None
+                await self.flush()
                 await self.conn.close()
             except aiosqlite.Error as e:
                 logging.error(f"Error closing database connection: {e}")
                 raise
+            finally:
+                self.conn = None
 
     async def create_table(self):
         try:
-            async with self.lock:
-                await self.conn.execute(
-                    """
-                    CREATE TABLE IF NOT EXISTS stocks
-                    (symbol TEXT PRIMARY KEY, 
-                    tested_at DATETIME NOT NULL)
-                """
-                )
-                await self.conn.commit()
+            async with self._locked():
+                cursor = await self.conn.execute("PRAGMA user_version")
+                version = (await cursor.fetchone())[0]
+                if version >= SCHEMA_VERSION:
+                    return
+
+                if version < 2:
+                    cursor = await self.conn.execute(
+                        "SELECT 1 FROM sqlite_master "
+                        "WHERE type='table' AND name='stocks'"
+                    )
+                    if await cursor.fetchone():
+                        await self._migrate_v1()
+                    else:
+                        await self._create_v2("stocks")
+                    await self.conn.execute(
+                        "CREATE INDEX IF NOT EXISTS stocks_tested_at "
+                        "ON stocks (tested_at)"
+                    )
+                if 3 <= version < 5:
+                    await self._migrate_v4()
+                await self._create_results()
+                await self._create_journal()
+                await self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                await self._commit()
         except aiosqlite.Error as e:
             logging.error(f"Error creating table: {e}")
             raise
 
+    async def _create_v2(self, name):
+        await self.conn.execute(
+            f"""
+            CREATE TABLE {name}
+            (symbol TEXT PRIMARY KEY,
+            tested_at INTEGER NOT NULL)
+        """
+        )
+
+    async def _create_results(self):
+        """
+        Raw screening metrics of every symbol; a metric is NULL when the
+        screener rejected the symbol before computing it.
+        """
+        await self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results
+            (symbol TEXT PRIMARY KEY,
+            screened_at INTEGER NOT NULL,
+            roe REAL,
+            volatility REAL,
+            low REAL,
+            high REAL,
+            market TEXT,
+            low_debt INTEGER,
+            realized_volatility REAL,
+            max_drawdown REAL)
+        """
+        )
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_roe ON results (roe, volatility)"
+        )
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_volatility ON results (volatility)"
+        )
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_realized_volatility "
+            "ON results (realized_volatility)"
+        )
+
+    async def _create_journal(self):
+        """
+        Screening runs and the state of every symbol in them, so an
+        interrupted run can be resumed.
+        """
+        await self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS runs
+            (run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at INTEGER NOT NULL,
+            finished_at INTEGER,
+            options TEXT)
+        """
+        )
+        await self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs
+            (run_id INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (run_id, symbol))
+        """
+        )
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_state ON jobs (run_id, state)"
+        )
+
+    async def _migrate_v1(self):
+        """Convert the DATETIME text tested_at column to epoch seconds."""
+        cursor = await self.conn.execute("SELECT symbol, tested_at FROM stocks")
+        rows = []
+        for symbol, tested_at in await cursor.fetchall():
+            try:
+                rows.append((symbol, to_epoch(tested_at)))
+            except (TypeError, ValueError):
+                # The symbol is simply screened again
+                logging.warning(f"Dropping {symbol} with unreadable tested_at")
+
+        await self._create_v2("stocks_v2")
+        await self.conn.executemany("INSERT INTO stocks_v2 VALUES (?, ?)", rows)
+        await self.conn.execute("DROP TABLE stocks")
+        await self.conn.execute("ALTER TABLE stocks_v2 RENAME TO stocks")
+        logging.info(f"Migrated {len(rows)} stocks rows to schema v{SCHEMA_VERSION}")
+
+    async def _migrate_v4(self):
+        """Add the realized volatility and max drawdown columns to results."""
+        for column in ("realized_volatility", "max_drawdown"):
+            await self.conn.execute(f"ALTER TABLE results ADD COLUMN {column} REAL")
+        logging.info(f"Migrated the results table to schema v{SCHEMA_VERSION}")
+
+    @asynccontextmanager
+    async def _locked(self):
+        """Hold the write lock, recording how long it took to acquire."""
+        start = time.perf_counter()
+        async with self.lock:
+            registry.observe("db_lock_wait", time.perf_counter() - start)
+            yield
+
+    async def _commit(self):
+        await self.conn.commit()
+        self.commits += 1
+        registry.increment("db_transactions")
+
+    async def _write(self, sql, params):
+        """Run a write now, or queue it when writes are buffered."""
+        if self.batch_size:
+            self._pending.append((sql, params))
+            # Writers do not queue up behind a flush that is already running;
+            # it or the next one picks up their rows
+            if len(self._pending) >= self.batch_size and not self.lock.locked():
+                await self.flush()
+            return False
+
+        async with self._locked():
+            await self.conn.execute(sql, params)
+            await self._commit()
+        return True
+
+    async def flush(self):
+        """Write all buffered rows in one transaction."""
+        if not self._pending:
+            return
+        async with self._locked():
+            # Another flush may have written everything while this one waited
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            # Consecutive writes of the same statement share one executemany
+            groups = []
+            for sql, params in pending:
+                if groups and groups[-1][0] == sql:
+                    groups[-1][1].append(params)
+                else:
+                    groups.append((sql, [params]))
+            try:
+                with registry.timer("db_flush"):
+                    for sql, rows in groups:
+                        await self.conn.executemany(sql, rows)
+                    await self._commit()
+            except BaseException as e:
+                # Keep the rows so the next flush retries them, also when the
+                # flush was cancelled part way
+                self._pending[:0] = pending
+                if isinstance(e, aiosqlite.Error):
+                    logging.error(f"Error flushing buffered writes: {e}")
+                await self.conn.rollback()
+                raise
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except aiosqlite.Error:
+                # Already logged; the rows are retried on the next flush
+                pass
+
     async def insert_data(self, symbol, tested_at):
         try:
-            async with self.lock:
-                await self.conn.execute(
-                    "INSERT INTO stocks VALUES (?, ?)", (symbol, tested_at)
-                )
-                await self.conn.commit()
-        except aiosqlite.IntegrityError:
-            logging.warning(f"Record with symbol {symbol} already exists.")
+            await self._write(
+                """
+                INSERT INTO stocks VALUES (?, ?)
+                ON CONFLICT (symbol) DO UPDATE SET tested_at = excluded.tested_at
+                """,
+                (symbol, to_epoch(tested_at)),
+            )
         except aiosqlite.Error as e:
             logging.error(f"Error inserting data: {e}")
             raise
 
     async def update_data(self, symbol, tested_at):
         try:
-            async with self.lock:
-                await self.conn.execute(
-                    "UPDATE stocks SET tested_at = ? WHERE symbol = ?",
-                    (tested_at, symbol),
-                )
-                await self.conn.commit()
+            await self._write(
+                "UPDATE stocks SET tested_at = ? WHERE symbol = ?",
+                (to_epoch(tested_at), symbol),
+            )
         except aiosqlite.Error as e:
             logging.error(f"Error updating data: {e}")
             raise
 
     async def delete_data(self, symbol):
         try:
-            async with self.lock:
-                await self.conn.execute(
-                    "DELETE FROM stocks WHERE symbol = ?", (symbol,)
-                )
-                await self.conn.commit()
+            if await self._write("DELETE FROM stocks WHERE symbol = ?", (symbol,)):
                 logging.info(f"Deleted {symbol}")
         except aiosqlite.Error as e:
             logging.error(f"Error deleting data: {e}")
             raise
 
+    async def insert_result(
+        self,
+        symbol,
+        screened_at,
+        roe=None,
+        volatility=None,
+        low=None,
+        high=None,
+        market=None,
+        low_debt=None,
+        realized_volatility=None,
+        max_drawdown=None,
+    ):
+        """Store the screening metrics of a symbol, replacing earlier ones."""
+        columns = ("symbol", "screened_at") + RESULT_COLUMNS
+        try:
+            await self._write(
+                f"INSERT OR REPLACE INTO results ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                (
+                    symbol,
+                    to_epoch(screened_at),
+                    roe,
+                    volatility,
+                    low,
+                    high,
+                    market,
+                    None if low_debt is None else int(low_debt),
+                    realized_volatility,
+                    max_drawdown,
+                ),
+            )
+        except aiosqlite.Error as e:
+            logging.error(f"Error inserting result: {e}")
+            raise
+
+    async def read_results(
+        self,
+        roe_range=None,
+        volatility_range=None,
+        low_debt=None,
+        volatility_column="volatility",
+    ):
+        """
+        Return rows of the symbol and the RESULT_COLUMNS of the results table,
+        optionally only those with ROE and volatility in the given inclusive
+        (min, max) ranges and the given low_debt flag. Either bound of a range
+        may be None. The volatility range applies to ``volatility_column``,
+        one of VOLATILITY_COLUMNS.
+        """
+        if volatility_column not in VOLATILITY_COLUMNS:
+            raise ValueError(f"Unknown volatility column {volatility_column!r}")
+        conditions = []
+        params = []
+        for column, bounds in [
+            ("roe", roe_range),
+            (volatility_column, volatility_range),
+        ]:
+            low, high = bounds or (None, None)
+            if low is not None:
+                conditions.append(f"{column} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"{column} <= ?")
+                params.append(high)
+        if low_debt is not None:
+            conditions.append("low_debt = ?")
+            params.append(int(low_debt))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            await self.flush()
+            cursor = await self.conn.execute(
+                f"SELECT symbol, {', '.join(RESULT_COLUMNS)} "
+                f"FROM results {where} ORDER BY roe DESC",
+                params,
+            )
+            return await cursor.fetchall()
+        except aiosqlite.Error as e:
+            logging.error(f"Error reading results: {e}")
+            raise
+
+    async def start_run(self, options):
+        """Record a new run with its options (a JSON-able dict); return its id."""
+        try:
+            await self.flush()
+            async with self._locked():
+                cursor = await self.conn.execute(
+                    "INSERT INTO runs (started_at, options) VALUES (?, ?)",
+                    (int(time.time()), json.dumps(options)),
+                )
+                await self._commit()
+                return cursor.lastrowid
+        except aiosqlite.Error as e:
+            logging.error(f"Error starting run: {e}")
+            raise
+
+    async def finish_run(self, run_id):
+        try:
+            await self._write(
+                "UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                (int(time.time()), run_id),
+            )
+        except aiosqlite.Error as e:
+            logging.error(f"Error finishing run: {e}")
+            raise
+
+    async def unfinished_run(self):
+        """Return (run_id, options) of the latest unfinished run, or None."""
+        try:
+            await self.flush()
+            cursor = await self.conn.execute(
+                """
+                SELECT run_id, options FROM runs WHERE finished_at IS NULL
+                ORDER BY run_id DESC LIMIT 1
+                """
+            )
+            row = await cursor.fetchone()
+            return (row[0], json.loads(row[1] or "{}")) if row else None
+        except aiosqlite.Error as e:
+            logging.error(f"Error reading runs: {e}")
+            raise
+
+    async def set_job_state(self, run_id, symbol, state, error=None):
+        """
+        Record the state of a symbol in a run. Moving to in_flight counts an
+        attempt.
+        """
+        if state not in JOB_STATES:
+            raise ValueError(f"Unknown job state: {state}")
+        try:
+            await self._write(
+                """
+                INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, symbol) DO UPDATE SET
+                state = excluded.state,
+                attempts = attempts + excluded.attempts,
+                error = excluded.error,
+                updated_at = excluded.updated_at
+                """,
+                (
+                    run_id,
+                    symbol,
+                    state,
+                    int(state == "in_flight"),
+                    error,
+                    int(time.time()),
+                ),
+            )
+        except aiosqlite.Error as e:
+            logging.error(f"Error updating job: {e}")
+            raise
+
+    async def read_jobs(self, run_id, states=None):
+        """Return (symbol, state, attempts, error) rows of a run's jobs."""
+        try:
+            await self.flush()
+            sql = "SELECT symbol, state, attempts, error FROM jobs WHERE run_id = ?"
+            params = [run_id]
+            if states:
+                sql += f" AND state IN ({', '.join('?' * len(states))})"
+                params += list(states)
+            cursor = await self.conn.execute(sql + " ORDER BY symbol", params)
+            return await cursor.fetchall()
+        except aiosqlite.Error as e:
+            logging.error(f"Error reading jobs: {e}")
+            raise
+
+    async def job_counts(self, run_id):
+        """Number of a run's symbols in each state."""
+        try:
+            await self.flush()
+            cursor = await self.conn.execute(
+                "SELECT state, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY state",
+                (run_id,),
+            )
+            return dict(await cursor.fetchall())
+        except aiosqlite.Error as e:
+            logging.error(f"Error reading jobs: {e}")
+            raise
+
+    async def summary(self, now=None):
+        """
+        Counts describing the database: symbols tested in all and within the
+        last day, stored results and strong businesses among them, runs and
+        the job states of the latest one.
+        """
+        now = time.time() if now is None else to_epoch(now)
+        try:
+            await self.flush()
+            cursor = await self.conn.execute(
+                """
+                SELECT COUNT(*), COUNT(CASE WHEN tested_at > ? THEN 1 END)
+                FROM stocks
+                """,
+                (now - DAY,),
+            )
+            symbols, recent = await cursor.fetchone()
+            # Only strong businesses get as far as their market
+            cursor = await self.conn.execute(
+                "SELECT COUNT(*), COUNT(market) FROM results"
+            )
+            results, strong = await cursor.fetchone()
+            cursor = await self.conn.execute(
+                """
+                SELECT run_id, started_at, finished_at FROM runs
+                ORDER BY run_id DESC
+                """
+            )
+            runs = await cursor.fetchall()
+        except aiosqlite.Error as e:
+            logging.error(f"Error reading summary: {e}")
+            raise
+
+        latest_run = None
+        if runs:
+            run_id, started_at, finished_at = runs[0]
+            latest_run = {
+                "run_id": run_id,
+                "started_at": started_at,
+                "finished_at": finished_at,
+                "jobs": await self.job_counts(run_id),
+            }
+        return {
+            "symbols": symbols,
+            "tested_last_day": recent,
+            "results": results,
+            "strong_businesses": strong,
+            "runs": len(runs),
+            "unfinished_runs": sum(run[2] is None for run in runs),
+            "latest_run": latest_run,
+        }
+
     async def read_data(self, symbol=None):
         try:
+            await self.flush()
             cursor = await self.conn.cursor()
             if symbol:
                 await cursor.execute("SELECT * FROM stocks WHERE symbol = ?", (symbol,))
@@ -101,17 +589,94 @@ class DatabaseManager:
             logging.error(f"Error reading data: {e}")
             raise
 
+    async def _load_symbol_set(self, symbols):
+        """
+        Load symbols into a temporary table for set-based queries. Callers
+        must hold the lock while they use the table.
+        """
+        await self.conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS symbol_set (symbol TEXT PRIMARY KEY)"
+        )
+        await self.conn.execute("DELETE FROM symbol_set")
+        await self.conn.executemany(
+            "INSERT OR IGNORE INTO symbol_set VALUES (?)",
+            ((symbol,) for symbol in symbols),
+        )
+
+    async def delete_symbols(self, symbols, dry_run=False):
+        """
+        Delete every given symbol in one transaction and return the set of
+        symbols that were present. With dry_run nothing is deleted.
+        """
+        await self.flush()
+        try:
+            async with self._locked():
+                await self._load_symbol_set(symbols)
+                cursor = await self.conn.execute(
+                    "SELECT symbol FROM stocks WHERE symbol IN symbol_set"
+                )
+                affected = {row[0] for row in await cursor.fetchall()}
+                if not dry_run:
+                    await self.conn.execute(
+                        "DELETE FROM stocks WHERE symbol IN symbol_set"
+                    )
+                await self.conn.execute("DELETE FROM symbol_set")
+                await self._commit()
+                return affected
+        except aiosqlite.Error as e:
+            logging.error(f"Error deleting data: {e}")
+            raise
+
+    async def stale_symbols(self, symbols, interval_days, now=None, run_id=None):
+        """
+        Return the subset of symbols that have not been tested within the last
+        ``interval_days`` days, using a single query. With ``run_id``, symbols
+        whose job in that run is done are left out too, whatever the interval.
+        """
+        now = time.time() if now is None else to_epoch(now)
+        await self.flush()
+        try:
+            async with self._locked():
+                await self._load_symbol_set(symbols)
+                cursor = await self.conn.execute(
+                    """
+                    SELECT symbol FROM symbol_set
+                    WHERE symbol NOT IN
+                    (SELECT symbol FROM stocks WHERE tested_at > ?)
+                    AND symbol NOT IN
+                    (SELECT symbol FROM jobs WHERE run_id = ? AND state = 'done')
+                    """,
+                    (now - interval_days * DAY, run_id),
+                )
+                stale = {row[0] for row in await cursor.fetchall()}
+                await self.conn.execute("DELETE FROM symbol_set")
+                await self._commit()
+                return stale
+        except aiosqlite.Error as e:
+            logging.error(f"Error reading data: {e}")
+            raise
+
     @classmethod
-    async def refresh(cls, csv_file="Results.csv", db_path="test.db"):
+    async def refresh(cls, csv_file="Results.csv", db_path="test.db", dry_run=False):
+        """
+        Delete every symbol listed in the CSV file and return the set of
+        symbols that were in the database.
+        """
         # Expand user path (e.g., ~/Downloads/Results.csv -> /Users/username/Downloads/Results.csv)
         csv_file = os.path.expanduser(csv_file)
 
+        with open(csv_file, newline="", encoding="utf-8-sig") as csvfile:
+            reader = csv.DictReader(csvfile)
+            symbols = {row["Symbol"].strip() for row in reader}
+
         async with cls(db_path) as db:
-            with open(csv_file, newline="", encoding="utf-8-sig") as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    symbol = row["Symbol"].strip()
-                    await db.delete_data(symbol)
+            affected = await db.delete_symbols(symbols, dry_run=dry_run)
+
+        if dry_run:
+            logging.info(f"Would delete {len(affected)} symbols: {sorted(affected)}")
+        else:
+            logging.info(f"Deleted {len(affected)} symbols")
+        return affected
 
 
 async def test_run():
@@ -124,7 +689,7 @@ async def test_run():
         logging.info(await db.read_data())
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(
         description="Database management for stock symbols."
     )
@@ -134,13 +699,27 @@ def parse_args():
         default="Results.csv",
         help="Path to the input CSV file (default: Results.csv)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--db-path",
+        default="test.db",
+        help="Path to the SQLite database (default: test.db)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the symbols that would be deleted without deleting them",
+    )
+    return parser.parse_args(argv)
 
 
-def main():
-    args = parse_args()
-    asyncio.run(DatabaseManager.refresh(args.csv_file))
+def main(argv=None):
+    args = parse_args(argv)
+    asyncio.run(
+        DatabaseManager.refresh(args.csv_file, args.db_path, dry_run=args.dry_run)
+    )
 
 
 if __name__ == "__main__":
-    main()
+    import cli
+
+    sys.exit(cli.main(["refresh", *sys.argv[1:]]))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+import numpy as np
+import pandas as pd
+
+# The statement fields the screener reads; every other column is dropped
+FIELDS = ("FreeCashFlow", "CommonStockEquity", "TotalDebt")
+
+
+class FinancialSeries:
+    """
+    One symbol's financial statement, reduced to its period end dates and the
+    FIELDS it has.
+
+    ``values`` is a float array with one row per name in ``columns`` and one
+    column per period, NaN where a value is missing. Supports the parts of a
+    statement DataFrame the screening checks use: ``columns``, ``empty``,
+    ``len`` and access to a field's values by name.
+    """
+
+    __slots__ = ("symbol", "dates", "values", "columns")
+
+    def __init__(self, symbol, dates, values, columns):
+        self.symbol = symbol
+        self.dates = dates
+        self.values = values
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, frame, fields=FIELDS):
+        """The series of a single-symbol statement frame, or None if it is empty."""
+        series = project(frame, fields)
+        return next(iter(series.values()), None)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __getitem__(self, field):
+        try:
+            return self.values[self.columns.index(field)]
+        except ValueError:
+            raise KeyError(field) from None
+
+    def __repr__(self):
+        return (
+            f"FinancialSeries({self.symbol!r}, {len(self)} periods, "
+            f"columns={self.columns})"
+        )
+
+    # The reductions below treat the series as the single segment of the
+    # many-symbol ones, so a symbol's checks and metrics.compute_metrics agree
+
+    def mean(self, field):
+        """Average of a field ignoring NaN, or 0 when it has no value."""
+        return float(segment_averages(self[field], np.array([0, len(self)]))[0])
+
+    def debt_equity_ratios(self):
+        """TotalDebt / CommonStockEquity for every period."""
+        return debt_equity_ratios(self["TotalDebt"], self["CommonStockEquity"])
+
+    def max_debt_equity(self):
+        """Largest debt-to-equity ratio ignoring NaN, or NaN if there is none."""
+        return float(
+            segment_maxima(self.debt_equity_ratios(), np.array([0, len(self)]))[0]
+        )
+
+
+def _reduce_segments(ufunc, values, offsets):
+    """
+    ufunc reduced over each segment ``values[offsets[i]:offsets[i + 1]]`` of
+    a concatenated array, NaN for empty segments.
+    """
+    starts = offsets[:-1]
+    nonempty = offsets[1:] > starts
+    if len(starts) and nonempty.all():
+        return ufunc.reduceat(values, starts)
+    # reduceat gives an empty segment the value at its start, so they are skipped
+    result = np.full(len(starts), np.nan)
+    if nonempty.any():
+        result[nonempty] = ufunc.reduceat(values, starts[nonempty])
+    return result
+
+
+def segment_averages(values, offsets):
+    """Average of each segment ignoring NaN, or 0 for one without values."""
+    present = ~np.isnan(values)
+    totals = _reduce_segments(np.add, np.where(present, values, 0), offsets)
+    counts = _reduce_segments(np.add, present.astype(float), offsets)
+    return np.divide(totals, counts, out=np.zeros(len(totals)), where=counts > 0)
+
+
+def segment_maxima(values, offsets):
+    """Largest value of each segment ignoring NaN, or NaN if there is none."""
+    return _reduce_segments(np.fmax, values, offsets)
+
+
+def debt_equity_ratios(total_debt, equity):
+    """TotalDebt / CommonStockEquity; zero equity gives inf, like pandas."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return total_debt / equity
+
+
+def _symbols(frame):
+    """Each row's symbol, from the column or index yahooquery puts it in."""
+    if "symbol" in frame.columns:
+        return frame["symbol"].to_numpy()
+    if frame.index.name == "symbol":
+        return frame.index.to_numpy()
+    # Single-symbol data without a symbol label
+    return np.full(len(frame), "", dtype=object)
+
+
+class Statement(dict):
+    """
+    The FinancialSeries of a projected statement by symbol, along with the
+    arrays they are views of: each symbol's row ``offsets`` into the
+    ``dates`` and the (``columns`` x rows) ``field_values``. Treat it as
+    read-only; the arrays do not follow changes to the dict.
+    """
+
+    def __init__(self, series, offsets, dates, field_values, columns):
+        super().__init__(series)
+        self.offsets = offsets
+        self.dates = dates
+        self.field_values = field_values
+        self.columns = columns
+
+
+def project(frame, fields=FIELDS):
+    """
+    Project a statement frame into a FinancialSeries per symbol, in one pass
+    over the frame. Only the dates and the given fields are kept; the
+    per-symbol series share two arrays holding the whole response, and the
+    returned Statement keeps them for reductions over all symbols at once.
+    """
+    codes, symbols = pd.factorize(_symbols(frame))
+    # Group the rows by symbol, keeping their order within each symbol
+    order = np.argsort(codes, kind="stable")
+    # Rows without a symbol are dropped
+    order = order[codes[order] >= 0]
+    ends = np.cumsum(np.bincount(codes[order], minlength=len(symbols)))
+
+    if "asOfDate" in frame.columns:
+        dates = pd.to_datetime(frame["asOfDate"], errors="coerce", format="mixed")
+        dates = dates.to_numpy(dtype="datetime64[D]")[order]
+    else:
+        dates = np.full(len(order), np.datetime64("NaT", "D"))
+    columns = tuple(field for field in fields if field in frame.columns)
+    values = np.empty((len(columns), len(order)))
+    for row, field in enumerate(columns):
+        values[row] = pd.to_numeric(frame[field], errors="coerce").to_numpy(
+            dtype=float, na_value=np.nan
+        )[order]
+
+    offsets = np.concatenate([[0], ends]).astype(np.int64)
+    series = {
+        symbol: FinancialSeries(symbol, dates[start:end], values[:, start:end], columns)
+        for symbol, start, end in zip(symbols, offsets[:-1], offsets[1:])
+    }
+    return Statement(series, offsets, dates, values, columns)
+
+
+def concatenate(series, symbols=None, fields=FIELDS):
+    """
+    The columnar arrays of many symbols' FinancialSeries, the reverse of
+    project: each symbol's row offsets, the period dates and a (columns x
+    rows) value array, where the columns are those of ``fields`` any series
+    has. Symbols follow ``symbols`` (default: the order of ``series``);
+    symbols without a series get no rows and missing fields are NaN.
+    """
+    if isinstance(series, Statement) and symbols is None:
+        # Already columnar
+        columns = [field for field in fields if field in series.columns]
+        rows = [series.columns.index(column) for column in columns]
+        return series.offsets, series.dates, series.field_values[rows], columns
+
+    symbols = list(series) if symbols is None else symbols
+    parts = [series.get(symbol) for symbol in symbols]
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(part) if part else 0 for part in parts])
+    parts = [part for part in parts if part]
+
+    layouts = {part.columns for part in parts}
+    columns = [field for field in fields if any(field in layout for layout in layouts)]
+    dates = np.concatenate([np.empty(0, "datetime64[D]")] + [p.dates for p in parts])
+    if len(layouts) == 1:
+        # Series projected from the same responses share one layout
+        (layout,) = layouts
+        values = np.concatenate([part.values for part in parts], axis=1)
+        return offsets, dates, values[[layout.index(c) for c in columns]], columns
+
+    values = np.empty((len(columns), offsets[-1]))
+    for row, column in enumerate(columns):
+        values[row] = np.concatenate(
+            [
+                part[column] if column in part.columns else np.full(len(part), np.nan)
+                for part in parts
+            ]
+        )
+    return offsets, dates, values, columns
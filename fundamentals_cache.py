@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+
+DAY = 24 * 60 * 60
+
+# How long each data type stays fresh. Annual fundamentals only change a few
+# times a year, quotes change daily.
+DEFAULT_TTLS = {
+    "summary_detail": 1 * DAY,
+    "price": 1 * DAY,
+    "history": 1 * DAY,
+    "cash_flow": 30 * DAY,
+    "balance_sheet": 30 * DAY,
+}
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class NotCached(LookupError):
+    """Stands for data a cache-only run has no cached response for."""
+
+
+class FundamentalsCache:
+    """
+    On-disk cache of per-symbol Yahoo responses, keyed by
+    (symbol, data_type, frequency), with per-data-type TTLs and an LRU size cap.
+
+    The cache lives in a ``fundamentals`` table next to ``stocks``. It uses the
+    synchronous sqlite3 module because it is called from the blocking fetch
+    code, possibly from several threads at once.
+    """
+
+    def __init__(
+        self,
+        db_path="test.db",
+        ttls=None,
+        max_bytes=DEFAULT_MAX_BYTES,
+        cache_only=False,
+        refresh=False,
+    ):
+        self.db_path = db_path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.create_table()
+        self._size = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM fundamentals"
+        ).fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def create_table(self):
+        with self._lock:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fundamentals
+                (symbol TEXT NOT NULL,
+                data_type TEXT NOT NULL,
+                frequency TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (symbol, data_type, frequency))
+            """
+            )
+            self.conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS fundamentals_accessed_at
+                ON fundamentals (accessed_at)
+            """
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def get(self, symbol, data_type, frequency=None):
+        """
+        Return ``(hit, value)`` for a cached response that is still fresh.
+        """
+        if self.refresh:
+            self.misses += 1
+            return False, None
+
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                """
+                SELECT payload, fetched_at FROM fundamentals
+                WHERE symbol = ? AND data_type = ? AND frequency = ?
+                """,
+                (symbol, data_type, frequency or ""),
+            ).fetchone()
+            # Offline runs accept anything that was ever cached
+            if row is None or (
+                not self.cache_only and now - row[1] > self.ttls.get(data_type, DAY)
+            ):
+                self.misses += 1
+                return False, None
+
+            self.conn.execute(
+                """
+                UPDATE fundamentals SET accessed_at = ?
+                WHERE symbol = ? AND data_type = ? AND frequency = ?
+                """,
+                (now, symbol, data_type, frequency or ""),
+            )
+            self.conn.commit()
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def put_many(self, data_type, frequency, values):
+        """
+        Store a mapping of symbol to response in one transaction.
+        """
+        if not values:
+            return
+        now = time.time()
+        rows = []
+        for symbol, value in values.items():
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append(
+                (symbol, data_type, frequency or "", payload, len(payload), now, now)
+            )
+
+        with self._lock:
+            placeholders = ", ".join("?" for _ in rows)
+            old_size = self.conn.execute(
+                f"""
+                SELECT COALESCE(SUM(size), 0) FROM fundamentals
+                WHERE data_type = ? AND frequency = ? AND symbol IN ({placeholders})
+                """,
+                (data_type, frequency or "", *(row[0] for row in rows)),
+            ).fetchone()[0]
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._size += sum(row[4] for row in rows) - old_size
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap."""
+        if self._size <= self.max_bytes:
+            return
+        excess = self._size - self.max_bytes
+        freed = 0
+        victims = []
+        cursor = self.conn.execute(
+            """
+            SELECT symbol, data_type, frequency, size FROM fundamentals
+            ORDER BY accessed_at
+            """
+        )
+        for symbol, data_type, frequency, size in cursor:
+            victims.append((symbol, data_type, frequency))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany(
+            """
+            DELETE FROM fundamentals
+            WHERE symbol = ? AND data_type = ? AND frequency = ?
+            """,
+            victims,
+        )
+        self._size -= freed
+        logging.info(f"Evicted {len(victims)} cached responses ({freed} bytes)")
+
+    @property
+    def size(self):
+        return self._size
+
+    def entries(self):
+        """Number of cached responses."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM fundamentals").fetchone()[0]
+
+    def items(self, data_type, frequency=None):
+        """
+        Every cached response of a data type as ``(symbol, value)`` pairs in
+        symbol order, fresh or not. Entries are not marked as accessed.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT symbol, payload FROM fundamentals
+                WHERE data_type = ? AND frequency = ? ORDER BY symbol
+                """,
+                (data_type, frequency or ""),
+            ).fetchall()
+        return [(symbol, pickle.loads(payload)) for symbol, payload in rows]
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds of the timer histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60)
+
+
+class Metrics:
+    """
+    Thread-safe registry of stage timers and event counters for one run.
+
+    Timers keep a count, sum, max and cumulative histogram of durations, and
+    can be written out as JSON or in the Prometheus text format.
+    """
+
+    def __init__(self, prefix="stock"):
+        self.prefix = prefix
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "max": 0.0,
+                    "buckets": [0] * len(BUCKETS),
+                }
+            timer["count"] += 1
+            timer["sum"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    timer["buckets"][i] += 1
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block; works in coroutines and threads alike."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def merge(self, snapshot):
+        """Add the timers and counters of another registry's snapshot."""
+        with self._lock:
+            for name, other in snapshot["timers"].items():
+                timer = self.timers.setdefault(
+                    name,
+                    {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)},
+                )
+                timer["count"] += other["count"]
+                timer["sum"] += other["sum_seconds"]
+                timer["max"] = max(timer["max"], other["max_seconds"])
+                for i, count in enumerate(other["buckets"].values()):
+                    timer["buckets"][i] += count
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timers": {
+                    name: {
+                        "count": timer["count"],
+                        "sum_seconds": timer["sum"],
+                        "max_seconds": timer["max"],
+                        "mean_seconds": timer["sum"] / timer["count"],
+                        "buckets": dict(zip(map(str, BUCKETS), timer["buckets"])),
+                    }
+                    for name, timer in sorted(self.timers.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        snapshot = self.snapshot()
+        name = f"{self.prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each screening stage.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, timer in snapshot["timers"].items():
+            for bound, count in timer["buckets"].items():
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {timer["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {timer["sum_seconds"]}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {timer["count"]}')
+
+        name = f"{self.prefix}_stage_max_seconds"
+        lines += [
+            f"# HELP {name} Longest single duration of each screening stage.",
+            f"# TYPE {name} gauge",
+        ]
+        for stage, timer in snapshot["timers"].items():
+            lines.append(f'{name}{{stage="{stage}"}} {timer["max_seconds"]}')
+
+        name = f"{self.prefix}_events_total"
+        lines += [
+            f"# HELP {name} Number of events counted during the run.",
+            f"# TYPE {name} counter",
+        ]
+        for event, value in snapshot["counters"].items():
+            lines.append(f'{name}{{event="{event}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write ``<path>.json`` and ``<path>.prom``; a .json or .prom extension
+        on path is ignored.
+        """
+        base, extension = os.path.splitext(path)
+        if extension not in (".json", ".prom"):
+            base = path
+        with open(f"{base}.json", "w") as f:
+            f.write(self.to_json())
+        with open(f"{base}.prom", "w") as f:
+            f.write(self.to_prometheus())
+        logging.info(f"Wrote run metrics to {base}.json and {base}.prom")
+
+
+class StallDetector:
+    """
+    Detect event loop stalls: a task that should wake up every ``interval``
+    seconds records every wake-up that is late by more than ``threshold``.
+    """
+
+    def __init__(self, metrics, threshold=0.1, interval=0.05):
+        self.metrics = metrics
+        self.threshold = threshold
+        self.interval = interval
+        self._task = None
+
+    async def _watch(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - start - self.interval
+            if lag > self.threshold:
+                self.metrics.increment("event_loop_stalls")
+                self.metrics.observe("event_loop_stall", lag)
+                logging.warning(f"Event loop stalled for {lag * 1000:.0f} ms")
+
+    def start(self):
+        self._task = asyncio.create_task(self._watch())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+# Shared by every module so a run has a single set of metrics
+registry = Metrics()
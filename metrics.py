@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+import numpy as np
+import pandas as pd
+
+from financial_series import (
+    Statement,
+    concatenate,
+    debt_equity_ratios,
+    segment_averages,
+    segment_maxima,
+)
+
+DEBT_EQUITY_THRESHOLD = 0.4
+TRADING_DAYS = 252
+
+
+def return_on_equity(average_fcf, average_cse):
+    """
+    Average FCF over average CommonStockEquity, or 0 where either is not
+    positive.
+    """
+    valid = (average_fcf > 0) & (average_cse > 0)
+    return (average_fcf / average_cse.where(valid)).where(valid, 0.0)
+
+
+def _has_ratios(statement):
+    return {"TotalDebt", "CommonStockEquity"}.issubset(statement.columns)
+
+
+def average_by_symbol(series, field):
+    """
+    Average of a field per symbol of FinancialSeries by symbol, ignoring NaN.
+    Symbols without any value average to 0.
+    """
+    offsets, _, values, columns = concatenate(series, fields=(field,))
+    averages = segment_averages(values[0], offsets) if columns else 0.0
+    return pd.Series(averages, index=pd.Index(list(series), name="symbol"), dtype=float)
+
+
+def max_debt_equity_by_symbol(series):
+    """
+    Largest debt-to-equity ratio per symbol of FinancialSeries by symbol,
+    ignoring NaN. Symbols whose ratios are all NaN get NaN, as do those
+    without TotalDebt or CommonStockEquity.
+    """
+    offsets, _, values, columns = concatenate(
+        series, fields=("TotalDebt", "CommonStockEquity")
+    )
+    if len(columns) < 2:
+        maxima = np.nan
+    else:
+        maxima = segment_maxima(debt_equity_ratios(values[0], values[1]), offsets)
+    return pd.Series(maxima, index=pd.Index(list(series), name="symbol"), dtype=float)
+
+
+def compute_metrics(
+    cash_flow, balance_sheet, quarterly_balance_sheet, threshold=DEBT_EQUITY_THRESHOLD
+):
+    """
+    Compute the screening metrics for every symbol at once.
+
+    Takes annual cash flow, annual balance sheet and quarterly balance sheet
+    FinancialSeries by symbol, as returned by financial_series.project (any
+    may be None), and returns a frame indexed by symbol with ``average_fcf``,
+    ``average_cse``, ``roe``, ``max_debt_equity`` and ``low_debt``.
+    """
+    cash_flow = cash_flow or {}
+    balance_sheet = balance_sheet or {}
+    quarterly_balance_sheet = quarterly_balance_sheet or {}
+    symbols = pd.Index(
+        list(dict.fromkeys([*cash_flow, *balance_sheet, *quarterly_balance_sheet])),
+        name="symbol",
+        dtype=object,
+    )
+
+    metrics = pd.DataFrame(index=symbols)
+    # A missing statement averages to 0, as in the per-symbol check
+    metrics["average_fcf"] = average_by_symbol(cash_flow, "FreeCashFlow").reindex(
+        symbols, fill_value=0.0
+    )
+    metrics["average_cse"] = average_by_symbol(
+        balance_sheet, "CommonStockEquity"
+    ).reindex(symbols, fill_value=0.0)
+    metrics["roe"] = return_on_equity(metrics["average_fcf"], metrics["average_cse"])
+
+    # Only symbols whose quarterly statements have both fields have ratios
+    if isinstance(quarterly_balance_sheet, Statement):
+        with_ratios = (
+            quarterly_balance_sheet if _has_ratios(quarterly_balance_sheet) else {}
+        )
+    else:
+        with_ratios = {
+            symbol: series
+            for symbol, series in quarterly_balance_sheet.items()
+            if _has_ratios(series)
+        }
+    max_ratio = max_debt_equity_by_symbol(with_ratios).reindex(symbols)
+    metrics["max_debt_equity"] = max_ratio
+    # NaN ratios pass, missing quarterly data does not
+    metrics["low_debt"] = symbols.isin(list(with_ratios)) & ~(max_ratio >= threshold)
+    return metrics
+
+
+def pass_count_grid(roe, volatility, roe_thresholds, volatility_thresholds):
+    """
+    Count the symbols passing every combination of thresholds at once.
+
+    Returns an array of shape (len(roe_thresholds), len(volatility_thresholds))
+    whose [i, j] entry counts the symbols with ROE above roe_thresholds[i] and
+    volatility of at least volatility_thresholds[j]. NaN never passes.
+    """
+    roe = np.asarray(roe, dtype=float)
+    volatility = np.asarray(volatility, dtype=float)
+    roe_passes = roe[np.newaxis, :] > np.asarray(roe_thresholds, dtype=float)[:, None]
+    volatility_passes = (
+        volatility[np.newaxis, :]
+        >= np.asarray(volatility_thresholds, dtype=float)[:, None]
+    )
+    return roe_passes.astype(np.int64) @ volatility_passes.T.astype(np.int64)
+
+
+def price_matrix(history, symbols, column="close"):
+    """
+    Pivot daily history indexed by (symbol, date) into a (symbols x days)
+    array over the union of all dates, NaN where a symbol has no price.
+    """
+    if history is None or len(history) == 0 or column not in history.columns:
+        return np.full((len(symbols), 0), np.nan)
+    wide = history[column].unstack(level=0).sort_index()
+    return wide.reindex(columns=symbols).to_numpy(dtype=float).T
+
+
+def realized_metrics(closes, lows=None, highs=None, periods_per_year=TRADING_DAYS):
+    """
+    Annualized realized volatility, max drawdown, low, high and range
+    ((high - low) / low) of every row of a (symbols x days) price array at
+    once, ignoring missing days. Lows and highs default to the closes.
+    Returns a dict of arrays with one entry per row; NaN where a row has too
+    few prices.
+    """
+    closes = np.asarray(closes, dtype=float)
+    lows = closes if lows is None else np.asarray(lows, dtype=float)
+    highs = closes if highs is None else np.asarray(highs, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(closes), axis=1)
+        valid = ~np.isnan(returns)
+        count = valid.sum(axis=1)
+        mean = np.where(valid, returns, 0).sum(axis=1) / count
+        squares = np.where(valid, returns - mean[:, np.newaxis], 0) ** 2
+        volatility = np.sqrt(squares.sum(axis=1) / (count - 1) * periods_per_year)
+        volatility[count < 2] = np.nan
+
+        # fmax skips NaN, so missing days do not reset the running peak
+        peaks = np.fmax.accumulate(closes, axis=1)
+        max_drawdown = np.fmax.reduce(1 - closes / peaks, axis=1, initial=np.nan)
+        low = np.fmin.reduce(lows, axis=1, initial=np.nan)
+        high = np.fmax.reduce(highs, axis=1, initial=np.nan)
+        price_range = (high - low) / low
+    return {
+        "volatility": volatility,
+        "max_drawdown": max_drawdown,
+        "low": low,
+        "high": high,
+        "range": price_range,
+    }
+
+
+def realized_metrics_by_symbol(history, symbols):
+    """
+    realized_metrics of daily history indexed by (symbol, date), as a frame
+    indexed by symbol. Symbols without history get NaN.
+    """
+    columns = {
+        name: price_matrix(history, symbols, name) for name in ("close", "low", "high")
+    }
+    return pd.DataFrame(
+        realized_metrics(columns["close"], columns["low"], columns["high"]),
+        index=pd.Index(symbols, name="symbol"),
+    )
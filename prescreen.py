@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+MARKET_CAP_COLUMN = "Market Capitalization"
+PCT_ABOVE_LOW_COLUMN = "Percentage Above 52 Week Low"
+MARKET_CAP_BUCKETS = ("micro", "small", "mid", "large")
+
+MULTIPLIERS = {"": 1, "K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+# "$9B (Mid)", "$850M (Micro)", "$1,200" or "2e9"
+AMOUNT_PATTERN = r"^\s*\$?\s*(?P<number>[\d.,]+(?:[eE][+-]?\d+)?)\s*(?P<unit>[KMBT]?)"
+
+
+def parse_amount(text):
+    """Parse a single dollar amount such as "$2B", "500M" or "2e9"."""
+    match = re.match(AMOUNT_PATTERN + r"\s*$", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid amount: {text!r}")
+    number = float(match["number"].replace(",", ""))
+    return number * MULTIPLIERS[match["unit"].upper()]
+
+
+def parse_market_caps(values):
+    """Market capitalizations in dollars; NaN where a value cannot be parsed."""
+    parts = pd.Series(values, dtype="string").str.extract(AMOUNT_PATTERN)
+    numbers = pd.to_numeric(parts["number"].str.replace(",", ""), errors="coerce")
+    multipliers = parts["unit"].str.upper().map(MULTIPLIERS)
+    return (numbers * multipliers).to_numpy(dtype=float, na_value=np.nan)
+
+
+def parse_market_cap_buckets(values):
+    """Lower-case bucket names, e.g. "mid" for "$9B (Mid)"; NaN if missing."""
+    buckets = pd.Series(values, dtype="string").str.extract(r"\(\s*(\w+)\s*\)")[0]
+    return buckets.str.lower().to_numpy(dtype=object, na_value=np.nan)
+
+
+def parse_percentages(values):
+    """Percentages such as "2.49%" as numbers (2.49); NaN if unparseable."""
+    numbers = pd.Series(values, dtype="string").str.strip().str.rstrip("%")
+    return pd.to_numeric(numbers, errors="coerce").to_numpy(dtype=float)
+
+
+def _has_column(frame, column):
+    if column in frame.columns:
+        return True
+    logging.warning(f"Cannot pre-screen without a {column!r} column")
+    return False
+
+
+def prescreen(frame, min_market_cap=None, max_pct_above_low=None, buckets=None):
+    """
+    Return the rows of a universe frame that pass every given filter, using
+    the columns of the universe CSV only. A value that cannot be parsed
+    fails its filter; a filter whose column is missing is skipped.
+    """
+    keep = np.ones(len(frame), dtype=bool)
+    if min_market_cap is not None and _has_column(frame, MARKET_CAP_COLUMN):
+        keep &= parse_market_caps(frame[MARKET_CAP_COLUMN]) >= min_market_cap
+    if max_pct_above_low is not None and _has_column(frame, PCT_ABOVE_LOW_COLUMN):
+        keep &= parse_percentages(frame[PCT_ABOVE_LOW_COLUMN]) <= max_pct_above_low
+    if buckets and _has_column(frame, MARKET_CAP_COLUMN):
+        buckets = [bucket.lower() for bucket in buckets]
+        keep &= np.isin(parse_market_cap_buckets(frame[MARKET_CAP_COLUMN]), buckets)
+    return frame[keep]
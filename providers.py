@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+import abc
+import random
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+# The financial statement fields used by the screener, by statement
+STATEMENT_TYPES = {
+    "cash_flow": ["FreeCashFlow"],
+    "balance_sheet": ["CommonStockEquity", "TotalDebt"],
+}
+
+
+class ProviderError(Exception):
+    """Raised when a data provider request fails."""
+
+
+class MissingData(ProviderError):
+    """Stands for a symbol that a provider response left out altogether."""
+
+
+class DataProvider(abc.ABC):
+    """
+    Source of Yahoo-shaped data for many symbols at once.
+
+    ``summary_detail`` and ``price`` return a dict keyed by symbol, the
+    financial statements return a long-format DataFrame indexed by symbol with
+    an ``asOfDate`` column, exactly like a multi-symbol yahooquery Ticker.
+    Symbols without data are missing from frames or map to an error string.
+    Providers with ``is_async`` set implement these methods as coroutines and
+    release their connections in ``aclose``.
+    """
+
+    is_async = False
+
+    @abc.abstractmethod
+    def summary_detail(self, symbols):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def price(self, symbols):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def cash_flow(self, symbols, frequency="Annual"):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def balance_sheet(self, symbols, frequency="Annual"):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def financial_data(self, symbols, types, frequency="Annual"):
+        """
+        Request several statement fields of one frequency at once, e.g.
+        ``["FreeCashFlow", "TotalDebt"]``, as a single long-format frame.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def history(self, symbols, period="1y", interval="1d"):
+        """
+        Daily prices as a frame indexed by ``(symbol, date)`` with open, high,
+        low, close, volume and adjclose columns.
+        """
+        raise NotImplementedError
+
+    def fetch(self, symbols, data_type, frequency=None):
+        """Request any data type by name."""
+        method = getattr(self, data_type)
+        return method(symbols, frequency) if frequency else method(symbols)
+
+    def close(self):
+        """Release the resources of a sync provider; most hold none."""
+
+
+class YahooProvider(DataProvider):
+    """Data from Yahoo Finance through yahooquery."""
+
+    def _ticker(self, symbols):
+        # yahooquery is slow to import, so only when Yahoo is actually used
+        from yahooquery import Ticker
+
+        return Ticker(symbols, asynchronous=True)
+
+    def summary_detail(self, symbols):
+        return self._ticker(symbols).summary_detail
+
+    def price(self, symbols):
+        return self._ticker(symbols).price
+
+    def cash_flow(self, symbols, frequency="Annual"):
+        return self._ticker(symbols).cash_flow(frequency=frequency)
+
+    def balance_sheet(self, symbols, frequency="Annual"):
+        return self._ticker(symbols).balance_sheet(frequency=frequency)
+
+    def financial_data(self, symbols, types, frequency="Annual"):
+        return self._ticker(symbols).get_financial_data(types, frequency=frequency)
+
+    def history(self, symbols, period="1y", interval="1d"):
+        return self._ticker(symbols).history(period=period, interval=interval)
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Deterministic, offline stand-in for Yahoo.
+
+    Every symbol gets a reproducible company profile derived from the seed and
+    the symbol alone, so results do not depend on how symbols are batched.
+    ``latency`` seconds are slept per request, ``error_rate`` is the chance a
+    request raises ProviderError and ``missing_rate`` the chance a symbol has
+    no data at all. ``stall_rate`` is the chance a request hangs for ``stall``
+    extra seconds, like a stuck connection.
+    """
+
+    def __init__(
+        self,
+        seed=0,
+        latency=0.0,
+        error_rate=0.0,
+        missing_rate=0.0,
+        stall_rate=0.0,
+        stall=0.0,
+    ):
+        self.seed = seed
+        self.latency = latency
+        self.error_rate = error_rate
+        self.missing_rate = missing_rate
+        self.stall_rate = stall_rate
+        self.stall = stall
+        self.requests = 0
+        self._random = random.Random(seed)
+
+    def _request(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.stall_rate and self._random.random() < self.stall_rate:
+            time.sleep(self.stall)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise ProviderError("Injected synthetic provider error")
+
+    def _profile(self, symbol):
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+        if rng.random() < self.missing_rate:
+            return None
+        equity = rng.lognormal(mean=22, sigma=1.5)
+        low = rng.uniform(5, 300)
+        return {
+            "equity": equity,
+            "equity_growth": rng.normal(0.05, 0.1),
+            "fcf_margin": rng.normal(0.12, 0.15),
+            "debt_ratio": rng.lognormal(mean=-1.2, sigma=0.8),
+            "low": low,
+            "high": low * (1 + rng.lognormal(mean=-0.8, sigma=0.6)),
+            "exchange": ["NasdaqGS", "NYSE", "NYSEArca"][rng.integers(3)],
+            "rng": rng,
+        }
+
+    def _quotes(self, symbols, build):
+        self._request()
+        result = {}
+        for symbol in symbols:
+            profile = self._profile(symbol)
+            result[symbol] = (
+                build(symbol, profile)
+                if profile
+                else f"Quote not found for ticker symbol: {symbol}"
+            )
+        return result
+
+    def summary_detail(self, symbols):
+        return self._quotes(
+            symbols,
+            lambda symbol, profile: {
+                "fiftyTwoWeekLow": round(profile["low"], 2),
+                "fiftyTwoWeekHigh": round(profile["high"], 2),
+                "previousClose": round((profile["low"] + profile["high"]) / 2, 2),
+            },
+        )
+
+    def price(self, symbols):
+        return self._quotes(
+            symbols,
+            lambda symbol, profile: {
+                "symbol": symbol,
+                "exchangeName": profile["exchange"],
+                "regularMarketPrice": round((profile["low"] + profile["high"]) / 2, 2),
+            },
+        )
+
+    def _statements(self, symbols, frequency, columns):
+        self._request()
+        quarterly = frequency[:1].lower() == "q"
+        periods = 5 if quarterly else 4
+        dates = pd.date_range(
+            end="2024-12-31", periods=periods, freq="QE" if quarterly else "YE"
+        )
+        rows = []
+        for symbol in symbols:
+            profile = self._profile(symbol)
+            if not profile:
+                continue
+            rng = profile["rng"]
+            growth = np.cumprod(
+                1 + profile["equity_growth"] + rng.normal(0, 0.05, periods)
+            )
+            equity = profile["equity"] * growth / growth[-1]
+            values = {
+                "CommonStockEquity": equity,
+                "FreeCashFlow": equity
+                * (profile["fcf_margin"] + rng.normal(0, 0.05, periods)),
+                "TotalDebt": equity
+                * profile["debt_ratio"]
+                * rng.uniform(0.8, 1.2, periods),
+            }
+            for i, date in enumerate(dates):
+                row = {
+                    "symbol": symbol,
+                    "asOfDate": date,
+                    "periodType": "3M" if quarterly else "12M",
+                    "currencyCode": "USD",
+                }
+                row.update({column: values[column][i] for column in columns})
+                rows.append(row)
+
+        if not rows:
+            return f"Data unavailable for {', '.join(symbols)}"
+        return pd.DataFrame(rows).set_index("symbol")
+
+    def cash_flow(self, symbols, frequency="Annual"):
+        return self._statements(symbols, frequency, STATEMENT_TYPES["cash_flow"])
+
+    def balance_sheet(self, symbols, frequency="Annual"):
+        return self._statements(symbols, frequency, STATEMENT_TYPES["balance_sheet"])
+
+    def financial_data(self, symbols, types, frequency="Annual"):
+        return self._statements(symbols, frequency, list(types))
+
+    def history(self, symbols, period="1y", interval="1d"):
+        self._request()
+        dates = pd.bdate_range(end="2024-12-31", periods=252, name="date")
+        frames = []
+        for symbol in symbols:
+            profile = self._profile(symbol)
+            if not profile:
+                continue
+            rng = profile["rng"]
+            walk = np.cumsum(rng.normal(0, 1, len(dates)))
+            # Scaled so the closes span the 52-week range of summary_detail
+            span = (walk - walk.min()) / (walk.max() - walk.min())
+            close = np.round(
+                profile["low"] * (profile["high"] / profile["low"]) ** span, 2
+            )
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "symbol": symbol,
+                        "open": close,
+                        "high": close,
+                        "low": close,
+                        "close": close,
+                        "volume": rng.integers(1e5, 1e7, len(dates)),
+                        "adjclose": close,
+                    },
+                    index=dates,
+                )
+            )
+
+        if not frames:
+            return f"Data unavailable for {', '.join(symbols)}"
+        return pd.concat(frames).set_index("symbol", append=True).swaplevel()
+
+
+def _yahoo_http(**options):
+    # aiohttp is only needed when this provider is used
+    from yahoo_http import YahooHttpProvider
+
+    return YahooHttpProvider(**options)
+
+
+PROVIDERS = {
+    "yahoo": YahooProvider,
+    "yahoo-http": _yahoo_http,
+    "synthetic": SyntheticProvider,
+}
+
+
+def get_provider(name, **options):
+    """Create a provider by name, e.g. ``get_provider("synthetic", seed=1)``."""
+    return PROVIDERS[name](**options)
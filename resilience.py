@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+import asyncio
+import collections
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from instrumentation import registry
+from providers import DataProvider, ProviderError
+
+# Retries always allowed, however few requests were made so far
+MIN_RETRY_BUDGET = 10
+
+
+class DeadlineExceeded(ProviderError):
+    """Raised when a provider request does not finish within its deadline."""
+
+
+class CircuitBreaker:
+    """
+    Pause requests while the upstream is failing.
+
+    The breaker opens when at least ``threshold`` of the last ``window``
+    requests failed (once ``min_calls`` were seen). While it is open, callers
+    of ``before_call`` sleep until ``cooldown`` seconds have passed; then one
+    probe request is let through. Its success closes the breaker, its failure
+    opens it for another cooldown.
+    """
+
+    def __init__(self, threshold=0.5, window=20, min_calls=10, cooldown=30.0):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_at = None
+        self._results = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self._results.clear()
+        registry.increment("breaker_opened")
+        logging.warning(f"Circuit breaker open, pausing requests for {self.cooldown}s")
+
+    def _pause(self):
+        """Seconds to wait before a request may be made, or None to make it now."""
+        with self._lock:
+            if self.state == "closed":
+                return None
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                # This caller probes the upstream, the others keep waiting
+                self.state = "half_open"
+                return None
+            return remaining if remaining > 0 else self.cooldown / 10
+
+    def before_call(self):
+        """Return once a request may be made, sleeping while the breaker is open."""
+        while (pause := self._pause()) is not None:
+            with registry.timer("breaker_pause"):
+                time.sleep(pause)
+
+    async def before_request(self):
+        """Like before_call, but waits on the event loop."""
+        while (pause := self._pause()) is not None:
+            with registry.timer("breaker_pause"):
+                await asyncio.sleep(pause)
+
+    def record(self, success):
+        with self._lock:
+            if self.state == "half_open":
+                if success:
+                    self.state = "closed"
+                    logging.info("Circuit breaker closed")
+                else:
+                    self._open()
+                return
+            if self.state == "open":
+                return
+            self._results.append(success)
+            failures = self._results.count(False)
+            if (
+                len(self._results) >= self.min_calls
+                and failures / len(self._results) >= self.threshold
+            ):
+                self._open()
+
+
+class _Retrying:
+    """Retry budget, jittered backoff and hedge latencies shared by the wrappers."""
+
+    def __init__(
+        self,
+        retries=2,
+        backoff=0.5,
+        max_backoff=10.0,
+        retry_budget=0.2,
+        hedge=False,
+        hedge_quantile=0.95,
+        breaker=None,
+    ):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.breaker = breaker
+        self.calls = 0
+        self.retried = 0
+        self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=200))
+        self._random = random.Random()
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, name):
+        """The latency quantile of recent requests, or None until 20 were seen."""
+        with self._lock:
+            latencies = sorted(self._latencies[name])
+        if len(latencies) < 20:
+            return None
+        return latencies[
+            min(len(latencies) - 1, int(self.hedge_quantile * len(latencies)))
+        ]
+
+    def _record_latency(self, name, seconds):
+        with self._lock:
+            self._latencies[name].append(seconds)
+
+    def _count_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def _may_retry(self, attempt):
+        with self._lock:
+            allowed = attempt < self.retries and self.retried < max(
+                MIN_RETRY_BUDGET, self.retry_budget * self.calls
+            )
+            if allowed:
+                self.retried += 1
+        return allowed
+
+    def _retry_pause(self, name, attempt, error):
+        # Full jitter keeps retries of many callers from lining up
+        pause = self._random.uniform(
+            0, min(self.max_backoff, self.backoff * 2**attempt)
+        )
+        logging.info(f"Retrying {name} in {pause:.2f}s after {error!r}")
+        registry.increment("request_retries")
+        return pause
+
+
+class ResilientProvider(_Retrying, DataProvider):
+    """
+    Wrap a DataProvider with per-request deadlines, retries with jittered
+    exponential backoff, hedged requests and a circuit breaker.
+
+    Every attempt runs in its own thread and is abandoned once ``deadline``
+    seconds have passed. Failed attempts are retried up to ``retries`` times,
+    as long as retries stay within ``retry_budget`` of all requests. With
+    ``hedge`` set, an attempt still running after the ``hedge_quantile``
+    latency of earlier requests gets a duplicate, and the first to finish
+    wins.
+    """
+
+    def __init__(
+        self,
+        provider,
+        deadline=30.0,
+        retries=2,
+        backoff=0.5,
+        max_backoff=10.0,
+        retry_budget=0.2,
+        hedge=False,
+        hedge_quantile=0.95,
+        breaker=None,
+        max_workers=16,
+    ):
+        super().__init__(
+            retries=retries,
+            backoff=backoff,
+            max_backoff=max_backoff,
+            retry_budget=retry_budget,
+            hedge=hedge,
+            hedge_quantile=hedge_quantile,
+            breaker=breaker,
+        )
+        self.provider = provider
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="request"
+        )
+
+    def _attempt(self, name, args):
+        """Run one attempt, hedged if enabled, within the deadline."""
+        start = time.monotonic()
+        method = getattr(self.provider, name)
+        futures = [self._executor.submit(method, *args)]
+        delay = self.hedge_delay(name) if self.hedge else None
+        if delay is not None and delay < self.deadline:
+            done, _ = wait(futures, timeout=delay)
+            if not done:
+                registry.increment("hedged_requests")
+                futures.append(self._executor.submit(method, *args))
+        hedged = futures[1:]
+
+        error = None
+        remaining = self.deadline - (time.monotonic() - start)
+        while futures and remaining > 0:
+            done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                futures.remove(future)
+                if future.exception() is None:
+                    self._record_latency(name, time.monotonic() - start)
+                    if future in hedged:
+                        registry.increment("hedge_wins")
+                    return future.result()
+                error = future.exception()
+            remaining = self.deadline - (time.monotonic() - start)
+        if error and not futures:
+            raise error
+        registry.increment("deadline_exceeded")
+        raise DeadlineExceeded(f"{name} took longer than {self.deadline}s")
+
+    def _call(self, name, *args):
+        self._count_call()
+        attempt = 0
+        while True:
+            if self.breaker:
+                self.breaker.before_call()
+            try:
+                result = self._attempt(name, args)
+            except Exception as e:
+                if self.breaker:
+                    self.breaker.record(False)
+                if not self._may_retry(attempt):
+                    raise
+                time.sleep(self._retry_pause(name, attempt, e))
+                attempt += 1
+                continue
+            if self.breaker:
+                self.breaker.record(True)
+            return result
+
+    def summary_detail(self, symbols):
+        return self._call("summary_detail", symbols)
+
+    def price(self, symbols):
+        return self._call("price", symbols)
+
+    def cash_flow(self, symbols, frequency="Annual"):
+        return self._call("cash_flow", symbols, frequency)
+
+    def balance_sheet(self, symbols, frequency="Annual"):
+        return self._call("balance_sheet", symbols, frequency)
+
+    def financial_data(self, symbols, types, frequency="Annual"):
+        return self._call("financial_data", symbols, types, frequency)
+
+    def history(self, symbols, period="1y", interval="1d"):
+        return self._call("history", symbols, period, interval)
+
+    def close(self):
+        """Stop waiting for abandoned attempts."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RequestPolicy(_Retrying):
+    """
+    Rate limit, retries with jittered exponential backoff, hedging and a
+    circuit breaker for the single HTTP requests of an async provider.
+
+    ``call`` awaits a request on the event loop. Every attempt, hedged
+    duplicates included, first takes a token from ``limiter`` (a
+    scheduler.TokenBucket). Failed attempts are retried like those of
+    ResilientProvider; deadlines are left to the provider's own timeout.
+    """
+
+    def __init__(self, limiter=None, **options):
+        super().__init__(**options)
+        self.limiter = limiter
+
+    async def _limited(self, request):
+        if self.limiter:
+            await self.limiter.acquire()
+        return await request()
+
+    async def _attempt(self, name, request):
+        """Run one attempt, hedged if enabled."""
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(self._limited(request))]
+        try:
+            delay = self.hedge_delay(name) if self.hedge else None
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    registry.increment("hedged_requests")
+                    tasks.append(asyncio.ensure_future(self._limited(request)))
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._record_latency(name, time.monotonic() - start)
+                        if task is not tasks[0]:
+                            registry.increment("hedge_wins")
+                        return task.result()
+                if not pending:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Retrieves the error of a losing duplicate, so it is not reported
+                    task.exception()
+
+    async def call(self, name, request):
+        """Await ``request()``, a request to the ``name`` endpoint, resiliently."""
+        self._count_call()
+        attempt = 0
+        while True:
+            if self.breaker:
+                await self.breaker.before_request()
+            try:
+                result = await self._attempt(name, request)
+            except Exception as e:
+                if self.breaker:
+                    self.breaker.record(False)
+                if not self._may_retry(attempt):
+                    raise
+                await asyncio.sleep(self._retry_pause(name, attempt, e))
+                attempt += 1
+                continue
+            if self.breaker:
+                self.breaker.record(True)
+            return result
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import csv
+import io
+import json
+import os
+
+NUMERIC_FIELDS = ("ROE", "Volatility", "52-week Low", "52-week High")
+# Column holding the id of the screening run that wrote a row
+RUN_FIELD = "Run"
+
+
+def _format(path):
+    extension = os.path.splitext(path)[1].lower()
+    return "csv" if extension == ".csv" else "jsonl"
+
+
+class ResultSink:
+    """
+    Append screening results to a JSONL or CSV file (chosen by extension) as
+    soon as each one is known, so they survive a crash and can be followed
+    while the run is going.
+
+    Existing results are kept; read_results returns the latest row of every
+    symbol. With ``run_id`` every row records the run that wrote it.
+    """
+
+    def __init__(self, path, run_id=None):
+        self.path = path
+        self.run_id = run_id
+        self.format = _format(path)
+        self.count = 0
+        self._fieldnames = None
+        if self.format == "csv" and os.path.exists(path) and os.path.getsize(path):
+            with open(path, newline="") as f:
+                self._fieldnames = next(csv.reader(f), None)
+        self._file = open(path, "a", newline="")
+
+    def write(self, result):
+        if self.run_id is not None:
+            result = {**result, RUN_FIELD: self.run_id}
+        if self.format == "csv":
+            if self._fieldnames is None:
+                self._fieldnames = list(result)
+                csv.writer(self._file).writerow(self._fieldnames)
+            writer = csv.DictWriter(
+                self._file, self._fieldnames, restval="", extrasaction="ignore"
+            )
+            writer.writerow(result)
+        else:
+            self._file.write(json.dumps(result) + "\n")
+        # Every result reaches the file right away
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _parse_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _rows(path):
+    with open(path, newline="") as f:
+        if _format(path) == "csv":
+            for row in csv.DictReader(f):
+                if None in row or None in row.values():
+                    continue
+                for field in NUMERIC_FIELDS:
+                    if field in row:
+                        row[field] = _parse_number(row[field])
+                yield row
+        else:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def read_results(path, run_id=None):
+    """
+    Read the results written by a ResultSink, keeping only the latest row of
+    every symbol. A truncated last line, e.g. after a crash, is ignored. With
+    ``run_id`` only the rows written by that run are read. The run column is
+    left out of the returned rows.
+    """
+    if not os.path.exists(path):
+        return []
+    results = {}
+    for row in _rows(path):
+        run = row.pop(RUN_FIELD, None)
+        if run_id is not None and str(run) != str(run_id):
+            continue
+        results[row["Symbol"]] = row
+    return list(results.values())
+
+
+def format_table_csv(data):
+    """Format a list of dictionaries as CSV text."""
+    if not data:
+        return ""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, list(data[0]), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(data)
+    return output.getvalue()
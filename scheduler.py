@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter allowing ``rate`` requests per second on average
+    and bursts of up to ``burst`` requests.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class FetchScheduler:
+    """
+    Run blocking fetch calls in a bounded thread pool, at most
+    ``max_concurrency`` at a time and no faster than the rate limiter allows.
+    Coroutines of async providers are limited the same way by ``run_async``.
+    """
+
+    def __init__(self, max_concurrency=8, rate=None, burst=1):
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="fetch"
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+
+    async def _acquire(self):
+        self.queued += 1
+        try:
+            await self.semaphore.acquire()
+            try:
+                if self.limiter:
+                    await self.limiter.acquire()
+            except BaseException:
+                self.semaphore.release()
+                raise
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self.completed += 1
+        self.semaphore.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` in the pool and return its result."""
+        await self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self._release()
+
+    async def run_async(self, fn, *args, **kwargs):
+        """
+        Await the coroutine function ``fn(*args, **kwargs)`` on the event loop,
+        within the same concurrency and rate limits as ``run``.
+        """
+        await self._acquire()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            self._release()
+
+    @property
+    def queue_depth(self):
+        return self.queued
+
+    def stats(self):
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+        }
+
+    async def report(self, interval=30):
+        """Log the scheduler's counters every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            logging.info(f"Fetch scheduler: {self.stats()}")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
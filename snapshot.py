@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from database import RESULT_COLUMNS, DatabaseManager
+from financial_series import FinancialSeries, concatenate
+from fundamentals_cache import FundamentalsCache
+from strong_business_tester import DEFAULT_PLAN
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def _statement_name(data_type, frequency):
+    return f"{data_type}_{frequency.lower()}"
+
+
+def _series(cached):
+    """The FinancialSeries of a cached statement by symbol."""
+    series = {}
+    for symbol, value in cached.items():
+        if isinstance(value, pd.DataFrame):
+            # Cached before statements were kept as FinancialSeries
+            value = FinancialSeries.from_frame(value)
+        if isinstance(value, FinancialSeries):
+            series[symbol] = value
+    return series
+
+
+def _save(directory, relative_path, array):
+    np.save(os.path.join(directory, relative_path), array, allow_pickle=False)
+    return {"file": relative_path, "dtype": array.dtype.str, "shape": array.shape}
+
+
+async def export_snapshot(db_path, directory, statements=DEFAULT_PLAN):
+    """
+    Write the cached fundamentals and the per-symbol metrics of a database to
+    a snapshot directory that Snapshot memory-maps.
+
+    Every column is a separate ``.npy`` file: the sorted symbols, one array
+    per metric aligned with them, and per statement the row offsets of each
+    symbol, the period dates and the field values. ``manifest.json``, written
+    last, lists the files. An existing snapshot is replaced as a whole; any
+    other non-empty ``directory`` raises FileExistsError and is left alone.
+    """
+    if os.path.exists(directory) and not (
+        os.path.isdir(directory)
+        and (
+            not os.listdir(directory)
+            or os.path.isfile(os.path.join(directory, MANIFEST))
+        )
+    ):
+        raise FileExistsError(f"{directory} exists and is not a snapshot")
+    async with DatabaseManager(db_path) as db:
+        results = await db.read_results()
+    with FundamentalsCache(db_path) as cache:
+        cached = {key: _series(dict(cache.items(*key))) for key in statements}
+
+    symbols = np.unique(
+        np.array(
+            [row[0] for row in results]
+            + [symbol for values in cached.values() for symbol in values],
+            dtype=str,
+        )
+    )
+    staging = directory.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(os.path.join(staging, "metrics"))
+    manifest = {
+        "format": FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "db_path": os.path.abspath(db_path),
+        "symbols": _save(staging, "symbols.npy", symbols),
+        "metrics": {},
+        "statements": {},
+    }
+
+    # Results are keyed by symbol; symbols without one get NaN and ""
+    positions = np.searchsorted(symbols, [row[0] for row in results])
+    metric_columns = {}
+    for index, column in enumerate(RESULT_COLUMNS, start=1):
+        values = [row[index] for row in results]
+        if column == "market":
+            values = [value or "" for value in values]
+            array = np.full(len(symbols), "", dtype=np.array(values + [""]).dtype)
+        else:
+            # None becomes NaN
+            values = np.array(values, dtype=float)
+            array = np.full(len(symbols), np.nan)
+        array[positions] = values
+        metric_columns[column] = array
+
+    for data_type, frequency in statements:
+        name = _statement_name(data_type, frequency)
+        offsets, dates, values, columns = concatenate(
+            cached[(data_type, frequency)], symbols
+        )
+        os.makedirs(os.path.join(staging, "statements", name))
+        manifest["statements"][name] = {
+            "data_type": data_type,
+            "frequency": frequency,
+            "columns": columns,
+            "offsets": _save(staging, f"statements/{name}/offsets.npy", offsets),
+            "dates": _save(staging, f"statements/{name}/dates.npy", dates),
+            "values": _save(staging, f"statements/{name}/values.npy", values),
+        }
+
+    # The screener's averages and largest debt-to-equity ratio; symbols
+    # without any statement get NaN
+    derived = metrics.compute_metrics(
+        cached.get(("cash_flow", "Annual")),
+        cached.get(("balance_sheet", "Annual")),
+        cached.get(("balance_sheet", "Quarterly")),
+    ).reindex(symbols)
+    for column in ("average_fcf", "average_cse", "max_debt_equity"):
+        metric_columns[column] = derived[column].to_numpy(dtype=float)
+
+    for column, array in metric_columns.items():
+        manifest["metrics"][column] = _save(staging, f"metrics/{column}.npy", array)
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging, directory)
+    return manifest
+
+
+class Snapshot:
+    """
+    Read-only view of an exported snapshot.
+
+    Columns are memory-mapped on first access, so opening even a large
+    snapshot reads only its manifest and symbols; values are paged in as
+    they are used. Statements are returned as FinancialSeries whose arrays
+    are views into the mapped files.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        if self.manifest["format"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot format {self.manifest['format']} in {directory}"
+            )
+        self._arrays = {}
+        self.symbols = self._load(self.manifest["symbols"])
+
+    def _load(self, entry):
+        path = entry["file"]
+        if path not in self._arrays:
+            self._arrays[path] = np.load(
+                os.path.join(self.directory, path), mmap_mode="r"
+            )
+        return self._arrays[path]
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        try:
+            self.position(symbol)
+        except KeyError:
+            return False
+        return True
+
+    @property
+    def metric_names(self):
+        return list(self.manifest["metrics"])
+
+    def position(self, symbol):
+        """Index of a symbol in the snapshot's sorted symbols."""
+        position = int(np.searchsorted(self.symbols, symbol))
+        if position == len(self.symbols) or self.symbols[position] != symbol:
+            raise KeyError(symbol)
+        return position
+
+    def metric(self, name):
+        """One metric of every symbol, aligned with ``symbols``."""
+        return self._load(self.manifest["metrics"][name])
+
+    def metrics(self, names=None):
+        """The metrics as a frame indexed by symbol; the values are copied."""
+        names = self.metric_names if names is None else names
+        return pd.DataFrame(
+            {name: self.metric(name) for name in names},
+            index=pd.Index(self.symbols, name="symbol"),
+        )
+
+    def statement(self, symbol, data_type, frequency="Annual"):
+        """A symbol's statement as a FinancialSeries, or None without one."""
+        entry = self.manifest["statements"][_statement_name(data_type, frequency)]
+        offsets = self._load(entry["offsets"])
+        position = self.position(symbol)
+        start, end = int(offsets[position]), int(offsets[position + 1])
+        if start == end:
+            return None
+        return FinancialSeries(
+            symbol,
+            self._load(entry["dates"])[start:end],
+            self._load(entry["values"])[:, start:end],
+            tuple(entry["columns"]),
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Write the cached fundamentals and per-symbol metrics of "
+        "the screening database to a memory-mapped snapshot."
+    )
+    parser.add_argument(
+        "--db-path",
+        default="test.db",
+        help="Path to the SQLite database (default: test.db)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="snapshot",
+        help="Snapshot directory, replaced if it holds a snapshot (default: snapshot)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        manifest = asyncio.run(export_snapshot(args.db_path, args.output))
+    except FileExistsError as e:
+        logging.error(f"{e}; choose another --output")
+        return 1
+    statements = ", ".join(
+        f"{name} ({entry['dates']['shape'][0]} periods)"
+        for name, entry in manifest["statements"].items()
+    )
+    logging.info(
+        f"Wrote a snapshot of {manifest['symbols']['shape'][0]} symbols to "
+        f"{args.output}: metrics {', '.join(manifest['metrics'])}; {statements}"
+    )
+
+
+if __name__ == "__main__":
+    import cli
+
+    sys.exit(cli.main(["export-snapshot", *sys.argv[1:]]))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from database import DatabaseManager
+from fundamentals_cache import FundamentalsCache
+
+
+async def stats(db_path):
+    """
+    Summarize a database: DatabaseManager.summary plus the number and size of
+    the responses in its fundamentals cache.
+    """
+    async with DatabaseManager(db_path) as db:
+        summary = await db.summary()
+    with FundamentalsCache(db_path) as cache:
+        summary["cached_responses"] = cache.entries()
+        summary["cache_bytes"] = cache.size
+    return summary
+
+
+def _time(epoch):
+    return datetime.fromtimestamp(epoch).isoformat(sep=" ", timespec="seconds")
+
+
+def format_stats(summary):
+    """Human-readable lines describing a stats summary."""
+    lines = [
+        f"Symbols tested: {summary['symbols']} "
+        f"({summary['tested_last_day']} in the last day)",
+        f"Results stored: {summary['results']}, "
+        f"strong businesses: {summary['strong_businesses']}",
+        f"Runs: {summary['runs']} ({summary['unfinished_runs']} unfinished)",
+    ]
+    run = summary["latest_run"]
+    if run:
+        finished = (
+            f"finished {_time(run['finished_at'])}"
+            if run["finished_at"]
+            else "unfinished"
+        )
+        lines.append(
+            f"Latest run {run['run_id']}: started {_time(run['started_at'])}, "
+            f"{finished}, jobs {run['jobs']}"
+        )
+    lines.append(
+        f"Fundamentals cache: {summary['cached_responses']} responses, "
+        f"{summary['cache_bytes'] / 1024 / 1024:.1f} MB"
+    )
+    return lines
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Summarize the screening database without fetching anything."
+    )
+    parser.add_argument(
+        "--db-path",
+        default="test.db",
+        help="Path to the SQLite database (default: test.db)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    for line in format_stats(asyncio.run(stats(args.db_path))):
+        logging.info(line)
+
+
+if __name__ == "__main__":
+    import cli
+
+    sys.exit(cli.main(["stats", *sys.argv[1:]]))
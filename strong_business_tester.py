@@ -1,17 +1,38 @@
 #!/usr/bin/env python
 import argparse
 import asyncio
+import functools
+import io
 import logging
-import math
+import logging.handlers
+import multiprocessing
 import os
-import statistics
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-import csv  # <-- Added import for CSV handling
 
-from yahooquery import Ticker
+import numpy as np
+import pandas as pd
+
+import financial_series
+import metrics
 
 from database import DatabaseManager
+from fundamentals_cache import FundamentalsCache, NotCached
+from instrumentation import StallDetector, registry
+from prescreen import MARKET_CAP_BUCKETS, parse_amount, prescreen
+from providers import (
+    PROVIDERS,
+    STATEMENT_TYPES,
+    MissingData,
+    YahooProvider,
+    get_provider,
+)
+from resilience import CircuitBreaker, RequestPolicy, ResilientProvider
+from result_sink import ResultSink, format_table_csv, read_results
+from scheduler import FetchScheduler, TokenBucket
 
 
 def format_table_markdown(data):
@@ -39,31 +60,370 @@ def format_table_markdown(data):
     return "\n".join([header_row, separator_row] + data_rows)
 
 
-# Set up logging to both console and a file
-logger = logging.getLogger()  # Get the root logger
-logger.setLevel(logging.INFO)
+def _split_response(data, symbols):
+    """
+    Split a multi-symbol yahooquery response into each symbol's part.
+    """
+    if isinstance(data, dict):
+        return {
+            symbol: (
+                {symbol: data[symbol]}
+                if symbol in data
+                else MissingData(f"The response has no data for {symbol}")
+            )
+            for symbol in symbols
+        }
+    if hasattr(data, "index"):
+        # One pass over the frame instead of a lookup per symbol
+        parts = dict(iter(data.groupby(level=0, sort=False)))
+        return {symbol: parts.get(symbol) for symbol in symbols}
+    if data is None:
+        return {symbol: MissingData("The response is empty") for symbol in symbols}
+    # Error strings are passed through unchanged
+    return dict.fromkeys(symbols, data)
+
+
+def _split_statement(data, data_type, symbols):
+    """
+    Split a combined financial data response into each symbol's part of one
+    statement, projected into a FinancialSeries of the statement's fields.
+    """
+    if not isinstance(data, pd.DataFrame):
+        return _split_response(data, symbols)
+    series = financial_series.project(data, STATEMENT_TYPES[data_type])
+    return {symbol: series.get(symbol) for symbol in symbols}
+
+
+def _is_cacheable(value):
+    """Only real data is cached; errors and empty responses are refetched."""
+    if isinstance(value, dict):
+        return bool(value) and all(isinstance(v, dict) for v in value.values())
+    return hasattr(value, "empty") and not value.empty
+
+
+# Statements a screening run may need; all planned statements of one
+# frequency are requested together
+DEFAULT_PLAN = (
+    ("cash_flow", "Annual"),
+    ("balance_sheet", "Annual"),
+    ("balance_sheet", "Quarterly"),
+)
+
+
+class TickerBatch:
+    """
+    Fetch data for a chunk of symbols with one multi-symbol provider request
+    per data type, and hand out per-symbol views of the responses.
+
+    Financial statements are planned ahead: the first request for a statement
+    loads every statement in ``plan`` with the same frequency through a single
+    combined financial data request. Each symbol's statements are kept as
+    compact FinancialSeries, projected from the response as soon as it
+    arrives.
+
+    When a FundamentalsCache is given, only symbols without a fresh cached
+    response are requested. Loads are run off the event loop through
+    ``prefetch``, using the FetchScheduler when one is given; concurrent
+    requests for the same data share one load. The requests of an async
+    provider are awaited on the event loop instead of a thread.
+    """
+
+    def __init__(
+        self, symbols, cache=None, scheduler=None, provider=None, plan=DEFAULT_PLAN
+    ):
+        self.symbols = list(symbols)
+        self.cache = cache
+        self.scheduler = scheduler
+        self.provider = provider or YahooProvider()
+        self.plan = set(plan)
+        self._responses = {}
+        self._pending = {}
+        self._realized = None
+
+    def _group(self, data_type, frequency):
+        """The keys loaded together with one data type and frequency."""
+        key = (data_type, frequency)
+        if data_type not in STATEMENT_TYPES:
+            return [key]
+        return [key] + sorted(
+            other
+            for other in self.plan
+            if other != key
+            and other[0] in STATEMENT_TYPES
+            and other[1] == frequency
+            and other not in self._responses
+            and other not in self._pending
+        )
+
+    def _provider_call(self, symbols, keys):
+        """The timer stage and provider call requesting the keys of one group."""
+        data_type, frequency = keys[0]
+        if data_type in STATEMENT_TYPES:
+            fields = [field for key in keys for field in STATEMENT_TYPES[key[0]]]
+            return f"fetch_financial_data_{frequency.lower()}", functools.partial(
+                self.provider.financial_data, symbols, fields, frequency
+            )
+        stage = "_".join(
+            ["fetch", data_type] + ([frequency.lower()] if frequency else [])
+        )
+        return stage, functools.partial(
+            self.provider.fetch, symbols, data_type, frequency
+        )
 
-# Create a formatter to define the log output format
-formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    def _split(self, response, symbols, keys):
+        registry.increment("provider_requests")
+        return {
+            key: (
+                _split_statement(response, key[0], symbols)
+                if key[0] in STATEMENT_TYPES
+                else _split_response(response, symbols)
+            )
+            for key in keys
+        }
 
-# Get the current program name and set the log file name
-program_name = os.path.splitext(os.path.basename(__file__))[0]
-log_file_name = f"{program_name}.log"
+    def _request(self, symbols, keys):
+        stage, call = self._provider_call(symbols, keys)
+        with registry.timer(stage):
+            response = call()
+        return self._split(response, symbols, keys)
+
+    async def _arequest(self, symbols, keys):
+        stage, call = self._provider_call(symbols, keys)
+        with registry.timer(stage):
+            response = await call()
+        return self._split(response, symbols, keys)
+
+    def _lookup(self, keys):
+        """
+        Split the keys' responses into cached slices and the symbols still to
+        request, or None when nothing is to be requested.
+        """
+        slices = {key: {} for key in keys}
+        missing = {key: set() for key in keys}
+        for key in keys:
+            for symbol in self.symbols:
+                hit = False
+                if self.cache:
+                    hit, value = self.cache.get(symbol, *key)
+                if hit:
+                    slices[key][symbol] = value
+                else:
+                    missing[key].add(symbol)
+
+        requested = [key for key in keys if missing[key]]
+        if requested and self.cache and self.cache.cache_only:
+            # Offline, a miss is an error rather than a symbol without data
+            for key in requested:
+                for symbol in missing[key]:
+                    slices[key][symbol] = NotCached(f"No cached {key[0]} for {symbol}")
+            return slices, missing, None
+        if not requested:
+            return slices, missing, None
+        symbols = [
+            symbol
+            for symbol in self.symbols
+            if any(symbol in missing[key] for key in requested)
+        ]
+        return slices, missing, (symbols, requested)
+
+    def _store(self, slices, missing, responses):
+        for key, fetched in responses.items():
+            fetched = {
+                symbol: value
+                for symbol, value in fetched.items()
+                if symbol in missing[key]
+            }
+            slices[key].update(fetched)
+            if self.cache:
+                self.cache.put_many(
+                    *key,
+                    {
+                        symbol: value
+                        for symbol, value in fetched.items()
+                        if _is_cacheable(value)
+                    },
+                )
 
-# Create a file handler with the program's log file name
-file_handler = RotatingFileHandler(log_file_name, maxBytes=0, backupCount=3)
-file_handler.setFormatter(formatter)
+    def _load(self, keys):
+        slices, missing, request = self._lookup(keys)
+        if request:
+            self._store(slices, missing, self._request(*request))
+        return slices
 
-# Add handler to the logger
-logger.addHandler(file_handler)
+    async def _aload(self, keys):
+        # The cache is synchronous sqlite, kept off the event loop
+        slices, missing, request = await asyncio.to_thread(self._lookup, keys)
+        if request:
+            responses = await self._arequest(*request)
+            await asyncio.to_thread(self._store, slices, missing, responses)
+        return slices
+
+    def _ensure_group(self, keys):
+        keys = [key for key in keys if key not in self._responses]
+        if not keys:
+            return
+        try:
+            self._responses.update(self._load(keys))
+        except Exception as e:
+            # Remember the failure so every symbol in the chunk sees it
+            # without issuing the request again
+            for key in keys:
+                self._responses[key] = e
+
+    async def _aensure_group(self, keys):
+        keys = [key for key in keys if key not in self._responses]
+        if not keys:
+            return
+        try:
+            self._responses.update(await self._aload(keys))
+        except Exception as e:
+            for key in keys:
+                self._responses[key] = e
+
+    def _ensure(self, data_type, frequency):
+        if (data_type, frequency) in self._responses:
+            return
+        if self.provider.is_async:
+            raise RuntimeError(
+                f"{data_type} must be prefetched with an asynchronous provider"
+            )
+        self._ensure_group(self._group(data_type, frequency))
+
+    async def prefetch(self, data_type, frequency=None):
+        """
+        Load a data type for the whole chunk without blocking the event loop.
+        Concurrent callers share a single load.
+        """
+        key = (data_type, frequency)
+        if key in self._responses:
+            return
+        if key not in self._pending:
+            group = self._group(data_type, frequency)
+            if self.provider.is_async and self.scheduler:
+                load = self.scheduler.run_async(self._aensure_group, group)
+            elif self.provider.is_async:
+                load = self._aensure_group(group)
+            elif self.scheduler:
+                load = self.scheduler.run(self._ensure_group, group)
+            else:
+                load = asyncio.to_thread(self._ensure_group, group)
+            future = asyncio.ensure_future(load)
+            for planned in group:
+                self._pending[planned] = future
+        try:
+            await asyncio.shield(self._pending[key])
+        finally:
+            if key in self._responses:
+                self._pending.pop(key, None)
+
+    def fetch(self, data_type, frequency=None):
+        """
+        Return the chunk's responses for a data type as a mapping of symbol to
+        that symbol's slice, requesting them once.
+        """
+        self._ensure(data_type, frequency)
+        response = self._responses[(data_type, frequency)]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def get(self, symbol, data_type, frequency=None):
+        value = self.fetch(data_type, frequency).get(symbol)
+        # Symbols without data have their error instead, see error()
+        return None if isinstance(value, Exception) else value
+
+    def loaded(self, data_type, frequency=None):
+        """Whether a data type was already requested for the chunk."""
+        return (data_type, frequency) in self._responses
+
+    def error(self, data_type, frequency=None, symbol=None):
+        """
+        The exception raised when loading a data type, if it failed, or the
+        one standing in for a symbol's missing data.
+        """
+        response = self._responses.get((data_type, frequency))
+        if symbol is not None and isinstance(response, dict):
+            response = response.get(symbol)
+        return response if isinstance(response, Exception) else None
+
+    def realized_metrics(self):
+        """
+        Realized volatility, max drawdown, low, high and range of every symbol
+        in the chunk, computed once from its daily history.
+        """
+        if self._realized is None:
+            parts = [
+                part
+                for part in self.fetch("history").values()
+                if isinstance(part, pd.DataFrame)
+            ]
+            self._realized = metrics.realized_metrics_by_symbol(
+                pd.concat(parts) if parts else None, self.symbols
+            )
+        return self._realized
+
+    def view(self, symbol):
+        return SymbolView(self, symbol)
+
+
+class SymbolView:
+    """
+    Ticker-like view of a single symbol's slice of a TickerBatch.
+    """
+
+    def __init__(self, batch, symbol):
+        self.batch = batch
+        self.symbols = [symbol]
+
+    async def prefetch(self, *requests):
+        """Load ``(data_type, frequency)`` pairs ahead of the blocking accessors."""
+        await asyncio.gather(*(self.batch.prefetch(*request) for request in requests))
+
+    def loaded(self, *requests):
+        return all(self.batch.loaded(*request) for request in requests)
+
+    def error(self, *requests):
+        for request in requests:
+            error = self.batch.error(*request, symbol=self.symbols[0])
+            if error:
+                return error
+        return None
+
+    @property
+    def summary_detail(self):
+        return self.batch.get(self.symbols[0], "summary_detail") or {}
+
+    @property
+    def price(self):
+        return self.batch.get(self.symbols[0], "price") or {}
+
+    def cash_flow(self, frequency="Annual"):
+        return self.batch.get(self.symbols[0], "cash_flow", frequency)
+
+    def balance_sheet(self, frequency="Annual"):
+        return self.batch.get(self.symbols[0], "balance_sheet", frequency)
+
+    def realized_metrics(self):
+        return self.batch.realized_metrics()
+
+
+async def prefetch(ticker, *requests):
+    """
+    Load data for a Ticker-like object off the event loop when it supports it.
+    """
+    if hasattr(ticker, "prefetch"):
+        await ticker.prefetch(*requests)
 
 
 def fetch_financial_data(ticker, data_type, frequency="Annual"):
     """
-    Fetch financial data for a given ticker.
+    Fetch financial data for a given ticker as a FinancialSeries.
     """
     try:
         data = getattr(ticker, data_type)(frequency=frequency)
+        if isinstance(data, pd.DataFrame):
+            # Plain Ticker responses are projected like those of a TickerBatch
+            data = financial_series.FinancialSeries.from_frame(data)
         if data is None or isinstance(data, str) or data.empty:
             logging.warning(f"No {data_type} data available for {ticker.symbols}")
             return None
@@ -73,9 +433,21 @@ def fetch_financial_data(ticker, data_type, frequency="Annual"):
         return None
 
 
+def fetch_price(ticker, symbol):
+    """
+    Fetch price data for a ticker, or None if the request fails.
+    """
+    try:
+        return ticker.price
+    except Exception as e:
+        logging.error(f"Error fetching price data for {symbol}: {e}")
+        return None
+
+
 def strip_nan(values):
     """Remove NaN values from a list."""
-    return [value for value in values if not math.isnan(value)]
+    values = np.asarray(values, dtype=float)
+    return values[~np.isnan(values)].tolist()
 
 
 def process_financial_data(data, data_key):
@@ -83,8 +455,7 @@ def process_financial_data(data, data_key):
     Process financial data to extract a list of values for a given key.
     """
     try:
-        processed_data = data[["asOfDate", data_key]].set_index("asOfDate")
-        return strip_nan(processed_data[data_key].values)
+        return strip_nan(data[data_key])
     except Exception as e:
         logging.error(f"Error in processing data: {e}")
         return []
@@ -98,8 +469,7 @@ def average_financial_metric(ticker, data_type, data_key):
     if data is None:
         return 0
     try:
-        values = process_financial_data(data, data_key)
-        return statistics.fmean(values) if values else 0
+        return data.mean(data_key)
     except Exception as e:
         logging.error(f"Error calculating average for {data_key}: {e}")
         return 0
@@ -125,9 +495,10 @@ def has_good_return_on_equity(ticker, roe_threshold, verbose=False):
     return average_roe > roe_threshold, average_roe
 
 
-def _has_consistently_low_ratios(ratios, threshold=0.4):
+def _has_consistently_low_ratios(ratios, threshold=metrics.DEBT_EQUITY_THRESHOLD):
     """Check if all ratios are below the threshold."""
-    return all(ratio < threshold or math.isnan(ratio) for ratio in ratios)
+    # NaN compares false, so it never counts as a high ratio
+    return not np.any(np.asarray(ratios, dtype=float) >= threshold)
 
 
 def has_consistently_low_debt_ratios(ticker, verbose):
@@ -141,9 +512,7 @@ def has_consistently_low_debt_ratios(ticker, verbose):
         return False
 
     try:
-        balance_sheet["DebtEquityRatio"] = (
-            balance_sheet["TotalDebt"] / balance_sheet["CommonStockEquity"]
-        )
+        max_ratio = balance_sheet.max_debt_equity()
     except KeyError as e:
         if verbose:
             logging.info(
@@ -151,9 +520,9 @@ def has_consistently_low_debt_ratios(ticker, verbose):
             )
         return False
 
-    debt_equity_ratios = process_financial_data(balance_sheet, "DebtEquityRatio")
-    if not _has_consistently_low_ratios(debt_equity_ratios):
+    if not _has_consistently_low_ratios([max_ratio]):
         if verbose:
+            debt_equity_ratios = strip_nan(balance_sheet.debt_equity_ratios())
             logging.info(
                 f"{ticker.symbols} doesn't have consistently low debt ratios: "
                 f"{debt_equity_ratios}"
@@ -163,15 +532,8 @@ def has_consistently_low_debt_ratios(ticker, verbose):
     return True
 
 
-async def has_processed(symbol, lock, process_interval):
-    async with DatabaseManager(lock=lock) as db:
-        rows = await db.read_data(symbol)
-        if not rows:
-            return False
-
-        symbol, tested_at = rows[0]
-        tested_at = datetime.strptime(tested_at, "%Y-%m-%d %H:%M:%S.%f")
-        return (datetime.now() - tested_at).days < process_interval
+async def has_processed(symbol, db, process_interval):
+    return symbol not in await db.stale_symbols([symbol], process_interval)
 
 
 async def is_volatile(ticker, symbol, threshold=0.5, verbose=False):
@@ -179,6 +541,7 @@ async def is_volatile(ticker, symbol, threshold=0.5, verbose=False):
     Determine if the stock is volatile based on its 52-week high and low.
     """
     try:
+        await prefetch(ticker, ("summary_detail", None))
         summary_detail = ticker.summary_detail
         if symbol not in summary_detail:
             if verbose:
@@ -216,75 +579,389 @@ async def is_volatile(ticker, symbol, threshold=0.5, verbose=False):
         return False, 0, 0, 0
 
 
+async def is_realized_volatile(ticker, symbol, threshold=0.35, verbose=False):
+    """
+    Determine if the stock is volatile based on the annualized volatility of
+    its daily returns over the last year. Returns whether it is and the
+    symbol's realized metrics, empty without price history.
+    """
+    try:
+        await prefetch(ticker, *REALIZED_PREDICATES["volatility"])
+        if hasattr(ticker, "realized_metrics"):
+            table = ticker.realized_metrics()
+        else:
+            table = metrics.realized_metrics_by_symbol(
+                ticker.history(period="1y"), [symbol]
+            )
+        if symbol not in table.index or np.isnan(table.at[symbol, "volatility"]):
+            if verbose:
+                logging.info(f"Error: No price history found for {symbol}")
+            return False, {}
+        stats = {name: float(value) for name, value in table.loc[symbol].items()}
+        return stats["volatility"] >= threshold, stats
+
+    except Exception as e:
+        if verbose:
+            logging.error(f"Error fetching price history for {symbol}: {e}")
+        return False, {}
+
+
 async def test_strong_buy(
-    symbol, roe_threshold, volatility_threshold, verbose, lock, process_interval
+    symbol,
+    roe_threshold,
+    volatility_threshold,
+    verbose,
+    db,
+    ticker=None,
+    scheduler=None,
+    provider=None,
+    evaluate_all=False,
+    predicate_stats=None,
+    run_id=None,
+    volatility_mode="range",
 ):
     """
     Test if a stock is a strong buy based on various financial criteria.
+
+    Callers are expected to skip recently processed symbols, see
+    DatabaseManager.stale_symbols. ``ticker`` may be a SymbolView from a
+    TickerBatch; by default a single-symbol batch is created.
+
+    The computed metrics are stored in the results table. A rejected symbol
+    only has the metrics computed up to its rejection, unless
+    ``evaluate_all`` is set. Sharing one PredicateStats across calls lets the
+    checks be reordered by their observed cost and rejection rate.
+
+    The symbol is only marked as processed once it was fully evaluated; if a
+    request fails, the error is raised. With ``run_id`` its job state is
+    recorded in the journal. ``volatility_mode`` "realized" screens on the
+    realized volatility of the daily history instead of the 52-week range.
     """
-    if await has_processed(symbol, lock, process_interval):
-        logging.info(f"{symbol} has already been processed")
-        return None
-    else:
-        async with DatabaseManager(lock=lock) as db:
-            await db.insert_data(symbol, datetime.now())
+    registry.increment("symbols_screened")
+    screened_at = datetime.now()
+    if run_id:
+        await db.set_job_state(run_id, symbol, "in_flight")
 
-    ticker = Ticker(symbol, asynchronous=True)
-    if verbose:
-        price_data = ticker.price
-        if price_data and symbol in price_data:
-            if isinstance(price_data[symbol], dict):
-                exchange_name = price_data[symbol].get("exchangeName", "Unknown")
-                logging.info(f"{symbol}'s exchange is: {exchange_name}")
-            else:
-                logging.warning(
-                    f"Unexpected data format for {symbol}: {price_data[symbol]}"
-                )
-        else:
-            logging.warning(f"No price data found for {symbol}")
+    if ticker is None:
+        ticker = TickerBatch([symbol], scheduler=scheduler, provider=provider).view(
+            symbol
+        )
+    record = {}
+    try:
+        result = await _evaluate(
+            symbol,
+            ticker,
+            roe_threshold,
+            volatility_threshold,
+            verbose,
+            record,
+            evaluate_all,
+            predicate_stats or PredicateStats(),
+            volatility_mode,
+        )
+    except Exception as e:
+        registry.increment("failed_symbols")
+        if run_id:
+            await db.set_job_state(run_id, symbol, "failed", type(e).__name__)
+        raise
 
-    volatile, volatility, fifty_two_week_low, fifty_two_week_high = await is_volatile(
-        ticker, symbol, threshold=volatility_threshold, verbose=verbose
-    )
+    with registry.timer("db_insert"):
+        await db.insert_data(symbol, screened_at)
+        await db.insert_result(symbol, screened_at, **record)
+        if run_id:
+            await db.set_job_state(run_id, symbol, "done")
+    return result
 
-    if not volatile:
-        if verbose:
+
+# Data each predicate needs, in the default evaluation order. The fcf
+# pre-filter rejects symbols without positive average free cash flow, which
+# can never pass the ROE check, before the annual balance sheet is needed.
+PREDICATES = {
+    "volatility": [("summary_detail", None)],
+    "fcf": [("cash_flow", "Annual")],
+    "roe": [("cash_flow", "Annual"), ("balance_sheet", "Annual")],
+    "debt": [("balance_sheet", "Quarterly")],
+}
+# With --volatility-mode realized, volatility comes from the daily history
+REALIZED_PREDICATES = dict(PREDICATES, volatility=[("history", None)])
+
+
+class PredicateStats:
+    """
+    Observed cost and rejection rate of each predicate during a run.
+
+    ``order`` sorts predicates by expected cost per rejection (mean seconds
+    over rejection rate), so cheap checks that reject most symbols run first.
+    A predicate whose data is already loaded costs nothing, and one that was
+    never evaluated is assumed to cost the average of the others.
+    """
+
+    def __init__(self):
+        self.evaluations = dict.fromkeys(PREDICATES, 0)
+        self.rejections = dict.fromkeys(PREDICATES, 0)
+        self.seconds = dict.fromkeys(PREDICATES, 0.0)
+
+    def record(self, name, seconds, passed):
+        self.evaluations[name] += 1
+        self.rejections[name] += not passed
+        self.seconds[name] += seconds
+
+    def rejection_rate(self, name):
+        # Laplace smoothing keeps unseen predicates at 50%
+        return (self.rejections[name] + 1) / (self.evaluations[name] + 2)
+
+    def cost(self, name):
+        if self.evaluations[name]:
+            return self.seconds[name] / self.evaluations[name]
+        observed = [
+            self.seconds[other] / self.evaluations[other]
+            for other in PREDICATES
+            if self.evaluations[other]
+        ]
+        return sum(observed) / len(observed) if observed else 1.0
+
+    def order(self, names, loaded=()):
+        """Sort predicate names by expected cost per rejection, lowest first."""
+        default = list(PREDICATES)
+
+        def key(name):
+            cost = 0.0 if name in loaded else self.cost(name)
+            rate = self.rejection_rate(name)
+            return (cost / rate, -rate, default.index(name))
+
+        return sorted(names, key=key)
+
+    def summary(self):
+        return {
+            name: {
+                "evaluations": self.evaluations[name],
+                "rejection_rate": round(self.rejection_rate(name), 3),
+                "mean_ms": round(self.cost(name) * 1000, 3),
+            }
+            for name in self.order(PREDICATES)
+        }
+
+
+def _is_loaded(ticker, name, requirements=PREDICATES):
+    """Whether every response a predicate needs was already fetched."""
+    return hasattr(ticker, "loaded") and ticker.loaded(*requirements[name])
+
+
+def _load_error(ticker, name, requirements=PREDICATES):
+    """The error that kept a predicate from getting its data, if any."""
+    return ticker.error(*requirements[name]) if hasattr(ticker, "error") else None
+
+
+async def _evaluate(
+    symbol,
+    ticker,
+    roe_threshold,
+    volatility_threshold,
+    verbose,
+    record,
+    evaluate_all,
+    predicate_stats,
+    volatility_mode="range",
+):
+    """
+    Run the predicates of test_strong_buy in the order predicate_stats
+    expects to be cheapest, filling ``record`` with the metrics as they are
+    computed. The price is only fetched for symbols that pass.
+    """
+    quote = {}
+    requirements = REALIZED_PREDICATES if volatility_mode == "realized" else PREDICATES
+
+    async def volatility():
+        if volatility_mode == "realized":
+            volatile, stats = await is_realized_volatile(
+                ticker, symbol, threshold=volatility_threshold, verbose=verbose
+            )
+            screened = stats.get("volatility", 0)
+            quote.update(realized_volatility=screened)
+            quote.update(max_drawdown=stats.get("max_drawdown", 0))
+            if stats:
+                record.update(
+                    realized_volatility=stats["volatility"],
+                    max_drawdown=stats["max_drawdown"],
+                )
+            # The 52-week fields come from the same history
+            value, low, high = (stats.get(name, 0) for name in ("range", "low", "high"))
+        else:
+            volatile, value, low, high = await is_volatile(
+                ticker, symbol, threshold=volatility_threshold, verbose=verbose
+            )
+            screened = value
+        quote.update(volatility=value, low=low, high=high)
+        if low:
+            record.update(volatility=value, low=low, high=high)
+        if not volatile and verbose:
             logging.info(
-                f"{symbol} is not volatile enough: {round(volatility * 100, 2)}%"
+                f"{symbol} is not volatile enough: {round(screened * 100, 2)}%"
             )
-        return None
+        return volatile
 
-    good_roe, roe = has_good_return_on_equity(ticker, roe_threshold, verbose=verbose)
+    async def fcf():
+        await prefetch(ticker, *PREDICATES["fcf"])
+        average_fcf = average_financial_metric(ticker, "cash_flow", "FreeCashFlow")
+        if average_fcf <= 0:
+            record["roe"] = 0
+            if verbose:
+                logging.info(f"{symbol} has no positive free cash flow")
+            return False
+        return True
 
-    if not good_roe:
-        if verbose:
+    async def roe():
+        await prefetch(ticker, *PREDICATES["roe"])
+        good_roe, record["roe"] = has_good_return_on_equity(
+            ticker, roe_threshold, verbose=verbose
+        )
+        if not good_roe and verbose:
             logging.info(
-                f"{symbol} doesn't have good return on equity: {round(roe * 100, 2)}%"
+                f"{symbol} doesn't have good return on equity: "
+                f"{round(record['roe'] * 100, 2)}%"
             )
-        return None
+        return good_roe
 
-    if not has_consistently_low_debt_ratios(ticker, verbose=verbose):
-        if verbose:
+    async def debt():
+        await prefetch(ticker, *PREDICATES["debt"])
+        record["low_debt"] = has_consistently_low_debt_ratios(ticker, verbose=verbose)
+        if not record["low_debt"] and verbose:
             logging.info(f"{symbol} doesn't have consistently low debt ratios")
+        return record["low_debt"]
+
+    checks = {"volatility": volatility, "fcf": fcf, "roe": roe, "debt": debt}
+    remaining = list(PREDICATES)
+    passed = True
+    while remaining:
+        # Re-planned after every check: data may have arrived in the meantime
+        loaded = [name for name in remaining if _is_loaded(ticker, name, requirements)]
+        name = predicate_stats.order(remaining, loaded)[0]
+        remaining.remove(name)
+        if name == "roe" and "fcf" in remaining:
+            # The ROE check covers the pre-filter
+            remaining.remove("fcf")
+
+        start = time.perf_counter()
+        with registry.timer(f"predicate_{name}"):
+            ok = await checks[name]()
+        # A failed request is not a rejection; the symbol must be screened again
+        error = not ok and _load_error(ticker, name, requirements)
+        if error:
+            raise error
+        predicate_stats.record(name, time.perf_counter() - start, ok)
+        if not ok:
+            registry.increment(f"rejected_{name}")
+            passed = False
+            if not evaluate_all:
+                return None
+    if not passed:
         return None
 
+    roe = record["roe"]
     logging.info(f"{symbol} has a strong business with ROE: {round(roe * 100, 2)}%")
-    price_data = ticker.price
+    registry.increment("strong_businesses")
+    with registry.timer("price"):
+        await prefetch(ticker, ("price", None))
+        price_data = fetch_price(ticker, symbol)
     if price_data and symbol in price_data and isinstance(price_data[symbol], dict):
         market = price_data[symbol].get("exchangeName", "Unknown")
     else:
         market = "Unknown"
-    return {
+    if verbose:
+        logging.info(f"{symbol}'s exchange is: {market}")
+    record["market"] = market
+    result = {
         "Symbol": symbol,
         "ROE": round(roe * 100, 2),
-        "Volatility": round(volatility * 100, 2),
-        "52-week Low": fifty_two_week_low,
-        "52-week High": fifty_two_week_high,
-        "Market": market,
+        "Volatility": round(quote["volatility"] * 100, 2),
+        "52-week Low": quote["low"],
+        "52-week High": quote["high"],
     }
+    if "realized_volatility" in quote:
+        result["Realized Volatility"] = round(quote["realized_volatility"] * 100, 2)
+        result["Max Drawdown"] = round(quote["max_drawdown"] * 100, 2)
+    result["Market"] = market
+    return result
+
 
+async def screen_chunk(
+    symbols,
+    roe_threshold,
+    volatility_threshold,
+    verbose,
+    db,
+    cache=None,
+    scheduler=None,
+    provider=None,
+    on_result=None,
+    evaluate_all=False,
+    predicate_stats=None,
+    run_id=None,
+    max_attempts=1,
+    retry_backoff=1.0,
+    volatility_mode="range",
+):
+    """
+    Screen a chunk of symbols, sharing one multi-symbol request per data type.
 
-async def main():
+    Returns the strong businesses in the order they finished; ``on_result`` is
+    called with each one as soon as it is known. Symbols whose requests fail
+    are screened again in a new batch, up to ``max_attempts`` times in all,
+    waiting ``retry_backoff`` seconds before the first retry and twice as long
+    before each next one.
+    """
+    results = []
+
+    async def attempt(batch, symbol):
+        try:
+            result = await test_strong_buy(
+                symbol,
+                roe_threshold,
+                volatility_threshold,
+                verbose,
+                db,
+                ticker=batch.view(symbol),
+                scheduler=scheduler,
+                evaluate_all=evaluate_all,
+                predicate_stats=predicate_stats,
+                run_id=run_id,
+                volatility_mode=volatility_mode,
+            )
+            return symbol, result, None
+        except Exception as e:
+            return symbol, None, e
+
+    for attempt_number in range(1, max_attempts + 1):
+        batch = TickerBatch(
+            symbols, cache=cache, scheduler=scheduler, provider=provider
+        )
+        failed = []
+        for test in asyncio.as_completed([attempt(batch, s) for s in symbols]):
+            symbol, result, error = await test
+            if isinstance(error, NotCached):
+                # Screening again cannot help; the symbol stays unprocessed
+                logging.warning(f"Screening {symbol} skipped: {error}")
+            elif error:
+                failed.append(symbol)
+                logging.warning(f"Screening {symbol} failed: {error!r}")
+            elif result is not None:
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        if not failed or attempt_number == max_attempts:
+            break
+        registry.increment("retries", len(failed))
+        await asyncio.sleep(retry_backoff * 2 ** (attempt_number - 1))
+        symbols = failed
+    return results
+
+
+# Default minimum volatility of each --volatility-mode. Realized volatility
+# of daily returns is typically well below the 52-week range.
+VOLATILITY_THRESHOLDS = {"range": 0.7, "realized": 0.35}
+
+
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(
         description="Test if a stock has a strong business."
     )
@@ -297,52 +974,706 @@ async def main():
     parser.add_argument(
         "--volatility-threshold",
         type=float,
-        default=0.7,
-        help="Minimum volatility threshold",
+        help="Minimum volatility threshold (default: 0.7, or 0.35 with "
+        "--volatility-mode realized)",
+    )
+    parser.add_argument(
+        "--volatility-mode",
+        choices=["range", "realized"],
+        default="range",
+        help="Screen on the 52-week range, or on the annualized realized "
+        "volatility of a year of daily prices (default: range)",
     )
     parser.add_argument(
         "-c",
         "--csv-file",
         type=str,
-        default="Results.csv",
-        help="Path to the input CSV file",
+        nargs="+",
+        default=["Results.csv"],
+        help="Paths to the input CSV files, - for stdin",
     )  # Added argument for CSV file
     parser.add_argument(
         "--process-interval",
         type=int,
-        default=180,
-        help="Number of days before reprocessing a symbol (default: 180)",
-    )
-    args = parser.parse_args()
-
-    lock = asyncio.Lock()
-    tasks = []
-
-    # Use the passed CSV file path
-    with open(args.csv_file, newline="", encoding="utf-8-sig") as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            symbol = row["Symbol"].strip()
-            tasks.append(
-                test_strong_buy(
-                    symbol,
-                    args.roe_threshold,
-                    args.volatility_threshold,
-                    args.verbose,
-                    lock,
-                    args.process_interval,
+        help="Number of days before reprocessing a symbol (default: 180, or 0 "
+        "with --cache-only)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Number of symbols fetched per multi-symbol request (default: 50)",
+    )
+    parser.add_argument(
+        "--concurrent-chunks",
+        type=int,
+        default=4,
+        help="Number of chunks screened at the same time (default: 4)",
+    )
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument(
+        "--cache-only",
+        action="store_true",
+        help="Use only cached fundamentals and never contact Yahoo",
+    )
+    cache_mode.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Ignore cached fundamentals and fetch everything again",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=256,
+        help="Size cap of the fundamentals cache in megabytes (default: 256)",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=8,
+        help="Maximum number of Yahoo requests in flight (default: 8)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=2.0,
+        help="Maximum Yahoo requests per second, 0 to disable (default: 2)",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=5,
+        help="Number of requests allowed above the rate limit in a burst (default: 5)",
+    )
+    parser.add_argument(
+        "--db-batch-size",
+        type=int,
+        default=100,
+        help="Number of database writes committed together (default: 100)",
+    )
+    parser.add_argument(
+        "--db-flush-ms",
+        type=int,
+        default=500,
+        help="Maximum time buffered database writes wait, in ms (default: 500)",
+    )
+    parser.add_argument(
+        "--provider",
+        choices=sorted(PROVIDERS),
+        default="yahoo",
+        help="Data source; yahoo-http requests Yahoo over one pooled async "
+        "HTTP session, synthetic generates deterministic offline data",
+    )
+    parser.add_argument(
+        "--http-connections",
+        type=int,
+        default=8,
+        help="Pooled connections per host of the yahoo-http provider (default: 8)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the synthetic provider"
+    )
+    parser.add_argument(
+        "--synthetic-latency",
+        type=float,
+        default=0.0,
+        help="Seconds the synthetic provider sleeps per request",
+    )
+    parser.add_argument(
+        "--synthetic-error-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a synthetic provider request fails",
+    )
+    parser.add_argument(
+        "--synthetic-stall-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a synthetic provider request hangs",
+    )
+    parser.add_argument(
+        "--synthetic-stall",
+        type=float,
+        default=60.0,
+        help="Seconds a hanging synthetic provider request takes (default: 60)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=30.0,
+        help="Seconds before a data request is abandoned (default: 30)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Retries of a failed data request, with jittered exponential "
+        "backoff (default: 2)",
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=float,
+        default=0.2,
+        help="Maximum share of data requests that may be retries (default: 0.2)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Duplicate data requests slower than the p95 latency and use the "
+        "first answer",
+    )
+    parser.add_argument(
+        "--breaker-threshold",
+        type=float,
+        default=0.5,
+        help="Failure rate of recent requests that pauses fetching, 0 to "
+        "disable (default: 0.5)",
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=30.0,
+        help="Seconds fetching pauses when the breaker opens (default: 30)",
+    )
+    parser.add_argument(
+        "--db-path",
+        default="test.db",
+        help="Path to the SQLite database (default: test.db)",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="Write stage timings and counters to <path>.json and <path>.prom",
+    )
+    parser.add_argument(
+        "--stall-threshold-ms",
+        type=int,
+        default=100,
+        help="Report event loop stalls longer than this many ms (default: 100)",
+    )
+    parser.add_argument(
+        "--min-market-cap",
+        type=parse_amount,
+        help="Skip symbols whose CSV market capitalization is below this, "
+        "e.g. 2B or 500M",
+    )
+    parser.add_argument(
+        "--max-pct-above-low",
+        type=float,
+        help="Skip symbols more than this many percent above their 52-week low "
+        "in the CSV",
+    )
+    parser.add_argument(
+        "--market-cap-bucket",
+        nargs="+",
+        type=str.lower,
+        choices=MARKET_CAP_BUCKETS,
+        help="Only screen symbols in these CSV market cap buckets",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes screening hash shards of the universe "
+        "(default: 1)",
+    )
+    parser.add_argument(
+        "--evaluate-all",
+        action="store_true",
+        help="Compute every metric even for rejected symbols, so sweep.py can "
+        "answer any threshold exactly",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Append every strong business to this .jsonl or .csv file as soon "
+        "as it is found",
+    )
+    parser.add_argument(
+        "--report",
+        help="Write the final report, best ROE first, to this .csv or .md file "
+        "instead of the log",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the latest unfinished run with its input files and "
+        "thresholds",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Number of times a symbol whose requests fail is screened (default: 3)",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=1.0,
+        help="Seconds before the first retry of failed symbols, doubled for "
+        "each next one (default: 1)",
+    )
+    parser.set_defaults(shard=None, run_id=None)
+    args = parser.parse_args(argv)
+    if args.volatility_threshold is None:
+        args.volatility_threshold = VOLATILITY_THRESHOLDS[args.volatility_mode]
+    if args.process_interval is None:
+        # Offline re-screens are about the symbols screened before
+        args.process_interval = 0 if args.cache_only else 180
+    if args.workers > 1 and "-" in args.csv_file:
+        parser.error("stdin can only be read with --workers 1")
+    return args
+
+
+def iter_symbol_blocks(source, block_size=1000, filters=None):
+    """
+    Yield lists of symbols read from a universe CSV file, or from stdin when
+    source is "-". With ``filters``, only symbols passing prescreen on the
+    file's other columns are yielded.
+    """
+    if source == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    else:
+        source = os.path.expanduser(source)
+    # Everything is text, and symbols such as "NA" must not become NaN
+    with pd.read_csv(
+        source,
+        dtype=str,
+        keep_default_na=False,
+        encoding="utf-8-sig",
+        chunksize=block_size,
+    ) as reader:
+        for block in reader:
+            if filters:
+                size = len(block)
+                block = prescreen(block, **filters)
+                registry.increment("prescreened_out", size - len(block))
+            yield block["Symbol"].str.strip().tolist()
+
+
+def shard_of(symbol, shards):
+    """Stable shard index of a symbol, the same in every process."""
+    return zlib.crc32(symbol.encode()) % shards
+
+
+async def produce_symbols(sources, queue, consumers, shard=None, filters=None):
+    """
+    Stream the symbols of every source into a bounded queue, skipping
+    duplicates, then put one None per consumer to signal the end.
+
+    With ``shard`` set to (index, count), only the symbols of that shard are
+    queued. ``filters`` are passed on to prescreen.
+    """
+    seen = set()
+    try:
+        for source in sources:
+            blocks = iter_symbol_blocks(source, filters=filters)
+            # File reads happen off the event loop, one block at a time
+            while block := await asyncio.to_thread(next, blocks, None):
+                for symbol in block:
+                    if shard and shard_of(symbol, shard[1]) != shard[0]:
+                        continue
+                    if symbol in seen:
+                        registry.increment("duplicate_symbols")
+                        continue
+                    seen.add(symbol)
+                    logging.info(f"Processing ticker: {symbol}")
+                    await queue.put(symbol)
+    finally:
+        for _ in range(consumers):
+            await queue.put(None)
+
+
+async def screen_worker(queue, args, db, **chunk_options):
+    """
+    Take chunks of up to batch_size symbols off the queue and screen those
+    that were not processed recently, until the producer signals the end.
+    """
+    done = False
+    while not done:
+        chunk = []
+        while len(chunk) < args.batch_size:
+            symbol = await queue.get()
+            if symbol is None:
+                done = True
+                break
+            chunk.append(symbol)
+        if not chunk:
+            continue
+
+        with registry.timer("stale_symbols"):
+            # A resumed run skips the symbols it finished before, even when
+            # every symbol is due again
+            stale = await db.stale_symbols(
+                chunk, args.process_interval, run_id=args.run_id
+            )
+        registry.increment("already_processed", len(chunk) - len(stale))
+        chunk = [symbol for symbol in chunk if symbol in stale]
+        if args.run_id:
+            for symbol in chunk:
+                await db.set_job_state(args.run_id, symbol, "pending")
+        if chunk:
+            await screen_chunk(
+                chunk,
+                args.roe_threshold,
+                args.volatility_threshold,
+                args.verbose,
+                db,
+                run_id=args.run_id,
+                max_attempts=args.max_attempts,
+                retry_backoff=args.retry_backoff,
+                **chunk_options,
+            )
+
+
+# Options that decide which symbols a run screens and how; a resumed run
+# keeps those of the run it continues
+RUN_OPTIONS = (
+    "csv_file",
+    "roe_threshold",
+    "volatility_threshold",
+    "volatility_mode",
+    "process_interval",
+    "min_market_cap",
+    "max_pct_above_low",
+    "market_cap_bucket",
+    "evaluate_all",
+)
+
+
+async def open_run(args, db):
+    """
+    Start a run in the job journal, or with ``--resume`` continue the latest
+    unfinished one, and return the arguments with its ``run_id``.
+    """
+    if args.resume:
+        run = await db.unfinished_run()
+        if run:
+            run_id, options = run
+            logging.info(f"Resuming run {run_id}: {await db.job_counts(run_id)}")
+            return argparse.Namespace(**{**vars(args), **options, "run_id": run_id})
+        logging.warning("No unfinished run to resume, starting a new one")
+    run_id = await db.start_run({name: getattr(args, name) for name in RUN_OPTIONS})
+    return argparse.Namespace(**{**vars(args), "run_id": run_id})
+
+
+async def close_run(args, db):
+    """Mark the run as finished and log how many symbols ended in each state."""
+    logging.info(f"Run {args.run_id}: {await db.job_counts(args.run_id)}")
+    await db.finish_run(args.run_id)
+
+
+def prescreen_filters(args):
+    """The pre-screen filters selected on the command line, for prescreen."""
+    return {
+        "min_market_cap": args.min_market_cap,
+        "max_pct_above_low": args.max_pct_above_low,
+        "buckets": args.market_cap_bucket,
+    }
+
+
+def make_breaker(args):
+    """The circuit breaker of the arguments, or None when it is disabled."""
+    if not args.breaker_threshold:
+        return None
+    return CircuitBreaker(
+        threshold=args.breaker_threshold, cooldown=args.breaker_cooldown
+    )
+
+
+def make_resilient(provider, args):
+    """Wrap a provider with the deadlines, retries and breaker of the arguments."""
+    if provider.is_async:
+        # Async providers apply a RequestPolicy to each of their own requests
+        return provider
+    return ResilientProvider(
+        provider,
+        deadline=args.deadline,
+        retries=args.retries,
+        retry_budget=args.retry_budget,
+        hedge=args.hedge,
+        breaker=make_breaker(args),
+        # Room for a hedged duplicate of every request
+        max_workers=2 * args.max_concurrency,
+    )
+
+
+def make_provider(args):
+    """Create the data provider selected on the command line."""
+    if args.provider == "synthetic":
+        return get_provider(
+            "synthetic",
+            seed=args.seed,
+            latency=args.synthetic_latency,
+            error_rate=args.synthetic_error_rate,
+            stall_rate=args.synthetic_stall_rate,
+            stall=args.synthetic_stall,
+        )
+    if args.provider == "yahoo-http":
+        # It requests each symbol on its own, so the rate limit, retries and
+        # breaker apply per HTTP request rather than per chunk
+        policy = RequestPolicy(
+            limiter=(
+                TokenBucket(args.rate_limit, args.burst) if args.rate_limit else None
+            ),
+            retries=args.retries,
+            retry_budget=args.retry_budget,
+            hedge=args.hedge,
+            breaker=make_breaker(args),
+        )
+        return get_provider(
+            "yahoo-http",
+            connections_per_host=args.http_connections,
+            timeout=args.deadline,
+            policy=policy,
+        )
+    return get_provider(args.provider)
+
+
+async def close_provider(provider):
+    """Release the threads or connections held by a provider."""
+    if provider.is_async:
+        await provider.aclose()
+    else:
+        provider.close()
+
+
+def _run_results(args, strong_businesses):
+    """
+    Return the results of this run: those it wrote to ``args.output``,
+    including the ones written before a resumed run was interrupted, updated
+    with ``strong_businesses``. Results of other runs into the file are left
+    out.
+    """
+    results = read_results(args.output, args.run_id) + strong_businesses
+    return list({result["Symbol"]: result for result in results}.values())
+
+
+async def screen(args, db=None, provider=None, on_result=None):
+    """
+    Screen the universe described by parsed command line arguments and return
+    the strong businesses, best ROE first.
+
+    A DatabaseManager or DataProvider may be passed in to use instead of the
+    ones configured by the arguments; both are ignored with several workers.
+    ``on_result`` is called with every strong business as soon as it is found.
+    """
+    if args.workers > 1:
+        return await screen_sharded(args)
+    if provider is None:
+        provider = make_provider(args)
+    provider = make_resilient(provider, args)
+    cache = FundamentalsCache(
+        args.db_path,
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        cache_only=args.cache_only,
+        refresh=args.refresh_cache,
+    )
+    scheduler = FetchScheduler(
+        max_concurrency=args.max_concurrency,
+        # Async providers limit the rate of their own requests
+        rate=None if provider.is_async else args.rate_limit,
+        burst=args.burst,
+    )
+    reporter = asyncio.create_task(scheduler.report())
+    stall_detector = StallDetector(registry, threshold=args.stall_threshold_ms / 1000)
+    stall_detector.start()
+    # One connection is shared by every symbol for the whole run
+    if db is None:
+        db = DatabaseManager(
+            args.db_path,
+            batch_size=args.db_batch_size,
+            flush_interval=args.db_flush_ms / 1000,
+        )
+    # Symbols stream through a bounded queue, so memory stays flat however
+    # large the universe is
+    queue = asyncio.Queue(maxsize=2 * args.batch_size * args.concurrent_chunks)
+    strong_businesses = []
+    sink = None
+    predicate_stats = PredicateStats()
+    owns_run = args.run_id is None
+    start = time.perf_counter()
+
+    def emit(result):
+        if not strong_businesses:
+            registry.observe("time_to_first_result", time.perf_counter() - start)
+        strong_businesses.append(result)
+        if sink:
+            sink.write(result)
+        if on_result:
+            on_result(result)
+
+    async with db:
+        if owns_run:
+            args = await open_run(args, db)
+        if args.output:
+            sink = ResultSink(args.output, args.run_id)
+        await asyncio.gather(
+            produce_symbols(
+                args.csv_file,
+                queue,
+                args.concurrent_chunks,
+                shard=args.shard,
+                filters=prescreen_filters(args),
+            ),
+            *(
+                screen_worker(
+                    queue,
+                    args,
+                    db,
+                    # Synthetic data must never end up in the fundamentals cache
+                    cache=cache if args.provider != "synthetic" else None,
+                    scheduler=scheduler,
+                    provider=provider,
+                    on_result=emit,
+                    evaluate_all=args.evaluate_all,
+                    predicate_stats=predicate_stats,
+                    volatility_mode=args.volatility_mode,
+                )
+                for _ in range(args.concurrent_chunks)
+            ),
+        )
+        if owns_run:
+            await close_run(args, db)
+    logging.info(
+        f"{registry.counters.get('already_processed', 0)} symbols were already "
+        "processed"
+    )
+    reporter.cancel()
+    stall_detector.stop()
+    scheduler.shutdown()
+    await close_provider(provider)
+    logging.info(f"Fetch scheduler: {scheduler.stats()}")
+    logging.info(f"Predicates: {predicate_stats.summary()}")
+    logging.info(f"Fundamentals cache: {cache.hits} hits, {cache.misses} misses")
+    registry.increment("cache_hits", cache.hits)
+    registry.increment("cache_misses", cache.misses)
+    cache.close()
+    if args.metrics_out:
+        registry.write(args.metrics_out)
+    if sink:
+        sink.close()
+        strong_businesses = _run_results(args, strong_businesses)
+    strong_businesses.sort(key=lambda x: x["ROE"], reverse=True)
+    return strong_businesses
+
+
+def _screen_shard(args, index, results, log_queue, log_level):
+    """
+    Screen one shard in a worker process and return its run metrics. Log
+    records are sent to the parent process, which writes them.
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(log_level)
+    # The parent process writes the output and metrics of the whole run
+    args = argparse.Namespace(
+        **{
+            **vars(args),
+            "workers": 1,
+            "shard": (index, args.workers),
+            "output": None,
+            "metrics_out": None,
+        }
+    )
+    registry.reset()
+    asyncio.run(screen(args, on_result=results.put))
+    return registry.snapshot()
+
+
+async def screen_sharded(args):
+    """
+    Screen the universe with ``args.workers`` processes, each reading every
+    input file but screening only the symbols of its hash shard with its own
+    event loop. Results stream back to this process, which writes the output
+    and merges the metrics of every shard.
+    """
+    # Create the tables once, before several processes race to do it
+    async with DatabaseManager(args.db_path) as db:
+        args = await open_run(args, db)
+    FundamentalsCache(args.db_path).close()
+
+    strong_businesses = []
+    sink = ResultSink(args.output, args.run_id) if args.output else None
+    context = multiprocessing.get_context("spawn")
+    loop = asyncio.get_running_loop()
+    with context.Manager() as manager, ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=context
+    ) as pool:
+        results = manager.Queue()
+        log_queue = manager.Queue()
+        root = logging.getLogger()
+        listener = logging.handlers.QueueListener(
+            log_queue, *root.handlers, respect_handler_level=True
+        )
+        listener.start()
+
+        async def collect():
+            while (result := await asyncio.to_thread(results.get)) is not None:
+                strong_businesses.append(result)
+                if sink:
+                    sink.write(result)
+
+        collector = asyncio.create_task(collect())
+        try:
+            snapshots = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        pool,
+                        _screen_shard,
+                        args,
+                        index,
+                        results,
+                        log_queue,
+                        root.level,
+                    )
+                    for index in range(args.workers)
                 )
             )
-            logging.info(f"Processing ticker: {symbol}")
+        finally:
+            results.put(None)
+            await collector
+            listener.stop()
+
+    async with DatabaseManager(args.db_path) as db:
+        await close_run(args, db)
+    for index, snapshot in enumerate(snapshots):
+        counters = snapshot["counters"]
+        logging.info(
+            f"Shard {index}: {counters.get('symbols_screened', 0)} screened, "
+            f"{counters.get('strong_businesses', 0)} strong businesses"
+        )
+        registry.merge(snapshot)
+    if args.metrics_out:
+        registry.write(args.metrics_out)
+    if sink:
+        sink.close()
+        strong_businesses = _run_results(args, strong_businesses)
+    strong_businesses.sort(key=lambda x: x["ROE"], reverse=True)
+    return strong_businesses
+
 
-    results = await asyncio.gather(*tasks)
-    strong_businesses = [result for result in results if result is not None]
+def write_report(strong_businesses, path):
+    """Write the final report as CSV for a .csv path, as Markdown otherwise."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        report = format_table_csv(strong_businesses)
+    else:
+        report = format_table_markdown(strong_businesses) + "\n"
+    with open(path, "w", newline="") as f:
+        f.write(report)
+    logging.info(f"Wrote {len(strong_businesses)} strong businesses to {path}")
 
-    if strong_businesses:
-        strong_businesses.sort(key=lambda x: x["ROE"], reverse=True)
+
+def main(argv=None):
+    args = parse_args(argv)
+    strong_businesses = asyncio.run(screen(args))
+    if args.report:
+        write_report(strong_businesses, args.report)
+    elif strong_businesses:
         markdown_table = format_table_markdown(strong_businesses)
         logging.info(f"\n{markdown_table}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    import cli
+
+    sys.exit(cli.main(["screen", *sys.argv[1:]]))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import logging
+import sys
+
+from database import RESULT_COLUMNS, DatabaseManager
+
+# Stored volatility of each screening --volatility-mode
+VOLATILITY_COLUMNS = {"range": "volatility", "realized": "realized_volatility"}
+
+
+def thresholds(bounds, steps):
+    """``steps`` evenly spaced thresholds from the first to the last bound."""
+    import numpy as np
+
+    low, high = bounds
+    return np.linspace(low, high, max(steps, 1) if high != low else 1)
+
+
+def format_grid(grid, roe_thresholds, volatility_thresholds):
+    """Markdown table of pass counts, one row per ROE threshold."""
+    header = "| ROE \\ Volatility | " + " | ".join(
+        f"{threshold:.0%}" for threshold in volatility_thresholds
+    )
+    separator = "| --- | " + " | ".join("---" for _ in volatility_thresholds)
+    rows = [
+        f"| {threshold:.0%} | " + " | ".join(str(count) for count in counts)
+        for threshold, counts in zip(roe_thresholds, grid)
+    ]
+    return "\n".join([header + " |", separator + " |"] + [row + " |" for row in rows])
+
+
+async def sweep(
+    db_path,
+    roe_range,
+    volatility_range,
+    steps=5,
+    ignore_debt=False,
+    list_symbols=False,
+    volatility_mode="range",
+):
+    """
+    Answer threshold questions from the results table without fetching.
+
+    Returns the ROE thresholds, volatility thresholds and the grid of pass
+    counts over them, plus the (symbol, roe, volatility) rows whose ROE and
+    volatility both lie inside the ranges when ``list_symbols`` is set.
+    ``volatility_mode`` "realized" uses the stored realized volatility
+    instead of the 52-week range.
+    """
+    # Imported here so that the command starts without numpy and pandas
+    import numpy as np
+
+    import metrics
+
+    roe_thresholds = thresholds(roe_range, steps)
+    volatility_thresholds = thresholds(volatility_range, steps)
+    low_debt = None if ignore_debt else True
+    column = VOLATILITY_COLUMNS[volatility_mode]
+    async with DatabaseManager(db_path) as db:
+        # Nothing below the lowest thresholds can pass any combination
+        rows = await db.read_results(
+            roe_range=(roe_thresholds.min(), None),
+            volatility_range=(volatility_thresholds.min(), None),
+            low_debt=low_debt,
+            volatility_column=column,
+        )
+        matches = []
+        if list_symbols:
+            matches = await db.read_results(
+                roe_range=roe_range,
+                volatility_range=volatility_range,
+                low_debt=low_debt,
+                volatility_column=column,
+            )
+
+    index = 1 + RESULT_COLUMNS.index(column)
+    roe = np.array([row[1] for row in rows], dtype=float)
+    volatility = np.array([row[index] for row in rows], dtype=float)
+    grid = metrics.pass_count_grid(
+        roe, volatility, roe_thresholds, volatility_thresholds
+    )
+    return (
+        roe_thresholds,
+        volatility_thresholds,
+        grid,
+        [(row[0], row[1], row[index]) for row in matches],
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Count the symbols passing a grid of screening thresholds "
+        "using the stored results, without fetching anything."
+    )
+    parser.add_argument(
+        "--db-path",
+        default="test.db",
+        help="Path to the SQLite database (default: test.db)",
+    )
+    parser.add_argument(
+        "--roe-range",
+        type=float,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        default=[0.1, 0.3],
+        help="Range of ROE thresholds (default: 0.1 0.3)",
+    )
+    parser.add_argument(
+        "--volatility-range",
+        type=float,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        default=[0.3, 1.0],
+        help="Range of volatility thresholds (default: 0.3 1.0)",
+    )
+    parser.add_argument(
+        "--volatility-mode",
+        choices=sorted(VOLATILITY_COLUMNS),
+        default="range",
+        help="Sweep the 52-week range, or the realized volatility stored by "
+        "runs with --volatility-mode realized (default: range)",
+    )
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=5,
+        help="Number of thresholds per range (default: 5)",
+    )
+    parser.add_argument(
+        "--ignore-debt",
+        action="store_true",
+        help="Count symbols whatever their debt ratios",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Also list the symbols with ROE and volatility inside both ranges",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    roe_thresholds, volatility_thresholds, grid, matches = asyncio.run(
+        sweep(
+            args.db_path,
+            args.roe_range,
+            args.volatility_range,
+            steps=args.steps,
+            ignore_debt=args.ignore_debt,
+            list_symbols=args.list,
+            volatility_mode=args.volatility_mode,
+        )
+    )
+    logging.info(
+        "Symbols passing each threshold combination:\n"
+        + format_grid(grid, roe_thresholds, volatility_thresholds)
+    )
+    if args.list:
+        logging.info(
+            f"{len(matches)} symbols with ROE in {args.roe_range} and volatility "
+            f"in {args.volatility_range}: "
+            + ", ".join(
+                f"{symbol} ({roe:.1%}, {volatility:.1%})"
+                for symbol, roe, volatility in matches
+            )
+        )
+
+
+if __name__ == "__main__":
+    import cli
+
+    sys.exit(cli.main(["sweep", *sys.argv[1:]]))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+import logging
+import tempfile
+import unittest
+
+from benchmark import compare, percentile, run_end_to_end, run_micro
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self):
+        level = logging.getLogger().level
+        self.addCleanup(logging.getLogger().setLevel, level)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_compare(self):
+        baseline = {
+            "end_to_end_1000": {
+                "symbols_per_sec": 100.0,
+                "p99_latency_ms": 10.0,
+                "db_transactions": 10,
+                "strong_businesses": 5,
+            }
+        }
+        results = {
+            "end_to_end_1000": {
+                "symbols_per_sec": 70.0,
+                "p99_latency_ms": 11.0,
+                "db_transactions": 20,
+                "strong_businesses": 50,
+            },
+            "new_benchmark": {"seconds": 1.0},
+        }
+        regressions = compare(results, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("end_to_end_1000.symbols_per_sec"))
+        self.assertTrue(regressions[1].startswith("end_to_end_1000.db_transactions"))
+
+    def test_end_to_end(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            result = run_end_to_end(60, workdir)
+        self.assertEqual(result["symbols"], 60)
+        self.assertGreater(result["symbols_per_sec"], 0)
+        self.assertLessEqual(result["p50_latency_ms"], result["p99_latency_ms"])
+        # Two chunks of 50 need far fewer requests than symbols
+        self.assertLess(result["provider_requests"], 20)
+        self.assertLess(result["db_transactions"], 10)
+
+    def test_micro(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run_micro(workdir, size=200)
+        self.assertEqual(results["db_insert_buffered"]["db_transactions"], 2)
+        self.assertIn("metrics_vectorized", results)
+        self.assertIn("db_refresh", results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_python(code, cwd):
+    """Run code in a fresh interpreter and return its stdout."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": PACKAGE_DIR},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+
+    def test_import_has_no_side_effects(self):
+        """Test that importing the modules neither logs nor loads yahooquery"""
+        output = run_python(
+            "import logging, sys\n"
+            "import database, stats, strong_business_tester, sweep\n"
+            "print(len(logging.getLogger().handlers), 'yahooquery' in sys.modules)",
+            self.tmpdir,
+        )
+        self.assertEqual(output.split(), ["0", "False"])
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_light_commands_skip_heavy_imports(self):
+        """Test that help and database commands load neither pandas nor numpy"""
+        for argv in [
+            ["--help"],
+            ["stats", "--db-path", "cli.db"],
+            ["refresh", "-c", "symbols.csv", "--db-path", "cli.db", "--dry-run"],
+            ["sweep", "--help"],
+        ]:
+            with open(os.path.join(self.tmpdir, "symbols.csv"), "w") as f:
+                f.write("Symbol\nAAPL\n")
+            output = run_python(
+                "import sys, cli\n"
+                "try:\n"
+                f"    cli.main({argv!r})\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                "print('pandas' in sys.modules, 'numpy' in sys.modules)",
+                self.tmpdir,
+            )
+            self.assertEqual(output.split()[-2:], ["False", "False"], argv)
+
+    def test_screen(self):
+        """Test that the screen command logs to its file and writes the report"""
+        with open(os.path.join(self.tmpdir, "symbols.csv"), "w") as f:
+            f.write("Symbol\n" + "\n".join(f"S{i:03d}" for i in range(50)) + "\n")
+        run_python(
+            "import cli\n"
+            "cli.main(['screen', '-c', 'symbols.csv', '--provider', 'synthetic', "
+            "'--db-path', 'cli.db', '--rate-limit', '0', '--report', 'report.md'])",
+            self.tmpdir,
+        )
+        with open(os.path.join(self.tmpdir, "strong_business_tester.log")) as f:
+            self.assertIn("Run 1: {'done': 50}", f.read())
+        with open(os.path.join(self.tmpdir, "report.md")) as f:
+            self.assertTrue(f.read().startswith("| Symbol | ROE |"))
+
+    def test_screen_shards_log_to_the_file(self):
+        """Test that the records of worker processes reach the log file"""
+        with open(os.path.join(self.tmpdir, "symbols.csv"), "w") as f:
+            f.write("Symbol\n" + "\n".join(f"S{i:03d}" for i in range(20)) + "\n")
+        run_python(
+            "import cli\n"
+            "cli.main(['screen', '-c', 'symbols.csv', '--provider', 'synthetic', "
+            "'--db-path', 'cli.db', '--rate-limit', '0', '--workers', '2', "
+            "'--volatility-threshold', '0'])",
+            self.tmpdir,
+        )
+        with open(os.path.join(self.tmpdir, "strong_business_tester.log")) as f:
+            log = f.read()
+        self.assertIn("has a strong business", log)
+        self.assertIn("Shard 1:", log)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,10 @@ import unittest
 import asyncio
 import os
 import csv
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta
 from unittest.mock import patch
-from database import DatabaseManager, parse_args
+from database import SCHEMA_VERSION, DatabaseManager, parse_args
 
 
 class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
@@ -22,8 +23,9 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
 
     def tearDown(self):
         # Clean up test files
-        if os.path.exists(self.test_db):
-            os.remove(self.test_db)
+        for path in [self.test_db, self.test_db + "-wal", self.test_db + "-shm"]:
+            if os.path.exists(path):
+                os.remove(path)
         if os.path.exists(self.test_csv):
             os.remove(self.test_csv)
 
@@ -39,6 +41,68 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
             self.assertIsNotNone(result)
             self.assertEqual(result[0], "stocks")
 
+    async def test_migrate_v1(self):
+        """Test migrating DATETIME text timestamps to epoch seconds"""
+        conn = sqlite3.connect(self.test_db)
+        conn.execute(
+            "CREATE TABLE stocks (symbol TEXT PRIMARY KEY, tested_at DATETIME NOT NULL)"
+        )
+        tested_at = datetime(2023, 12, 22, 10, 30, 0, 123456)
+        conn.executemany(
+            "INSERT INTO stocks VALUES (?, ?)",
+            [
+                ("AAPL", str(tested_at)),
+                ("MSFT", "2023-12-22"),
+                ("BAD", "not a date"),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        async with DatabaseManager(self.test_db) as db:
+            rows = dict(await db.read_data())
+            self.assertEqual(rows["AAPL"], int(tested_at.timestamp()))
+            self.assertEqual(rows["MSFT"], int(datetime(2023, 12, 22).timestamp()))
+            self.assertNotIn("BAD", rows)
+
+            cursor = await db.conn.execute("PRAGMA user_version")
+            self.assertEqual((await cursor.fetchone())[0], SCHEMA_VERSION)
+            cursor = await db.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='stocks'"
+            )
+            self.assertIn(
+                "stocks_tested_at", [row[0] for row in await cursor.fetchall()]
+            )
+
+    async def test_stale_symbols(self):
+        """Test finding symbols that need processing with one query"""
+        now = datetime.now()
+        async with DatabaseManager(self.test_db) as db:
+            await db.insert_data("AAPL", now - timedelta(days=1))
+            await db.insert_data("GOOGL", now - timedelta(days=200))
+            stale = await db.stale_symbols(["AAPL", "GOOGL", "MSFT"], 180, now=now)
+            self.assertEqual(stale, {"GOOGL", "MSFT"})
+            stale = await db.stale_symbols(["AAPL", "GOOGL"], 1, now=now)
+            self.assertEqual(stale, {"AAPL", "GOOGL"})
+
+    async def test_wal_mode(self):
+        """Test that connections use write-ahead logging"""
+        async with DatabaseManager(self.test_db) as db:
+            cursor = await db.conn.execute("PRAGMA journal_mode")
+            self.assertEqual((await cursor.fetchone())[0], "wal")
+
+    async def test_shared_connection(self):
+        """Test that re-entering an open manager reuses its connection"""
+        db = DatabaseManager(self.test_db)
+        async with db:
+            conn = db.conn
+            async with db:
+                self.assertIs(db.conn, conn)
+            # The inner exit must not close the shared connection
+            self.assertIs(db.conn, conn)
+            await db.insert_data("AAPL", datetime.now())
+        self.assertIsNone(db.conn)
+
     async def test_insert_and_read_data(self):
         """Test inserting and reading data"""
         async with DatabaseManager(self.test_db) as db:
@@ -49,9 +113,7 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
             rows = await db.read_data("AAPL")
             self.assertEqual(len(rows), 1)
             self.assertEqual(rows[0][0], "AAPL")
-            self.assertEqual(
-                datetime.strptime(rows[0][1], "%Y-%m-%d %H:%M:%S.%f"), test_time
-            )
+            self.assertEqual(rows[0][1], int(test_time.timestamp()))
 
             # Test reading all symbols
             rows = await db.read_data()
@@ -68,9 +130,7 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
 
             rows = await db.read_data("AAPL")
             self.assertEqual(len(rows), 1)
-            self.assertEqual(
-                datetime.strptime(rows[0][1], "%Y-%m-%d %H:%M:%S.%f"), update_time
-            )
+            self.assertEqual(rows[0][1], int(update_time.timestamp()))
 
     async def test_delete_data(self):
         """Test deleting data"""
@@ -94,13 +154,37 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(len(rows), 3)
 
         # Run refresh
-        await asyncio.create_task(DatabaseManager.refresh(self.test_csv, self.test_db))
+        deleted = await asyncio.create_task(
+            DatabaseManager.refresh(self.test_csv, self.test_db)
+        )
+        self.assertEqual(deleted, {"AAPL", "GOOGL", "MSFT"})
 
         # Verify data was deleted
         async with DatabaseManager(self.test_db) as db:
             rows = await db.read_data()
             self.assertEqual(len(rows), 0)
 
+    async def test_refresh_dry_run(self):
+        """Test that a dry run reports affected symbols without deleting"""
+        async with DatabaseManager(self.test_db) as db:
+            await db.insert_data("AAPL", datetime.now())
+            await db.insert_data("TSLA", datetime.now())
+
+        affected = await DatabaseManager.refresh(
+            self.test_csv, self.test_db, dry_run=True
+        )
+        self.assertEqual(affected, {"AAPL"})
+
+        async with DatabaseManager(self.test_db) as db:
+            rows = await db.read_data()
+            self.assertEqual(len(rows), 2)
+
+            # Only symbols from the set are deleted
+            deleted = await db.delete_symbols(["AAPL", "GOOGL"])
+            self.assertEqual(deleted, {"AAPL"})
+            rows = await db.read_data()
+            self.assertEqual([row[0] for row in rows], ["TSLA"])
+
     async def test_duplicate_insert(self):
         """Test handling of duplicate inserts"""
         async with DatabaseManager(self.test_db) as db:
@@ -114,6 +198,152 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
             rows = await db.read_data("AAPL")
             self.assertEqual(len(rows), 1)
 
+    async def test_buffered_writes(self):
+        """Test that buffered writes are flushed by size and on exit"""
+        async with DatabaseManager(self.test_db, batch_size=2) as db:
+            await db.insert_data("AAPL", datetime.now())
+            self.assertEqual(len(db._pending), 1)
+            await db.insert_data("GOOGL", datetime.now())
+            self.assertEqual(len(db._pending), 0)
+            await db.insert_data("MSFT", datetime.now())
+            await db.delete_data("GOOGL")
+            self.assertEqual(len(db._pending), 0)
+
+            await db.insert_data("TSLA", datetime.now())
+        async with DatabaseManager(self.test_db) as db:
+            rows = await db.read_data()
+            self.assertEqual(sorted(row[0] for row in rows), ["AAPL", "MSFT", "TSLA"])
+
+    async def test_concurrent_buffered_writes(self):
+        """Test that concurrent writers share flushes instead of committing each"""
+        async with DatabaseManager(self.test_db, batch_size=100) as db:
+            commits = db.commits
+            await asyncio.gather(
+                *(db.insert_data(f"S{i}", datetime.now()) for i in range(1000))
+            )
+            await db.flush()
+            self.assertLessEqual(db.commits - commits, 11)
+            self.assertEqual(len(await db.read_data()), 1000)
+
+    async def test_buffered_read_your_writes(self):
+        """Test that reads see buffered writes"""
+        async with DatabaseManager(self.test_db, batch_size=100) as db:
+            await db.insert_data("AAPL", datetime.now())
+            rows = await db.read_data("AAPL")
+            self.assertEqual(len(rows), 1)
+
+    async def test_periodic_flush(self):
+        """Test that buffered writes are flushed after the flush interval"""
+        async with DatabaseManager(
+            self.test_db, batch_size=100, flush_interval=0.01
+        ) as db:
+            await db.insert_data("AAPL", datetime.now())
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(db._pending), 0)
+
+    async def test_close_during_periodic_flush(self):
+        """Test that closing while the periodic flush runs loses no writes"""
+        async with DatabaseManager(
+            self.test_db, batch_size=10000, flush_interval=0.01
+        ) as db:
+            for i in range(2000):
+                await db.insert_data(f"S{i}", datetime.now())
+            while not db.lock.locked():
+                await asyncio.sleep(0.001)
+        async with DatabaseManager(self.test_db) as db:
+            self.assertEqual(len(await db.read_data()), 2000)
+
+    async def test_insert_upserts(self):
+        """Test that inserting an existing symbol updates its timestamp"""
+        async with DatabaseManager(self.test_db) as db:
+            await db.insert_data("AAPL", datetime(2023, 12, 22))
+            update_time = datetime.now()
+            await db.insert_data("AAPL", update_time)
+            rows = await db.read_data("AAPL")
+            self.assertEqual(rows[0][1], int(update_time.timestamp()))
+
+    async def test_results(self):
+        """Test storing results and reading them back by metric ranges"""
+        async with DatabaseManager(self.test_db, batch_size=10) as db:
+            now = datetime.now()
+            await db.insert_result("AAPL", now, 0.25, 0.8, 100.0, 180.0, "NMS", True)
+            await db.insert_result("MSFT", now, 0.15, 0.4, low_debt=False)
+            # Rejected before ROE was computed
+            await db.insert_result("GOOGL", now, volatility=0.2, low=90.0, high=108.0)
+            await db.insert_result("MSFT", now, 0.18, 0.5, low_debt=True)
+
+            rows = await db.read_results()
+            self.assertEqual([row[0] for row in rows], ["AAPL", "MSFT", "GOOGL"])
+            self.assertEqual(
+                rows[0], ("AAPL", 0.25, 0.8, 100.0, 180.0, "NMS", 1, None, None)
+            )
+            rows = await db.read_results(roe_range=(0.1, 0.2), low_debt=True)
+            self.assertEqual([row[0] for row in rows], ["MSFT"])
+            rows = await db.read_results(volatility_range=(None, 0.6))
+            self.assertEqual([row[0] for row in rows], ["MSFT", "GOOGL"])
+
+            await db.insert_result(
+                "TSLA", now, 0.1, 0.5, realized_volatility=0.6, max_drawdown=0.3
+            )
+            rows = await db.read_results(
+                volatility_range=(0.55, None), volatility_column="realized_volatility"
+            )
+            self.assertEqual(
+                rows, [("TSLA", 0.1, 0.5, None, None, None, None, 0.6, 0.3)]
+            )
+            with self.assertRaises(ValueError):
+                await db.read_results(volatility_column="roe")
+
+    async def test_migrate_v4(self):
+        """Test adding the realized volatility columns to existing results"""
+        conn = sqlite3.connect(self.test_db)
+        conn.execute(
+            "CREATE TABLE results (symbol TEXT PRIMARY KEY, screened_at INTEGER "
+            "NOT NULL, roe REAL, volatility REAL, low REAL, high REAL, market TEXT, "
+            "low_debt INTEGER)"
+        )
+        conn.execute(
+            "INSERT INTO results VALUES ('AAPL', 0, 0.25, 0.8, 1, 2, 'NMS', 1)"
+        )
+        conn.execute("PRAGMA user_version = 4")
+        conn.commit()
+        conn.close()
+
+        async with DatabaseManager(self.test_db) as db:
+            rows = await db.read_results()
+            self.assertEqual(rows, [("AAPL", 0.25, 0.8, 1, 2, "NMS", 1, None, None)])
+            await db.insert_result("MSFT", datetime.now(), realized_volatility=0.4)
+            rows = await db.read_results(volatility_column="realized_volatility")
+            self.assertEqual(rows[-1][7], 0.4)
+            cursor = await db.conn.execute("PRAGMA user_version")
+            self.assertEqual((await cursor.fetchone())[0], SCHEMA_VERSION)
+
+    async def test_job_journal(self):
+        """Test recording runs and job states"""
+        async with DatabaseManager(self.test_db, batch_size=10) as db:
+            self.assertIsNone(await db.unfinished_run())
+            run_id = await db.start_run({"csv_file": ["Results.csv"]})
+            await db.set_job_state(run_id, "AAPL", "pending")
+            await db.set_job_state(run_id, "MSFT", "pending")
+            for _ in range(2):
+                await db.set_job_state(run_id, "AAPL", "in_flight")
+            await db.set_job_state(run_id, "AAPL", "failed", "ProviderError")
+            await db.set_job_state(run_id, "MSFT", "in_flight")
+            await db.set_job_state(run_id, "MSFT", "done")
+            with self.assertRaises(ValueError):
+                await db.set_job_state(run_id, "MSFT", "lost")
+
+            self.assertEqual(
+                await db.read_jobs(run_id),
+                [("AAPL", "failed", 2, "ProviderError"), ("MSFT", "done", 1, None)],
+            )
+            self.assertEqual(await db.job_counts(run_id), {"done": 1, "failed": 1})
+            self.assertEqual(
+                await db.unfinished_run(), (run_id, {"csv_file": ["Results.csv"]})
+            )
+            await db.finish_run(run_id)
+            self.assertIsNone(await db.unfinished_run())
+
     def test_parse_args(self):
         """Test command line argument parsing"""
         # Test with -c argument
@@ -132,6 +362,11 @@ class TestDatabaseManager(unittest.IsolatedAsyncioTestCase):
         with patch("sys.argv", ["database.py"]):
             args = parse_args()
             self.assertEqual(args.csv_file, "Results.csv")
+            self.assertFalse(args.dry_run)
+
+        with patch("sys.argv", ["database.py", "--dry-run"]):
+            args = parse_args()
+            self.assertTrue(args.dry_run)
 
 
 if __name__ == "__main__":
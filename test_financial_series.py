@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+import gc
+import math
+import pickle
+import tracemalloc
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from financial_series import FinancialSeries, concatenate, project
+from providers import STATEMENT_TYPES, SyntheticProvider
+
+
+class TestFinancialSeries(unittest.TestCase):
+    def setUp(self):
+        nan = float("nan")
+        self.data = pd.DataFrame(
+            {
+                "symbol": ["AAPL", "MSFT", "AAPL", "MSFT"],
+                "asOfDate": ["2023-03-31", "2023-03-31", "2023-06-30", "Q2"],
+                "periodType": ["3M"] * 4,
+                "TotalDebt": [10.0, nan, 30.0, 5.0],
+                "CommonStockEquity": [100.0, 10.0, 100.0, 0.0],
+            }
+        ).set_index("symbol")
+
+    def test_project(self):
+        series = project(self.data)
+        self.assertEqual(list(series), ["AAPL", "MSFT"])
+        aapl = series["AAPL"]
+        self.assertEqual(aapl.symbol, "AAPL")
+        self.assertEqual(len(aapl), 2)
+        # Only the fields of FIELDS that the frame has are kept
+        self.assertEqual(aapl.columns, ("CommonStockEquity", "TotalDebt"))
+        self.assertEqual(list(aapl["TotalDebt"]), [10.0, 30.0])
+        self.assertEqual(
+            list(aapl.dates), list(np.array(["2023-03-31", "2023-06-30"], "M8[D]"))
+        )
+        # Unparseable dates become NaT
+        self.assertTrue(np.isnat(series["MSFT"].dates[1]))
+        with self.assertRaises(KeyError):
+            aapl["FreeCashFlow"]
+        # The frame is left as it was
+        self.assertEqual(list(self.data.columns)[-1], "CommonStockEquity")
+
+    def test_metrics(self):
+        series = project(self.data)
+        self.assertEqual(series["AAPL"].mean("CommonStockEquity"), 100.0)
+        self.assertEqual(series["MSFT"].mean("TotalDebt"), 5.0)
+        self.assertAlmostEqual(series["AAPL"].max_debt_equity(), 0.3)
+        # Zero equity gives an infinite ratio, like pandas
+        self.assertEqual(series["MSFT"].max_debt_equity(), math.inf)
+
+        empty = FinancialSeries(
+            "X", np.array([], "M8[D]"), np.empty((1, 0)), ("FreeCashFlow",)
+        )
+        self.assertTrue(empty.empty)
+        self.assertEqual(empty.mean("FreeCashFlow"), 0.0)
+
+    def test_concatenate(self):
+        series = project(self.data)
+        offsets, dates, values, columns = concatenate(series, fields=["TotalDebt"])
+        self.assertEqual(list(offsets), [0, 2, 4])
+        self.assertEqual(columns, ["TotalDebt"])
+        self.assertEqual(list(values[0][:2]), [10.0, 30.0])
+
+        # Plain dicts in any order, with symbols lacking a series or a field
+        msft = FinancialSeries(
+            "MSFT", np.array(["2023-03-31"], "M8[D]"), np.array([[7.0]]), ("TotalDebt",)
+        )
+        offsets, dates, values, columns = concatenate(
+            {"AAPL": series["AAPL"], "MSFT": msft}, ["MSFT", "XYZ", "AAPL"]
+        )
+        self.assertEqual(list(offsets), [0, 1, 1, 3])
+        self.assertEqual(columns, ["CommonStockEquity", "TotalDebt"])
+        self.assertTrue(np.isnan(values[0][0]))
+        self.assertEqual(list(values[1]), [7.0, 10.0, 30.0])
+        self.assertEqual(len(dates), 3)
+
+    def test_from_frame(self):
+        single = self.data.loc[["AAPL"]]
+        self.assertEqual(FinancialSeries.from_frame(single).symbol, "AAPL")
+        unlabelled = pd.DataFrame({"FreeCashFlow": [1.0, 3.0]})
+        self.assertEqual(FinancialSeries.from_frame(unlabelled).mean("FreeCashFlow"), 2)
+        self.assertIsNone(FinancialSeries.from_frame(self.data.iloc[:0]))
+
+    def test_pickle(self):
+        series = pickle.loads(pickle.dumps(project(self.data)["AAPL"]))
+        self.assertEqual(series.symbol, "AAPL")
+        self.assertEqual(list(series["CommonStockEquity"]), [100.0, 100.0])
+
+    def test_memory(self):
+        """Test that series take a fraction of the memory of frame slices"""
+        symbols = [f"S{i:04d}" for i in range(500)]
+        data = SyntheticProvider().balance_sheet(symbols)
+
+        def traced(split):
+            gc.collect()
+            tracemalloc.start()
+            try:
+                parts = split()
+                gc.collect()
+                return tracemalloc.get_traced_memory()[0], parts
+            finally:
+                tracemalloc.stop()
+
+        frames, _ = traced(lambda: dict(iter(data.groupby(level=0, sort=False))))
+        series, _ = traced(lambda: project(data, STATEMENT_TYPES["balance_sheet"]))
+        self.assertLess(series * 5, frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
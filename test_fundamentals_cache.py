@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from fundamentals_cache import FundamentalsCache
+
+
+class TestFundamentalsCache(unittest.TestCase):
+    def setUp(self):
+        self.test_db = "test_fundamentals_cache.db"
+        self.cache = FundamentalsCache(self.test_db)
+
+    def tearDown(self):
+        self.cache.close()
+        if os.path.exists(self.test_db):
+            os.remove(self.test_db)
+
+    def test_put_and_get(self):
+        """Test storing and reading back a response"""
+        self.cache.put_many("balance_sheet", "Annual", {"AAPL": {"a": 1}})
+        self.assertEqual(
+            self.cache.get("AAPL", "balance_sheet", "Annual"), (True, {"a": 1})
+        )
+        # Frequency is part of the key
+        self.assertEqual(
+            self.cache.get("AAPL", "balance_sheet", "Quarterly"), (False, None)
+        )
+
+    def test_ttl_expiry(self):
+        """Test that stale entries are misses unless running cache-only"""
+        self.cache.put_many("summary_detail", None, {"AAPL": {"a": 1}})
+        later = time.time() + 2 * 24 * 60 * 60
+        with patch("fundamentals_cache.time.time", return_value=later):
+            self.assertEqual(self.cache.get("AAPL", "summary_detail"), (False, None))
+            self.cache.cache_only = True
+            self.assertEqual(self.cache.get("AAPL", "summary_detail"), (True, {"a": 1}))
+
+    def test_refresh_ignores_cache(self):
+        """Test that refresh mode always misses"""
+        self.cache.put_many("price", None, {"AAPL": {"a": 1}})
+        self.cache.refresh = True
+        self.assertEqual(self.cache.get("AAPL", "price"), (False, None))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted first"""
+        self.cache.put_many("price", None, {"AAPL": "x" * 100})
+        self.cache.put_many("price", None, {"MSFT": "x" * 100})
+        # Touch AAPL so MSFT becomes the least recently used entry
+        self.cache.get("AAPL", "price")
+        self.cache.max_bytes = self.cache.size + 50
+        self.cache.put_many("price", None, {"GOOGL": "x" * 100})
+
+        self.assertTrue(self.cache.get("AAPL", "price")[0])
+        self.assertFalse(self.cache.get("MSFT", "price")[0])
+        self.assertTrue(self.cache.get("GOOGL", "price")[0])
+        self.assertLessEqual(self.cache.size, self.cache.max_bytes)
+
+    def test_replace_keeps_size(self):
+        """Test that overwriting an entry does not double count its size"""
+        self.cache.put_many("price", None, {"AAPL": "x" * 100})
+        size = self.cache.size
+        self.cache.put_many("price", None, {"AAPL": "x" * 100})
+        self.assertEqual(self.cache.size, size)
+
+    def test_items(self):
+        """Test reading every entry of a data type, stale ones included"""
+        self.cache.put_many("price", None, {"MSFT": {"b": 2}, "AAPL": {"a": 1}})
+        self.cache.put_many("balance_sheet", "Annual", {"GOOGL": {"c": 3}})
+        with patch("time.time", return_value=time.time() + 365 * 24 * 60 * 60):
+            self.assertEqual(
+                self.cache.items("price"), [("AAPL", {"a": 1}), ("MSFT", {"b": 2})]
+            )
+        self.assertEqual(self.cache.items("balance_sheet", "Quarterly"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
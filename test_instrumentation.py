@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from instrumentation import Metrics, StallDetector
+
+
+class TestMetrics(unittest.TestCase):
+    def test_timer_and_counter(self):
+        metrics = Metrics()
+        with metrics.timer("fetch"):
+            pass
+        metrics.observe("fetch", 2.0)
+        metrics.increment("requests")
+        metrics.increment("requests", 2)
+
+        snapshot = metrics.snapshot()
+        fetch = snapshot["timers"]["fetch"]
+        self.assertEqual(fetch["count"], 2)
+        self.assertEqual(fetch["max_seconds"], 2.0)
+        self.assertEqual(fetch["buckets"]["1"], 1)
+        self.assertEqual(fetch["buckets"]["5"], 2)
+        self.assertEqual(snapshot["counters"], {"requests": 3})
+
+    def test_merge(self):
+        shard = Metrics()
+        shard.observe("fetch", 0.002)
+        shard.increment("rejected_roe", 2)
+        metrics = Metrics()
+        metrics.observe("fetch", 0.5)
+        metrics.increment("rejected_roe")
+        metrics.merge(shard.snapshot())
+        metrics.merge(shard.snapshot())
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {"rejected_roe": 5})
+        fetch = snapshot["timers"]["fetch"]
+        self.assertEqual(fetch["count"], 3)
+        self.assertAlmostEqual(fetch["sum_seconds"], 0.504)
+        self.assertEqual(fetch["max_seconds"], 0.5)
+        self.assertEqual(fetch["buckets"]["0.005"], 2)
+        self.assertEqual(fetch["buckets"]["0.5"], 3)
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.observe("db_insert", 0.002)
+        metrics.increment("symbols_screened")
+        text = metrics.to_prometheus()
+        self.assertIn(
+            'stock_stage_seconds_bucket{stage="db_insert",le="0.001"} 0', text
+        )
+        self.assertIn(
+            'stock_stage_seconds_bucket{stage="db_insert",le="0.005"} 1', text
+        )
+        self.assertIn('stock_stage_seconds_count{stage="db_insert"} 1', text)
+        self.assertIn('stock_events_total{event="symbols_screened"} 1', text)
+
+    def test_write(self):
+        metrics = Metrics()
+        metrics.increment("symbols_screened")
+        with tempfile.TemporaryDirectory() as workdir:
+            metrics.write(os.path.join(workdir, "run.json"))
+            with open(os.path.join(workdir, "run.json")) as f:
+                self.assertEqual(json.load(f)["counters"], {"symbols_screened": 1})
+            self.assertTrue(os.path.exists(os.path.join(workdir, "run.prom")))
+
+
+class TestStallDetector(unittest.IsolatedAsyncioTestCase):
+    async def test_detects_blocking_call(self):
+        metrics = Metrics()
+        detector = StallDetector(metrics, threshold=0.05, interval=0.01)
+        detector.start()
+        await asyncio.sleep(0.02)
+        # Block the event loop
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+        detector.stop()
+        self.assertEqual(metrics.snapshot()["counters"]["event_loop_stalls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
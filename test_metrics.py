@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+import math
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from financial_series import project
+
+
+def series(rows):
+    """Project a frame like a multi-symbol yahooquery response into series."""
+    return project(pd.DataFrame(rows).set_index("symbol"))
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        nan = float("nan")
+        self.cash_flow = series(
+            {
+                "symbol": ["AAPL", "AAPL", "MSFT", "MSFT", "LOSS"],
+                "asOfDate": ["2022", "2023", "2022", "2023", "2023"],
+                "FreeCashFlow": [10.0, 30.0, 5.0, nan, -1.0],
+            }
+        )
+        self.balance_sheet = series(
+            {
+                "symbol": ["AAPL", "AAPL", "MSFT", "LOSS"],
+                "asOfDate": ["2022", "2023", "2023", "2023"],
+                "CommonStockEquity": [100.0, 100.0, 10.0, 50.0],
+            }
+        )
+        self.quarterly = series(
+            {
+                "symbol": ["AAPL", "AAPL", "MSFT", "MSFT", "NAN"],
+                "asOfDate": ["Q1", "Q2", "Q1", "Q2", "Q1"],
+                "TotalDebt": [10.0, 30.0, 1.0, 5.0, nan],
+                "CommonStockEquity": [100.0, 100.0, 10.0, 10.0, 10.0],
+            }
+        )
+
+    def test_average_by_symbol(self):
+        averages = metrics.average_by_symbol(self.cash_flow, "FreeCashFlow")
+        self.assertEqual(averages.to_dict(), {"AAPL": 20.0, "MSFT": 5.0, "LOSS": -1.0})
+        # Symbols without the field average to 0
+        averages = metrics.average_by_symbol(self.quarterly, "FreeCashFlow")
+        self.assertEqual(averages.tolist(), [0.0, 0.0, 0.0])
+
+    def test_max_debt_equity_by_symbol(self):
+        maxima = metrics.max_debt_equity_by_symbol(self.quarterly)
+        self.assertAlmostEqual(maxima["AAPL"], 0.3)
+        self.assertAlmostEqual(maxima["MSFT"], 0.5)
+        self.assertTrue(math.isnan(maxima["NAN"]))
+
+    def test_series_of_any_origin(self):
+        """Test that series regrouped into plain dicts give the same metrics"""
+        projected = metrics.compute_metrics(
+            self.cash_flow, self.balance_sheet, self.quarterly
+        )
+        mixed = dict(self.quarterly, LOSS=self.balance_sheet["LOSS"])
+        regrouped = metrics.compute_metrics(
+            dict(reversed(self.cash_flow.items())), dict(self.balance_sheet), mixed
+        )
+        pd.testing.assert_frame_equal(
+            regrouped.sort_index(), projected.sort_index(), check_like=True
+        )
+        # LOSS has no TotalDebt, so no ratios
+        self.assertFalse(regrouped.loc["LOSS", "low_debt"])
+
+    def test_compute_metrics(self):
+        result = metrics.compute_metrics(
+            self.cash_flow, self.balance_sheet, self.quarterly
+        )
+        self.assertAlmostEqual(result.loc["AAPL", "roe"], 0.2)
+        self.assertAlmostEqual(result.loc["MSFT", "roe"], 0.5)
+        # Negative FCF gives no ROE
+        self.assertEqual(result.loc["LOSS", "roe"], 0)
+
+        self.assertAlmostEqual(result.loc["AAPL", "max_debt_equity"], 0.3)
+        self.assertTrue(result.loc["AAPL", "low_debt"])
+        self.assertAlmostEqual(result.loc["MSFT", "max_debt_equity"], 0.5)
+        self.assertFalse(result.loc["MSFT", "low_debt"])
+        # Only NaN ratios pass, missing quarterly data does not
+        self.assertTrue(math.isnan(result.loc["NAN", "max_debt_equity"]))
+        self.assertTrue(result.loc["NAN", "low_debt"])
+        self.assertFalse(result.loc["LOSS", "low_debt"])
+        # The averages are those of the screener's checks
+        self.assertEqual(
+            result.loc["MSFT", "average_fcf"],
+            self.cash_flow["MSFT"].mean("FreeCashFlow"),
+        )
+
+    def test_compute_metrics_missing_data(self):
+        result = metrics.compute_metrics(self.cash_flow, None, None)
+        self.assertEqual(result["roe"].tolist(), [0, 0, 0])
+        self.assertFalse(result["low_debt"].any())
+        self.assertTrue(result["max_debt_equity"].isna().all())
+        self.assertTrue(metrics.compute_metrics(None, None, None).empty)
+
+    def test_pass_count_grid(self):
+        nan = float("nan")
+        grid = metrics.pass_count_grid(
+            [0.1, 0.2, 0.3, nan], [0.5, 1.0, nan, 1.0], [0.05, 0.2], [0.5, 1.0]
+        )
+        self.assertEqual(grid.tolist(), [[2, 1], [0, 0]])
+
+    def test_realized_metrics(self):
+        """Test the 2-D computation against a per-symbol reference"""
+        rng = np.random.default_rng(0)
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (3, 60)), axis=1))
+        closes[1, :10] = np.nan
+        closes[1, 30] = np.nan
+        closes[2] = np.nan
+        result = metrics.realized_metrics(closes)
+
+        for row, prices in enumerate(closes[:2]):
+            returns = np.diff(np.log(prices))
+            expected = np.nanstd(returns, ddof=1) * math.sqrt(metrics.TRADING_DAYS)
+            self.assertAlmostEqual(result["volatility"][row], expected)
+            prices = prices[~np.isnan(prices)]
+            drawdown = 1 - prices / np.maximum.accumulate(prices)
+            self.assertAlmostEqual(result["max_drawdown"][row], drawdown.max())
+            self.assertAlmostEqual(
+                result["range"][row], (prices.max() - prices.min()) / prices.min()
+            )
+        # A symbol without prices gets NaN everywhere
+        self.assertTrue(all(np.isnan(values[2]) for values in result.values()))
+
+    def test_realized_metrics_by_symbol(self):
+        dates = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+        history = pd.DataFrame(
+            {
+                "symbol": ["AAPL"] * 3 + ["MSFT"] * 2,
+                "date": list(dates) + list(dates[1:]),
+                "close": [100.0, 90.0, 99.0, 50.0, 55.0],
+                "low": [98.0, 89.0, 97.0, 49.0, 54.0],
+                "high": [101.0, 92.0, 99.0, 51.0, 56.0],
+            }
+        ).set_index(["symbol", "date"])
+        result = metrics.realized_metrics_by_symbol(history, ["MSFT", "AAPL", "NONE"])
+        self.assertEqual(list(result.index), ["MSFT", "AAPL", "NONE"])
+        self.assertAlmostEqual(result.loc["AAPL", "max_drawdown"], 0.1)
+        self.assertEqual(result.loc["AAPL", "low"], 89.0)
+        self.assertEqual(result.loc["AAPL", "high"], 101.0)
+        # Two prices give a single return, not enough for a volatility
+        self.assertTrue(math.isnan(result.loc["MSFT", "volatility"]))
+        self.assertAlmostEqual(result.loc["MSFT", "range"], 7 / 49)
+        self.assertTrue(result.loc["NONE"].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
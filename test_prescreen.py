@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+import math
+import unittest
+
+import pandas as pd
+
+from prescreen import (
+    parse_amount,
+    parse_market_cap_buckets,
+    parse_market_caps,
+    parse_percentages,
+    prescreen,
+)
+
+
+class TestPrescreen(unittest.TestCase):
+    def setUp(self):
+        self.universe = pd.DataFrame(
+            {
+                "Symbol": ["ABEV", "ACHC", "ADBE", "NA", "BAD"],
+                "Percentage Above 52 Week Low": ["2.49%", "3.84%", "0.50%", "1%", ""],
+                "Market Capitalization": [
+                    "$9B (Mid)",
+                    "$4B (Small)",
+                    "$197B (Large)",
+                    "$850M (Micro)",
+                    "n/a",
+                ],
+            }
+        )
+
+    def test_parse_amount(self):
+        self.assertEqual(parse_amount("$2B"), 2e9)
+        self.assertEqual(parse_amount("500m"), 5e8)
+        self.assertEqual(parse_amount("2e9"), 2e9)
+        self.assertEqual(parse_amount("$1,200"), 1200)
+        with self.assertRaises(ValueError):
+            parse_amount("two billion")
+
+    def test_parse_columns(self):
+        caps = parse_market_caps(self.universe["Market Capitalization"])
+        self.assertEqual(caps[:4].tolist(), [9e9, 4e9, 197e9, 8.5e8])
+        self.assertTrue(math.isnan(caps[4]))
+        buckets = parse_market_cap_buckets(self.universe["Market Capitalization"])
+        self.assertEqual(buckets[:4].tolist(), ["mid", "small", "large", "micro"])
+        percentages = parse_percentages(self.universe["Percentage Above 52 Week Low"])
+        self.assertEqual(percentages[:4].tolist(), [2.49, 3.84, 0.5, 1.0])
+        self.assertTrue(math.isnan(percentages[4]))
+
+    def test_prescreen(self):
+        def symbols(**filters):
+            return prescreen(self.universe, **filters)["Symbol"].tolist()
+
+        self.assertEqual(symbols(), ["ABEV", "ACHC", "ADBE", "NA", "BAD"])
+        self.assertEqual(symbols(min_market_cap=5e9), ["ABEV", "ADBE"])
+        self.assertEqual(symbols(max_pct_above_low=2.5), ["ABEV", "ADBE", "NA"])
+        self.assertEqual(symbols(buckets=["Micro", "large"]), ["ADBE", "NA"])
+        self.assertEqual(
+            symbols(min_market_cap=5e9, max_pct_above_low=1, buckets=["large"]),
+            ["ADBE"],
+        )
+
+    def test_missing_column_is_skipped(self):
+        universe = self.universe[["Symbol"]]
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(len(prescreen(universe, min_market_cap=5e9)), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import unittest
+
+import pandas as pd
+
+from providers import DataProvider, ProviderError, SyntheticProvider, get_provider
+
+
+class TestSyntheticProvider(unittest.TestCase):
+    def test_deterministic_and_batch_independent(self):
+        """Test that a symbol's data does not depend on the request it is in"""
+        together = SyntheticProvider(seed=1).balance_sheet(["AAPL", "MSFT"])
+        alone = SyntheticProvider(seed=1).balance_sheet(["MSFT"])
+        pd.testing.assert_frame_equal(together.loc[["MSFT"]], alone)
+
+        other_seed = SyntheticProvider(seed=2).balance_sheet(["MSFT"])
+        self.assertFalse(
+            alone["CommonStockEquity"].equals(other_seed["CommonStockEquity"])
+        )
+
+    def test_statement_layout(self):
+        """Test that statements look like multi-symbol yahooquery frames"""
+        provider = SyntheticProvider()
+        annual = provider.cash_flow(["AAPL", "MSFT"])
+        self.assertEqual(annual.index.name, "symbol")
+        self.assertEqual(len(annual.loc["AAPL"]), 4)
+        self.assertIn("FreeCashFlow", annual.columns)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(annual["asOfDate"]))
+
+        quarterly = provider.balance_sheet(["AAPL"], frequency="Quarterly")
+        self.assertEqual(len(quarterly), 5)
+        self.assertEqual(set(quarterly["periodType"]), {"3M"})
+        self.assertTrue({"TotalDebt", "CommonStockEquity"}.issubset(quarterly.columns))
+
+    def test_financial_data(self):
+        """Test that a combined request matches the separate statements"""
+        provider = SyntheticProvider()
+        combined = provider.financial_data(
+            ["AAPL", "MSFT"], ["FreeCashFlow", "CommonStockEquity", "TotalDebt"]
+        )
+        self.assertEqual(provider.requests, 1)
+        pd.testing.assert_series_equal(
+            combined["FreeCashFlow"],
+            provider.cash_flow(["AAPL", "MSFT"])["FreeCashFlow"],
+        )
+        pd.testing.assert_series_equal(
+            combined["TotalDebt"],
+            provider.balance_sheet(["AAPL", "MSFT"])["TotalDebt"],
+        )
+
+    def test_quotes(self):
+        provider = SyntheticProvider()
+        detail = provider.summary_detail(["AAPL"])["AAPL"]
+        self.assertLess(detail["fiftyTwoWeekLow"], detail["fiftyTwoWeekHigh"])
+        self.assertIn("exchangeName", provider.fetch(["AAPL"], "price")["AAPL"])
+        self.assertEqual(provider.requests, 2)
+
+    def test_history(self):
+        """Test that daily history spans the summary detail's 52-week range"""
+        provider = SyntheticProvider()
+        history = provider.history(["AAPL", "MSFT"])
+        self.assertEqual(history.index.names, ["symbol", "date"])
+        self.assertEqual(len(history.loc["AAPL"]), 252)
+        detail = provider.summary_detail(["AAPL"])["AAPL"]
+        self.assertAlmostEqual(
+            history.loc["AAPL", "close"].min(), detail["fiftyTwoWeekLow"], places=1
+        )
+        self.assertAlmostEqual(
+            history.loc["AAPL", "close"].max(), detail["fiftyTwoWeekHigh"], places=1
+        )
+
+    def test_error_injection(self):
+        provider = SyntheticProvider(error_rate=1.0)
+        with self.assertRaises(ProviderError):
+            provider.summary_detail(["AAPL"])
+
+    def test_missing_symbols(self):
+        provider = SyntheticProvider(missing_rate=1.0)
+        self.assertIsInstance(provider.summary_detail(["AAPL"])["AAPL"], str)
+        self.assertIsInstance(provider.cash_flow(["AAPL"]), str)
+
+    def test_get_provider(self):
+        provider = get_provider("synthetic", seed=3)
+        self.assertIsInstance(provider, SyntheticProvider)
+        self.assertEqual(provider.seed, 3)
+        # Providers without resources to release close all the same
+        provider.close()
+
+    def test_data_provider_is_abstract(self):
+        class QuotesOnly(DataProvider):
+            def summary_detail(self, symbols):
+                return {}
+
+        for provider in (DataProvider, QuotesOnly):
+            with self.assertRaises(TypeError):
+                provider()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+import asyncio
+import threading
+import time
+import unittest
+
+from providers import ProviderError, SyntheticProvider
+from resilience import (
+    CircuitBreaker,
+    DeadlineExceeded,
+    RequestPolicy,
+    ResilientProvider,
+)
+
+
+class ScriptedProvider(SyntheticProvider):
+    """Synthetic provider whose requests fail or stall as scripted, in order."""
+
+    def __init__(self, script=(), **options):
+        super().__init__(**options)
+        self.script = list(script)
+        self.lock = threading.Lock()
+
+    def _request(self):
+        with self.lock:
+            self.requests += 1
+            step = self.script.pop(0) if self.script else None
+        if step == "error":
+            raise ProviderError("Injected")
+        if isinstance(step, float):
+            time.sleep(step)
+
+
+class TestResilientProvider(unittest.TestCase):
+    def test_deadline(self):
+        provider = ResilientProvider(
+            SyntheticProvider(stall_rate=1.0, stall=0.5), deadline=0.05, retries=0
+        )
+        self.addCleanup(provider.close)
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            provider.summary_detail(["AAPL"])
+        self.assertLess(time.monotonic() - start, 0.4)
+
+    def test_retries_with_backoff(self):
+        inner = ScriptedProvider(["error", "error"])
+        provider = ResilientProvider(inner, retries=2, backoff=0.01)
+        self.addCleanup(provider.close)
+        self.assertIn("AAPL", provider.summary_detail(["AAPL"]))
+        self.assertEqual(inner.requests, 3)
+
+        inner.script = ["error", "error"]
+        provider.retries = 1
+        with self.assertRaises(ProviderError):
+            provider.summary_detail(["AAPL"])
+
+    def test_retry_budget(self):
+        inner = ScriptedProvider(["error"] * 30)
+        provider = ResilientProvider(inner, retries=5, backoff=0, retry_budget=0)
+        self.addCleanup(provider.close)
+        for _ in range(3):
+            with self.assertRaises(ProviderError):
+                provider.price(["AAPL"])
+        # At least 10 retries are always allowed, then the budget is spent
+        self.assertEqual(provider.retried, 10)
+        self.assertEqual(inner.requests, 13)
+
+    def test_hedging(self):
+        inner = ScriptedProvider([0.0] * 20 + [1.0])
+        provider = ResilientProvider(inner, hedge=True, deadline=5)
+        self.addCleanup(provider.close)
+        for _ in range(20):
+            provider.summary_detail(["AAPL"])
+        self.assertIsNotNone(provider.hedge_delay("summary_detail"))
+
+        # The stalled request is overtaken by its duplicate
+        start = time.monotonic()
+        provider.summary_detail(["AAPL"])
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(inner.requests, 22)
+
+    def test_financial_data(self):
+        provider = ResilientProvider(SyntheticProvider())
+        self.addCleanup(provider.close)
+        data = provider.fetch(["AAPL"], "balance_sheet", "Quarterly")
+        self.assertEqual(len(data), 5)
+        data = provider.financial_data(["AAPL"], ["FreeCashFlow"])
+        self.assertIn("FreeCashFlow", data.columns)
+
+
+class TestRequestPolicy(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_and_budget(self):
+        script = ["error", "error"]
+
+        async def request():
+            if script and script.pop(0) == "error":
+                raise ProviderError("Injected")
+            return "ok"
+
+        policy = RequestPolicy(retries=2, backoff=0.01)
+        self.assertEqual(await policy.call("quote", request), "ok")
+        self.assertEqual(policy.retried, 2)
+
+        script[:] = ["error"] * 30
+        policy = RequestPolicy(retries=5, backoff=0, retry_budget=0)
+        for _ in range(3):
+            with self.assertRaises(ProviderError):
+                await policy.call("quote", request)
+        self.assertEqual(policy.retried, 10)
+
+    async def test_hedging(self):
+        delays = [0.0] * 20 + [1.0]
+        requests = []
+
+        async def request():
+            requests.append(delays.pop(0) if delays else 0.0)
+            await asyncio.sleep(requests[-1])
+            return "ok"
+
+        policy = RequestPolicy(hedge=True)
+        for _ in range(20):
+            await policy.call("quote", request)
+        self.assertIsNotNone(policy.hedge_delay("quote"))
+
+        # The stalled request is overtaken by its duplicate, then cancelled
+        start = time.monotonic()
+        self.assertEqual(await policy.call("quote", request), "ok")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(len(requests), 22)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_pauses_and_closes(self):
+        breaker = CircuitBreaker(threshold=0.5, window=4, min_calls=4, cooldown=0.1)
+        for success in [True, False, True]:
+            breaker.record(success)
+        self.assertEqual(breaker.state, "closed")
+        breaker.record(False)
+        self.assertEqual(breaker.state, "open")
+
+        # Callers wait out the cooldown, then one probe goes through
+        start = time.monotonic()
+        breaker.before_call()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertEqual(breaker.state, "half_open")
+        breaker.record(False)
+        self.assertEqual(breaker.state, "open")
+
+        breaker.before_call()
+        breaker.record(True)
+        self.assertEqual(breaker.state, "closed")
+        breaker.before_call()
+
+    def test_provider_pauses_while_open(self):
+        breaker = CircuitBreaker(threshold=1.0, window=2, min_calls=2, cooldown=0.2)
+        inner = ScriptedProvider(["error", "error"])
+        provider = ResilientProvider(inner, retries=0, breaker=breaker)
+        self.addCleanup(provider.close)
+        for _ in range(2):
+            with self.assertRaises(ProviderError):
+                provider.price(["AAPL"])
+        self.assertEqual(breaker.state, "open")
+
+        start = time.monotonic()
+        self.assertIn("AAPL", provider.price(["AAPL"]))
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(breaker.state, "closed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+import unittest
+
+from result_sink import ResultSink, format_table_csv, read_results
+
+RESULTS = [
+    {
+        "Symbol": "AAPL",
+        "ROE": 25.5,
+        "Volatility": 80.1,
+        "52-week Low": 100.0,
+        "52-week High": 180.2,
+        "Market": "NasdaqGS",
+    },
+    {
+        "Symbol": "F",
+        "ROE": 18.4,
+        "Volatility": 92.8,
+        "52-week Low": 9.5,
+        "52-week High": 18.3,
+        "Market": "NYSE",
+    },
+]
+
+
+class TestResultSink(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+
+    def test_round_trip(self):
+        """Test that both formats read back the written results"""
+        for name in ["results.jsonl", "results.csv"]:
+            path = os.path.join(self.tmpdir, name)
+            with ResultSink(path) as sink:
+                sink.write(RESULTS[0])
+                # Written results are visible before the sink is closed
+                self.assertEqual(read_results(path), RESULTS[:1])
+                sink.write(RESULTS[1])
+            self.assertEqual(read_results(path), RESULTS)
+
+    def test_appends_latest_row_wins(self):
+        """Test that a later run appends and replaces rows of the same symbol"""
+        for name in ["results.jsonl", "results.csv"]:
+            path = os.path.join(self.tmpdir, name)
+            with ResultSink(path) as sink:
+                sink.write(RESULTS[0])
+            updated = dict(RESULTS[0], ROE=30.0)
+            with ResultSink(path) as sink:
+                sink.write(RESULTS[1])
+                sink.write(updated)
+            self.assertEqual(read_results(path), [updated, RESULTS[1]])
+
+    def test_read_one_run(self):
+        """Test that rows are filtered by the run that wrote them"""
+        for name in ["results.jsonl", "results.csv"]:
+            path = os.path.join(self.tmpdir, name)
+            with ResultSink(path, run_id=1) as sink:
+                sink.write(RESULTS[0])
+            with ResultSink(path, run_id=2) as sink:
+                sink.write(RESULTS[1])
+            self.assertEqual(read_results(path, run_id=1), RESULTS[:1])
+            self.assertEqual(read_results(path, run_id=2), RESULTS[1:])
+            self.assertEqual(read_results(path), RESULTS)
+
+    def test_truncated_line_is_ignored(self):
+        """Test that a partly written last result, e.g. after a crash, is skipped"""
+        for name in ["results.jsonl", "results.csv"]:
+            path = os.path.join(self.tmpdir, name)
+            with ResultSink(path) as sink:
+                sink.write(RESULTS[0])
+            with open(path, "a") as f:
+                f.write('{"Symbol": "F", "RO' if name.endswith("jsonl") else "F,18")
+            self.assertEqual(read_results(path), RESULTS[:1])
+
+    def test_format_table_csv(self):
+        self.assertEqual(format_table_csv([]), "")
+        self.assertEqual(
+            format_table_csv(RESULTS[1:]),
+            "Symbol,ROE,Volatility,52-week Low,52-week High,Market\n"
+            "F,18.4,92.8,9.5,18.3,NYSE\n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
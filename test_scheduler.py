@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import asyncio
+import threading
+import time
+import unittest
+
+from scheduler import FetchScheduler, TokenBucket
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_then_rate(self):
+        """Test that a burst is immediate and later tokens follow the rate"""
+        bucket = TokenBucket(rate=20, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.04)
+
+        for _ in range(2):
+            await bucket.acquire()
+        # Two more tokens at 20/s take roughly 0.1s
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class TestFetchScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_runs_in_threads(self):
+        """Test that blocking calls run off the event loop thread"""
+        scheduler = FetchScheduler(max_concurrency=2)
+        self.addCleanup(scheduler.shutdown)
+        thread = await scheduler.run(threading.current_thread)
+        self.assertIsNot(thread, threading.current_thread())
+        self.assertEqual(scheduler.stats()["completed"], 1)
+
+    async def test_concurrency_bound(self):
+        """Test that no more than max_concurrency calls are in flight"""
+        scheduler = FetchScheduler(max_concurrency=2)
+        self.addCleanup(scheduler.shutdown)
+        peak = 0
+
+        def work():
+            nonlocal peak
+            peak = max(peak, scheduler.in_flight)
+            time.sleep(0.02)
+
+        async def watch():
+            while scheduler.completed < 6:
+                self.assertLessEqual(scheduler.in_flight, 2)
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(watch(), *(scheduler.run(work) for _ in range(6)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(
+            scheduler.stats(), {"queued": 0, "in_flight": 0, "completed": 6}
+        )
+
+    async def test_queue_depth(self):
+        """Test that waiting calls are counted as queued"""
+        scheduler = FetchScheduler(max_concurrency=1)
+        self.addCleanup(scheduler.shutdown)
+        tasks = [asyncio.create_task(scheduler.run(time.sleep, 0.02)) for _ in range(3)]
+        await asyncio.sleep(0.005)
+        self.assertEqual(scheduler.in_flight, 1)
+        self.assertEqual(scheduler.queue_depth, 2)
+        await asyncio.gather(*tasks)
+        self.assertEqual(scheduler.queue_depth, 0)
+
+    async def test_run_async(self):
+        """Test that coroutines are awaited on the loop within the same bound"""
+        scheduler = FetchScheduler(max_concurrency=2)
+        self.addCleanup(scheduler.shutdown)
+        peak = 0
+
+        async def work(value):
+            nonlocal peak
+            peak = max(peak, scheduler.in_flight)
+            await asyncio.sleep(0.01)
+            return threading.current_thread(), value
+
+        results = await asyncio.gather(
+            *(scheduler.run_async(work, i) for i in range(5))
+        )
+        self.assertEqual([value for _, value in results], list(range(5)))
+        self.assertIs(results[0][0], threading.current_thread())
+        self.assertEqual(peak, 2)
+        self.assertEqual(scheduler.stats()["completed"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import math
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from database import DatabaseManager
+from financial_series import project
+from fundamentals_cache import FundamentalsCache
+from providers import STATEMENT_TYPES, SyntheticProvider
+from snapshot import Snapshot, export_snapshot, main
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.test_db = os.path.join(tmpdir.name, "snapshot.db")
+        self.directory = os.path.join(tmpdir.name, "snapshot")
+
+        async def populate():
+            async with DatabaseManager(self.test_db) as db:
+                now = datetime.now()
+                await db.insert_result(
+                    "MSFT", now, 0.25, 0.8, 10.0, 18.0, "NasdaqGS", True
+                )
+                await db.insert_result("TSLA", now, volatility=0.9)
+
+        asyncio.run(populate())
+        provider = SyntheticProvider()
+        self.series = {}
+        with FundamentalsCache(self.test_db) as cache:
+            for data_type, frequency, symbols in [
+                ("cash_flow", "Annual", ["MSFT", "AAPL"]),
+                ("balance_sheet", "Annual", ["MSFT", "AAPL"]),
+                ("balance_sheet", "Quarterly", ["MSFT"]),
+            ]:
+                frame = provider.financial_data(
+                    symbols, STATEMENT_TYPES[data_type], frequency
+                )
+                series = project(frame, STATEMENT_TYPES[data_type])
+                self.series[(data_type, frequency)] = series
+                cache.put_many(data_type, frequency, series)
+            # Statements cached as frames are projected too
+            cache.put_many(
+                "cash_flow", "Annual", {"GOOGL": provider.cash_flow(["GOOGL"])}
+            )
+
+    def test_export(self):
+        manifest = asyncio.run(export_snapshot(self.test_db, self.directory))
+        snapshot = Snapshot(self.directory)
+        self.assertEqual(list(snapshot.symbols), ["AAPL", "GOOGL", "MSFT", "TSLA"])
+        self.assertEqual(snapshot.manifest, json.loads(json.dumps(manifest)))
+
+        roe = snapshot.metric("roe")
+        self.assertIsInstance(roe, np.memmap)
+        self.assertEqual(roe[snapshot.position("MSFT")], 0.25)
+        self.assertTrue(math.isnan(roe[snapshot.position("TSLA")]))
+        self.assertEqual(list(snapshot.metric("market")), ["", "", "NasdaqGS", ""])
+        self.assertEqual(list(snapshot.metric("low_debt"))[2], 1.0)
+
+        # The metrics match those of the screener's checks
+        frame = snapshot.metrics(["average_fcf", "average_cse", "max_debt_equity"])
+        msft_annual = self.series[("balance_sheet", "Annual")]["MSFT"]
+        msft_quarterly = self.series[("balance_sheet", "Quarterly")]["MSFT"]
+        self.assertTrue(
+            math.isclose(
+                frame.loc["MSFT", "average_cse"],
+                msft_annual.mean("CommonStockEquity"),
+            )
+        )
+        self.assertAlmostEqual(
+            frame.loc["MSFT", "max_debt_equity"], msft_quarterly.max_debt_equity()
+        )
+        self.assertTrue(math.isnan(frame.loc["AAPL", "max_debt_equity"]))
+        self.assertTrue(frame.loc["GOOGL", "average_fcf"] > 0)
+        self.assertTrue(math.isnan(frame.loc["TSLA", "average_fcf"]))
+
+    def test_statement(self):
+        asyncio.run(export_snapshot(self.test_db, self.directory))
+        snapshot = Snapshot(self.directory)
+        statement = snapshot.statement("AAPL", "cash_flow")
+        expected = self.series[("cash_flow", "Annual")]["AAPL"]
+        self.assertEqual(statement.columns, ("FreeCashFlow",))
+        self.assertEqual(list(statement.dates), list(expected.dates))
+        self.assertEqual(
+            list(statement["FreeCashFlow"]), list(expected["FreeCashFlow"])
+        )
+        # Values are views into the mapped file
+        self.assertIsInstance(statement["FreeCashFlow"], np.memmap)
+
+        self.assertEqual(
+            len(snapshot.statement("MSFT", "balance_sheet", "Quarterly")), 5
+        )
+        self.assertIsNone(snapshot.statement("AAPL", "balance_sheet", "Quarterly"))
+        self.assertNotIn("XYZ", snapshot)
+        with self.assertRaises(KeyError):
+            snapshot.statement("XYZ", "cash_flow")
+
+    def test_main_replaces_snapshot(self):
+        main(["--db-path", self.test_db, "-o", self.directory])
+        with FundamentalsCache(self.test_db) as cache:
+            cache.put_many("cash_flow", "Annual", self.series[("cash_flow", "Annual")])
+            cache.put_many(
+                "cash_flow",
+                "Annual",
+                {"NVDA": self.series[("cash_flow", "Annual")]["AAPL"]},
+            )
+        main(["--db-path", self.test_db, "-o", self.directory])
+        self.assertIn("NVDA", Snapshot(self.directory))
+        self.assertFalse(os.path.exists(self.directory + ".tmp"))
+
+    def test_refuses_other_directory(self):
+        os.makedirs(self.directory)
+        notes = os.path.join(self.directory, "notes.txt")
+        with open(notes, "w") as f:
+            f.write("keep me")
+        with self.assertRaises(FileExistsError):
+            asyncio.run(export_snapshot(self.test_db, self.directory))
+        self.assertEqual(main(["--db-path", self.test_db, "-o", self.directory]), 1)
+        self.assertEqual(os.listdir(self.directory), ["notes.txt"])
+        with open(notes) as f:
+            self.assertEqual(f.read(), "keep me")
+        self.assertFalse(os.path.exists(self.directory + ".tmp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
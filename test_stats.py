@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from database import DatabaseManager
+from fundamentals_cache import FundamentalsCache
+from stats import format_stats, stats
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.test_db = os.path.join(tmpdir.name, "stats.db")
+
+        async def populate():
+            async with DatabaseManager(self.test_db) as db:
+                now = datetime.now()
+                await db.insert_data("AAPL", now)
+                await db.insert_data("MSFT", now - timedelta(days=3))
+                await db.insert_result("AAPL", now, 0.25, 0.8, market="NasdaqGS")
+                await db.insert_result("MSFT", now, 0.05, 0.2)
+                await db.finish_run(await db.start_run({}))
+                run_id = await db.start_run({})
+                await db.set_job_state(run_id, "AAPL", "done")
+                await db.set_job_state(run_id, "MSFT", "failed", "ProviderError")
+
+        asyncio.run(populate())
+        with FundamentalsCache(self.test_db) as cache:
+            cache.put_many("price", None, {"AAPL": {"AAPL": {"exchangeName": "X"}}})
+
+    def test_stats(self):
+        summary = asyncio.run(stats(self.test_db))
+        self.assertEqual(summary["symbols"], 2)
+        self.assertEqual(summary["tested_last_day"], 1)
+        self.assertEqual(summary["results"], 2)
+        self.assertEqual(summary["strong_businesses"], 1)
+        self.assertEqual(summary["runs"], 2)
+        self.assertEqual(summary["unfinished_runs"], 1)
+        self.assertEqual(summary["latest_run"]["run_id"], 2)
+        self.assertEqual(summary["latest_run"]["jobs"], {"done": 1, "failed": 1})
+        self.assertEqual(summary["cached_responses"], 1)
+        self.assertGreater(summary["cache_bytes"], 0)
+
+        lines = format_stats(summary)
+        self.assertEqual(lines[0], "Symbols tested: 2 (1 in the last day)")
+        self.assertIn("unfinished, jobs {'done': 1, 'failed': 1}", lines[3])
+
+    def test_empty_database(self):
+        summary = asyncio.run(stats(self.test_db + ".empty"))
+        self.assertEqual(summary["symbols"], 0)
+        self.assertIsNone(summary["latest_run"])
+        self.assertEqual(len(format_stats(summary)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
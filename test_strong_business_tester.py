@@ -1,28 +1,31 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
 import unittest
+from unittest.mock import patch
 
+import pandas as pd
 
-def format_table_markdown(data):
-    if not data:
-        return ""
-
-    # Get headers from the first dictionary
-    headers = list(data[0].keys())
-
-    # Create header row
-    header_row = "| " + " | ".join(headers) + " |"
-
-    # Create separator row
-    separator_row = "| " + " | ".join(["---" for _ in headers]) + " |"
-
-    # Create data rows
-    data_rows = []
-    for row in data:
-        data_rows.append(
-            "| " + " | ".join(str(row[header]) for header in headers) + " |"
-        )
-
-    # Combine all rows
-    return "\n".join([header_row, separator_row] + data_rows)
+import strong_business_tester
+from database import DatabaseManager
+from fundamentals_cache import FundamentalsCache
+from instrumentation import registry
+from providers import MissingData, ProviderError, SyntheticProvider
+from result_sink import read_results
+from strong_business_tester import (
+    PREDICATES,
+    PredicateStats,
+    TickerBatch,
+    fetch_financial_data,
+    format_table_markdown,
+    has_consistently_low_debt_ratios,
+    parse_args,
+    open_run,
+    produce_symbols,
+    screen,
+    shard_of,
+)
 
 
 class TestMarkdownTableFormatting(unittest.TestCase):
@@ -56,5 +59,582 @@ class TestMarkdownTableFormatting(unittest.TestCase):
         self.assertEqual(result, expected)
 
 
+class FakeTicker:
+    """Stand-in for a multi-symbol yahooquery Ticker that counts requests."""
+
+    calls = []
+
+    def __init__(self, symbols, asynchronous=False):
+        self.symbols = symbols
+
+    @property
+    def summary_detail(self):
+        FakeTicker.calls.append("summary_detail")
+        return {
+            symbol: {"fiftyTwoWeekLow": 10, "fiftyTwoWeekHigh": 20}
+            for symbol in self.symbols
+        }
+
+    def get_financial_data(self, types, frequency="a"):
+        FakeTicker.calls.append(("financial_data", frequency))
+        return pd.DataFrame(
+            {
+                "asOfDate": ["2023-12-31", "2022-12-31"] * len(self.symbols),
+                "CommonStockEquity": [100.0, 90.0] * len(self.symbols),
+                "FreeCashFlow": [20.0, 10.0] * len(self.symbols),
+            },
+            index=pd.Index(
+                [symbol for symbol in self.symbols for _ in range(2)], name="symbol"
+            ),
+        )
+
+
+class RecordingProvider(SyntheticProvider):
+    """Synthetic provider that records the requested data types."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.calls = []
+
+    def fetch(self, symbols, data_type, frequency=None):
+        self.calls.append((data_type, frequency))
+        return super().fetch(symbols, data_type, frequency)
+
+    def financial_data(self, symbols, types, frequency="Annual"):
+        self.calls.append((tuple(types), frequency))
+        return super().financial_data(symbols, types, frequency)
+
+
+class TestTickerBatch(unittest.TestCase):
+    def setUp(self):
+        FakeTicker.calls = []
+        patcher = patch("yahooquery.Ticker", FakeTicker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_request_per_data_type(self):
+        batch = TickerBatch(["AAPL", "MSFT"])
+        for symbol in ["AAPL", "MSFT"]:
+            view = batch.view(symbol)
+            self.assertEqual(list(view.summary_detail), [symbol])
+            data = fetch_financial_data(view, "balance_sheet")
+            self.assertEqual(data.symbol, symbol)
+            self.assertEqual(len(data), 2)
+        self.assertEqual(
+            FakeTicker.calls, ["summary_detail", ("financial_data", "Annual")]
+        )
+
+    def test_missing_symbol(self):
+        batch = TickerBatch(["AAPL"])
+        view = batch.view("MSFT")
+        self.assertEqual(view.summary_detail, {})
+        self.assertIsNone(fetch_financial_data(view, "balance_sheet"))
+
+    def test_cache_skips_cached_symbols(self):
+        test_db = "test_strong_business_tester.db"
+        self.addCleanup(os.remove, test_db)
+        with FundamentalsCache(test_db) as cache:
+            TickerBatch(["AAPL"], cache=cache).fetch("balance_sheet", "Annual")
+            FakeTicker.calls = []
+
+            batch = TickerBatch(["AAPL", "MSFT"], cache=cache)
+            data = fetch_financial_data(batch.view("AAPL"), "balance_sheet")
+            self.assertEqual(len(data), 2)
+            self.assertEqual(FakeTicker.calls, [("financial_data", "Annual")])
+            # The annual cash flow was cached by the same combined request
+            self.assertEqual(cache.hits, 2)
+
+            cache.cache_only = True
+            FakeTicker.calls = []
+            batch = TickerBatch(["AAPL", "GOOGL"], cache=cache)
+            self.assertIsNone(
+                fetch_financial_data(batch.view("GOOGL"), "balance_sheet")
+            )
+            self.assertEqual(FakeTicker.calls, [])
+
+    def test_left_out_symbol_is_an_error(self):
+        class PartialProvider(SyntheticProvider):
+            def summary_detail(self, symbols):
+                detail = super().summary_detail(symbols)
+                return {symbol: detail[symbol] for symbol in symbols[:1]}
+
+        batch = TickerBatch(["AAPL", "MSFT"], provider=PartialProvider())
+        view = batch.view("MSFT")
+        self.assertEqual(view.summary_detail, {})
+        self.assertIsInstance(view.error(("summary_detail", None)), MissingData)
+        self.assertIsNone(batch.view("AAPL").error(("summary_detail", None)))
+
+    def test_prefetch_single_flight(self):
+        async def run():
+            batch = TickerBatch(["AAPL", "MSFT"])
+            await asyncio.gather(
+                batch.view("AAPL").prefetch(("summary_detail", None)),
+                batch.view("MSFT").prefetch(("summary_detail", None)),
+            )
+            return batch
+
+        batch = asyncio.run(run())
+        self.assertEqual(list(batch.view("MSFT").summary_detail), ["MSFT"])
+        self.assertEqual(FakeTicker.calls, ["summary_detail"])
+
+    def test_statements_share_one_request_per_frequency(self):
+        provider = RecordingProvider()
+
+        async def run():
+            batch = TickerBatch(["AAPL", "MSFT"], provider=provider)
+            await asyncio.gather(
+                batch.view("AAPL").prefetch(("cash_flow", "Annual")),
+                batch.view("MSFT").prefetch(("balance_sheet", "Annual")),
+                batch.view("MSFT").prefetch(("balance_sheet", "Quarterly")),
+            )
+            return batch
+
+        batch = asyncio.run(run())
+        self.assertEqual(
+            provider.calls,
+            [
+                (("FreeCashFlow", "CommonStockEquity", "TotalDebt"), "Annual"),
+                (("CommonStockEquity", "TotalDebt"), "Quarterly"),
+            ],
+        )
+        # Each statement only has its own fields
+        cash_flow = batch.view("AAPL").cash_flow()
+        self.assertIn("FreeCashFlow", cash_flow.columns)
+        self.assertNotIn("TotalDebt", cash_flow.columns)
+        self.assertEqual(batch.view("MSFT").balance_sheet().symbol, "MSFT")
+
+
+class QuarterlyTicker:
+    symbols = ["AAPL"]
+
+    def __init__(self, debt):
+        self.data = pd.DataFrame(
+            {
+                "asOfDate": ["Q1", "Q2"],
+                "TotalDebt": debt,
+                "CommonStockEquity": [100.0, 100.0],
+            },
+            index=pd.Index(["AAPL", "AAPL"], name="symbol"),
+        )
+
+    def balance_sheet(self, frequency="a"):
+        return self.data
+
+
+class TestDebtRatios(unittest.TestCase):
+    def test_low_debt(self):
+        ticker = QuarterlyTicker([10.0, float("nan")])
+        self.assertTrue(has_consistently_low_debt_ratios(ticker, verbose=False))
+        # The response is not modified
+        self.assertNotIn("DebtEquityRatio", ticker.data.columns)
+
+    def test_high_debt(self):
+        ticker = QuarterlyTicker([10.0, 40.0])
+        self.assertFalse(has_consistently_low_debt_ratios(ticker, verbose=True))
+
+
+class TestPredicateOrder(unittest.TestCase):
+    def test_default_order(self):
+        stats = PredicateStats()
+        self.assertEqual(stats.order(PREDICATES), list(PREDICATES))
+
+    def test_cheap_selective_predicates_first(self):
+        stats = PredicateStats()
+        for _ in range(10):
+            stats.record("volatility", 0.1, True)
+            stats.record("debt", 0.01, False)
+        self.assertEqual(stats.order(["volatility", "debt"]), ["debt", "volatility"])
+        # Loaded data costs nothing
+        self.assertEqual(
+            stats.order(["volatility", "debt"], loaded=["volatility"]),
+            ["volatility", "debt"],
+        )
+        # Unseen predicates cost the average of the observed ones
+        self.assertAlmostEqual(stats.cost("roe"), 0.055)
+        self.assertEqual(stats.rejection_rate("roe"), 0.5)
+
+    def test_screen_follows_observed_order(self):
+        stats = PredicateStats()
+        for _ in range(10):
+            stats.record("debt", 0.001, False)
+
+        async def run():
+            async with DatabaseManager(self.test_db) as db:
+                return await strong_business_tester.test_strong_buy(
+                    "AAPL",
+                    0.17,
+                    0.7,
+                    False,
+                    db,
+                    provider=provider,
+                    predicate_stats=stats,
+                )
+
+        self.test_db = "test_predicate_order.db"
+        self.addCleanup(os.remove, self.test_db)
+        # A high debt ratio for every symbol
+        provider = RecordingProvider()
+        provider._profile = lambda symbol, profile=provider._profile: {
+            **profile(symbol),
+            "debt_ratio": 10.0,
+        }
+        self.assertIsNone(asyncio.run(run()))
+        # Rejected by the debt check alone, without a price request
+        self.assertEqual(
+            provider.calls, [(("CommonStockEquity", "TotalDebt"), "Quarterly")]
+        )
+        self.assertEqual(stats.evaluations["debt"], 11)
+
+
+def write_symbols(path, symbols):
+    with open(path, "w") as f:
+        f.write("Symbol,Market Cap\n")
+        f.writelines(f"{symbol},$1B\n" for symbol in symbols)
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tmpdir = tmpdir.name
+
+    def test_produce_symbols_deduplicates(self):
+        first = os.path.join(self.tmpdir, "first.csv")
+        second = os.path.join(self.tmpdir, "second.csv")
+        write_symbols(first, ["AAPL", "MSFT", "AAPL"])
+        write_symbols(second, ["MSFT", " GOOGL "])
+
+        async def run():
+            queue = asyncio.Queue(maxsize=2)
+            symbols = []
+
+            async def consume():
+                while (symbol := await queue.get()) is not None:
+                    symbols.append(symbol)
+
+            # The bounded queue makes the producer wait for the consumer
+            await asyncio.gather(produce_symbols([first, second], queue, 1), consume())
+            return symbols
+
+        self.assertEqual(asyncio.run(run()), ["AAPL", "MSFT", "GOOGL"])
+
+    def test_produce_symbols_prescreens(self):
+        path = os.path.join(self.tmpdir, "universe.csv")
+        with open(path, "w") as f:
+            f.write('"Symbol","Market Capitalization"\n')
+            f.write('"ABEV","$9B (Mid)"\n"NA","$850M (Micro)"\n')
+
+        async def run(filters):
+            queue = asyncio.Queue()
+            await produce_symbols([path], queue, 1, filters=filters)
+            return [queue.get_nowait() for _ in range(queue.qsize())][:-1]
+
+        self.assertEqual(asyncio.run(run(None)), ["ABEV", "NA"])
+        self.assertEqual(asyncio.run(run({"min_market_cap": 1e9})), ["ABEV"])
+        args = parse_args(["--min-market-cap", "2B", "--market-cap-bucket", "Mid"])
+        self.assertEqual(args.min_market_cap, 2e9)
+        self.assertEqual(args.market_cap_bucket, ["mid"])
+
+    def test_screen_skips_processed_symbols(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(120)])
+        args = parse_args(
+            [
+                "-c",
+                csv_file,
+                "--provider",
+                "synthetic",
+                "--db-path",
+                os.path.join(self.tmpdir, "screen.db"),
+                "--rate-limit",
+                "0",
+                "--batch-size",
+                "25",
+                "--concurrent-chunks",
+                "3",
+            ]
+        )
+        first = asyncio.run(screen(args))
+        self.assertTrue(first)
+        self.assertEqual(len({result["Symbol"] for result in first}), len(first))
+        # Every symbol was marked as processed by the first run
+        self.assertEqual(asyncio.run(screen(args)), [])
+
+    def test_screen_stores_metrics(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        db_path = os.path.join(self.tmpdir, "screen.db")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(40)])
+        argv = ["-c", csv_file, "--provider", "synthetic", "--rate-limit", "0"]
+
+        async def stored_results(extra):
+            args = parse_args(argv + ["--db-path", db_path] + extra)
+            strong_businesses = await screen(args)
+            async with DatabaseManager(db_path) as db:
+                return strong_businesses, await db.read_results()
+
+        strong_businesses, rows = asyncio.run(stored_results([]))
+        self.assertEqual(len(rows), 40)
+        # Symbols rejected for volatility have no ROE
+        self.assertTrue(any(row[1] is None for row in rows))
+        passing = {row[0] for row in rows if row[5] is not None}
+        self.assertEqual(passing, {result["Symbol"] for result in strong_businesses})
+
+        os.remove(db_path)
+        _, rows = asyncio.run(stored_results(["--evaluate-all"]))
+        self.assertTrue(all(row[1] is not None for row in rows))
+
+    def test_screen_realized_volatility(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(60)])
+        args = parse_args(
+            [
+                "-c",
+                csv_file,
+                "--provider",
+                "synthetic",
+                "--db-path",
+                os.path.join(self.tmpdir, "screen.db"),
+                "--rate-limit",
+                "0",
+                "--batch-size",
+                "30",
+                "--concurrent-chunks",
+                "1",
+                "--volatility-mode",
+                "realized",
+            ]
+        )
+        self.assertEqual(args.volatility_threshold, 0.35)
+        registry.reset()
+        strong_businesses = asyncio.run(screen(args))
+        self.assertTrue(strong_businesses)
+        for result in strong_businesses:
+            self.assertGreaterEqual(result["Realized Volatility"], 35)
+            self.assertGreater(result["Max Drawdown"], 0)
+            self.assertLess(result["52-week Low"], result["52-week High"])
+
+        async def stored_results():
+            async with DatabaseManager(args.db_path) as db:
+                return await db.read_results()
+
+        # The realized metrics are stored next to the 52-week range
+        stored = {row[0]: row for row in asyncio.run(stored_results())}
+        self.assertEqual(len(stored), 60)
+        for result in strong_businesses:
+            row = stored[result["Symbol"]]
+            self.assertEqual(round(row[7] * 100, 2), result["Realized Volatility"])
+            self.assertEqual(round(row[8] * 100, 2), result["Max Drawdown"])
+            self.assertEqual(round(row[2] * 100, 2), result["Volatility"])
+        # One history request per chunk replaces the summary details
+        timers = registry.snapshot()["timers"]
+        self.assertEqual(timers["fetch_history"]["count"], 2)
+        self.assertNotIn("fetch_summary_detail", timers)
+
+    def test_sharded_screen(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        symbols = [f"S{i:03d}" for i in range(60)]
+        write_symbols(csv_file, symbols)
+        shards = {shard_of(symbol, 2) for symbol in symbols}
+        self.assertEqual(shards, {0, 1})
+
+        argv = ["-c", csv_file, "--provider", "synthetic", "--rate-limit", "0"]
+        single = asyncio.run(
+            screen(parse_args(argv + ["--db-path", os.path.join(self.tmpdir, "a.db")]))
+        )
+        output = os.path.join(self.tmpdir, "results.csv")
+        sharded = asyncio.run(
+            screen(
+                parse_args(
+                    argv
+                    + ["--db-path", os.path.join(self.tmpdir, "b.db")]
+                    + ["--workers", "2", "--output", output]
+                )
+            )
+        )
+        self.assertEqual(sharded, single)
+        self.assertCountEqual(read_results(output), single)
+
+    def test_workers_cannot_share_stdin(self):
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parse_args(["-c", "-", "--workers", "2"])
+
+    def test_failed_symbols_are_retried_not_marked(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        db_path = os.path.join(self.tmpdir, "screen.db")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(10)])
+        argv = ["-c", csv_file, "--db-path", db_path, "--retry-backoff", "0"]
+        # No request-level retries, so every failure reaches the chunk
+        argv += ["--retries", "0"]
+
+        class FlakyProvider(SyntheticProvider):
+            failures = 0
+
+            def _request(self):
+                if self.failures:
+                    self.failures -= 1
+                    raise ProviderError("Injected")
+                super()._request()
+
+        async def run(provider, extra=()):
+            args = parse_args(argv + list(extra))
+            strong_businesses = await screen(args, provider=provider)
+            async with DatabaseManager(db_path) as db:
+                run_id = (await db.unfinished_run() or [None])[0]
+                return strong_businesses, await db.read_data(), run_id
+
+        # Every attempt fails: nothing is marked as processed
+        provider = FlakyProvider()
+        provider.failures = 3
+        _, rows, _ = asyncio.run(run(provider))
+        self.assertEqual(rows, [])
+
+        # The first attempt fails, the retry succeeds
+        provider = FlakyProvider()
+        provider.failures = 1
+        _, rows, run_id = asyncio.run(run(provider))
+        self.assertEqual(len(rows), 10)
+        self.assertIsNone(run_id)
+
+    def test_cache_only_rescreen(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        db_path = os.path.join(self.tmpdir, "screen.db")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(20)])
+        argv = ["-c", csv_file, "--db-path", db_path, "--volatility-threshold", "0"]
+
+        async def run(extra):
+            provider = RecordingProvider()
+            args = parse_args(argv + extra)
+            strong_businesses = await screen(args, provider=provider)
+            async with DatabaseManager(db_path) as db:
+                rows = await db.read_data()
+                results = await db.read_results()
+            return strong_businesses, rows, results, provider.calls
+
+        # A cold cache leaves every symbol unprocessed instead of rejected
+        strong_businesses, rows, results, calls = asyncio.run(run(["--cache-only"]))
+        self.assertEqual((strong_businesses, rows, results, calls), ([], [], [], []))
+
+        warm, rows, _, _ = asyncio.run(run(["--evaluate-all"]))
+        self.assertEqual(len(rows), 20)
+        # Offline, the symbols processed just now are screened again
+        strict, rows, _, calls = asyncio.run(
+            run(["--cache-only", "--roe-threshold", "0.2"])
+        )
+        self.assertEqual(calls, [])
+        self.assertEqual(
+            {result["Symbol"] for result in strict},
+            {result["Symbol"] for result in warm if result["ROE"] > 20},
+        )
+        self.assertEqual(parse_args(["--cache-only"]).process_interval, 0)
+        self.assertEqual(parse_args([]).process_interval, 180)
+
+    def test_resume_continues_unfinished_run(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        db_path = os.path.join(self.tmpdir, "screen.db")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(10)])
+
+        async def interrupted_run():
+            args = parse_args(["-c", csv_file, "--volatility-threshold", "0"])
+            async with DatabaseManager(db_path) as db:
+                args = await open_run(args, db)
+                await db.set_job_state(args.run_id, "S000", "in_flight")
+            return args.run_id
+
+        run_id = asyncio.run(interrupted_run())
+        args = parse_args(
+            ["-c", "missing.csv", "--db-path", db_path, "--resume"]
+            + ["--provider", "synthetic", "--rate-limit", "0"]
+        )
+
+        async def resume():
+            await screen(args)
+            async with DatabaseManager(db_path) as db:
+                return await db.read_jobs(run_id), await db.unfinished_run()
+
+        jobs, unfinished = asyncio.run(resume())
+        # The input file of the interrupted run was used
+        self.assertEqual(len(jobs), 10)
+        self.assertEqual({state for _, state, _, _ in jobs}, {"done"})
+        self.assertEqual(dict((job[0], job[2]) for job in jobs)["S000"], 2)
+        self.assertIsNone(unfinished)
+
+    def test_resume_skips_done_symbols(self):
+        """Test that a resumed run only screens its unfinished symbols, even
+        when every symbol is due again"""
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        db_path = os.path.join(self.tmpdir, "screen.db")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(10)])
+        argv = ["-c", csv_file, "--db-path", db_path, "--provider", "synthetic"]
+        argv += ["--rate-limit", "0", "--process-interval", "0"]
+        asyncio.run(screen(parse_args(argv)))
+
+        # As if the run had crashed before two of its symbols were done
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE runs SET finished_at = NULL")
+        conn.execute("UPDATE jobs SET state = 'failed' WHERE symbol = 'S001'")
+        conn.execute("UPDATE jobs SET state = 'pending' WHERE symbol = 'S002'")
+        conn.commit()
+        conn.close()
+
+        async def resume():
+            await screen(parse_args(argv + ["--resume"]))
+            async with DatabaseManager(db_path) as db:
+                return await db.read_jobs(1)
+
+        registry.reset()
+        jobs = asyncio.run(resume())
+        self.assertEqual(registry.counters["already_processed"], 8)
+        attempts = {symbol: attempts for symbol, _, attempts, _ in jobs}
+        self.assertEqual(
+            {symbol for symbol, n in attempts.items() if n == 2}, {"S001", "S002"}
+        )
+        self.assertEqual({state for _, state, _, _ in jobs}, {"done"})
+
+    def test_screen_streams_results_to_output(self):
+        csv_file = os.path.join(self.tmpdir, "universe.csv")
+        output = os.path.join(self.tmpdir, "results.jsonl")
+        write_symbols(csv_file, [f"S{i:03d}" for i in range(60)])
+        args = parse_args(
+            [
+                "-c",
+                csv_file,
+                "--provider",
+                "synthetic",
+                "--db-path",
+                os.path.join(self.tmpdir, "screen.db"),
+                "--rate-limit",
+                "0",
+                "--output",
+                output,
+            ]
+        )
+        results = asyncio.run(screen(args))
+        self.assertTrue(results)
+        self.assertCountEqual(read_results(output), results)
+        self.assertEqual(
+            [result["ROE"] for result in results],
+            sorted((result["ROE"] for result in results), reverse=True),
+        )
+
+    def test_report_holds_only_this_run(self):
+        """Test that screening two universes into one output reports each
+        run's results only, while the output keeps both"""
+        for name in ["results.jsonl", "results.csv"]:
+            output = os.path.join(self.tmpdir, name)
+            reports = []
+            for prefix in ["S", "T"]:
+                csv_file = os.path.join(self.tmpdir, f"{prefix}.csv")
+                write_symbols(csv_file, [f"{prefix}{i:03d}" for i in range(60)])
+                argv = ["-c", csv_file, "--provider", "synthetic"]
+                argv += ["--db-path", os.path.join(self.tmpdir, f"{name}.db")]
+                argv += ["--rate-limit", "0", "--output", output]
+                reports.append(asyncio.run(screen(parse_args(argv))))
+            for prefix, results in zip("ST", reports):
+                self.assertTrue(results)
+                self.assertEqual({result["Symbol"][0] for result in results}, {prefix})
+                self.assertNotIn("Run", results[0])
+            self.assertEqual(len(read_results(output)), sum(map(len, reports)))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import unittest
+from datetime import datetime
+
+from database import DatabaseManager
+from sweep import format_grid, parse_args, sweep, thresholds
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.test_db = "test_sweep.db"
+
+        async def populate():
+            async with DatabaseManager(self.test_db) as db:
+                now = datetime.now()
+                await db.insert_result("AAPL", now, 0.25, 0.8, low_debt=True)
+                await db.insert_result("MSFT", now, 0.15, 0.5, low_debt=True)
+                await db.insert_result("DEBT", now, 0.3, 0.9, low_debt=False)
+                await db.insert_result("FLAT", now, volatility=0.1)
+                await db.insert_result(
+                    "CALM", now, 0.2, 0.9, low_debt=True, realized_volatility=0.2
+                )
+
+        asyncio.run(populate())
+
+    def tearDown(self):
+        for path in [self.test_db, self.test_db + "-wal", self.test_db + "-shm"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_thresholds(self):
+        self.assertEqual(thresholds((0.1, 0.3), 3).round(2).tolist(), [0.1, 0.2, 0.3])
+        self.assertEqual(thresholds((0.2, 0.2), 5).tolist(), [0.2])
+
+    def test_sweep_grid(self):
+        roe_thresholds, volatility_thresholds, grid, matches = asyncio.run(
+            sweep(self.test_db, (0.1, 0.2), (0.5, 0.8), steps=2, list_symbols=True)
+        )
+        self.assertEqual(grid.tolist(), [[3, 2], [1, 1]])
+        self.assertEqual(matches, [("MSFT", 0.15, 0.5)])
+
+    def test_sweep_realized(self):
+        _, _, grid, matches = asyncio.run(
+            sweep(
+                self.test_db,
+                (0.1, 0.2),
+                (0.1, 0.5),
+                steps=2,
+                list_symbols=True,
+                volatility_mode="realized",
+            )
+        )
+        # Only CALM has a stored realized volatility
+        self.assertEqual(grid.tolist(), [[1, 0], [0, 0]])
+        self.assertEqual(matches, [("CALM", 0.2, 0.2)])
+
+    def test_sweep_ignore_debt(self):
+        _, _, grid, _ = asyncio.run(
+            sweep(self.test_db, (0.1, 0.2), (0.5, 0.8), steps=2, ignore_debt=True)
+        )
+        self.assertEqual(grid.tolist(), [[4, 3], [2, 2]])
+
+    def test_format_grid(self):
+        self.assertEqual(
+            format_grid([[2, 1]], [0.1], [0.5, 0.8]),
+            "| ROE \\ Volatility | 50% | 80% |\n| --- | --- | --- |\n| 10% | 2 | 1 |",
+        )
+
+    def test_parse_args(self):
+        args = parse_args(["--roe-range", "0.15", "0.25", "--steps", "3"])
+        self.assertEqual(args.roe_range, [0.15, 0.25])
+        self.assertEqual(args.volatility_range, [0.3, 1.0])
+        self.assertEqual(args.volatility_mode, "range")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from providers import ProviderError
+from resilience import CircuitBreaker, RequestPolicy
+from scheduler import TokenBucket
+from strong_business_tester import (
+    TickerBatch,
+    is_volatile,
+    make_provider,
+    parse_args,
+    screen,
+)
+from yahoo_http import YahooHttpProvider
+
+# Canned Yahoo responses, replayed by the stand-in server
+SUMMARY_DETAIL = {
+    "AAPL": {"maxAge": 1, "fiftyTwoWeekLow": 164.08, "fiftyTwoWeekHigh": 237.49},
+    "F": {"maxAge": 1, "fiftyTwoWeekLow": 9.49, "fiftyTwoWeekHigh": 14.85},
+}
+PRICE = {
+    "AAPL": {"maxAge": 1, "symbol": "AAPL", "exchangeName": "NasdaqGS"},
+    "F": {"maxAge": 1, "symbol": "F", "exchangeName": "NYSE"},
+}
+TIMESERIES = {
+    "annualFreeCashFlow": [
+        ("2022-09-30", "12M", 111443000000),
+        ("2023-09-30", "12M", 99584000000),
+    ],
+    "trailingFreeCashFlow": [("2024-06-30", "TTM", 105000000000)],
+    "annualCommonStockEquity": [
+        ("2022-09-30", "12M", 50672000000),
+        ("2023-09-30", "12M", 62146000000),
+    ],
+    "quarterlyCommonStockEquity": [("2024-03-31", "3M", 74194000000)],
+    "quarterlyTotalDebt": [("2024-03-31", "3M", 10459000000)],
+}
+
+# Daily closes of 2024-01-02 to 2024-01-05, one of them missing
+CLOSES = {"AAPL": [185.64, 184.25, None, 181.18], "F": [11.67, 11.79, 11.94, 11.93]}
+
+
+def quote_summary(symbol, modules):
+    if symbol not in SUMMARY_DETAIL:
+        return 404, {
+            "quoteSummary": {
+                "result": None,
+                "error": {
+                    "code": "Not Found",
+                    "description": f"Quote not found for ticker symbol: {symbol}",
+                },
+            }
+        }
+    canned = {"summaryDetail": SUMMARY_DETAIL, "price": PRICE}
+    result = {module: canned[module][symbol] for module in modules.split(",")}
+    return 200, {"quoteSummary": {"result": [result], "error": None}}
+
+
+def timeseries(symbol, types):
+    results = []
+    for name in types.split(","):
+        points = TIMESERIES.get(name) if symbol in SUMMARY_DETAIL else None
+        result = {"meta": {"symbol": [symbol], "type": [name]}}
+        if points:
+            result[name] = [None] + [
+                {
+                    "asOfDate": date,
+                    "periodType": period,
+                    "currencyCode": "USD",
+                    "reportedValue": {"raw": value, "fmt": f"{value / 1e9:.2f}B"},
+                }
+                for date, period, value in points
+            ]
+        results.append(result)
+    return 200, {"timeseries": {"result": results, "error": None}}
+
+
+def chart(symbol):
+    if symbol not in CLOSES:
+        return 404, {
+            "chart": {
+                "result": None,
+                "error": {
+                    "code": "Not Found",
+                    "description": "No data found, symbol may be delisted",
+                },
+            }
+        }
+    closes = CLOSES[symbol]
+    quote = {"close": closes, "volume": [1000] * len(closes)}
+    for column in ("open", "high", "low"):
+        quote[column] = closes
+    result = {
+        "meta": {"symbol": symbol},
+        # 14:30 UTC, the open of each trading day
+        "timestamp": [1704205800 + day * 86400 for day in range(len(closes))],
+        "indicators": {"quote": [quote], "adjclose": [{"adjclose": closes}]},
+    }
+    return 200, {"chart": {"result": [result], "error": None}}
+
+
+class StandInYahoo:
+    """Local HTTP server replaying canned Yahoo responses, gzip compressed."""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.crumbs = 0
+        self.fail = False
+        # Number of requests still to fail before the server recovers
+        self.failures = 0
+        app = web.Application()
+        app.router.add_get("/cookie", self.cookie)
+        app.router.add_get("/v1/test/getcrumb", self.crumb)
+        app.router.add_get("/v10/finance/quoteSummary/{symbol}", self.quote_summary)
+        app.router.add_get(
+            "/ws/fundamentals-timeseries/v1/finance/timeseries/{symbol}",
+            self.timeseries,
+        )
+        app.router.add_get("/v8/finance/chart/{symbol}", self.chart)
+        self.server = TestServer(app, host="localhost")
+
+    async def cookie(self, request):
+        response = web.Response(status=404, text="Not found")
+        response.set_cookie("A3", "session")
+        return response
+
+    async def crumb(self, request):
+        if request.cookies.get("A3") != "session":
+            return web.Response(status=401)
+        self.crumbs += 1
+        return web.Response(text="crumb")
+
+    def _reply(self, request, handler, *args):
+        self.requests.append(request.path)
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if self.fail:
+            return web.Response(status=503)
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=503)
+        if request.query.get("crumb") != "crumb":
+            return web.Response(status=401)
+        status, body = handler(*args)
+        if "gzip" not in request.headers.get("Accept-Encoding", ""):
+            return web.json_response(body, status=status)
+        return web.Response(
+            status=status,
+            body=gzip.compress(json.dumps(body).encode()),
+            content_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    async def quote_summary(self, request):
+        return self._reply(
+            request,
+            quote_summary,
+            request.match_info["symbol"],
+            request.query["modules"],
+        )
+
+    async def chart(self, request):
+        return self._reply(request, chart, request.match_info["symbol"])
+
+    async def timeseries(self, request):
+        return self._reply(
+            request, timeseries, request.match_info["symbol"], request.query["type"]
+        )
+
+
+class TestYahooHttpProvider(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.yahoo = StandInYahoo()
+        await self.yahoo.server.start_server()
+        self.addAsyncCleanup(self.yahoo.server.close)
+        base_url = str(self.yahoo.server.make_url(""))
+        self.provider = YahooHttpProvider(
+            base_url=base_url,
+            cookie_url=base_url + "/cookie",
+            connections_per_host=2,
+            timeout=5,
+        )
+        self.addAsyncCleanup(self.provider.aclose)
+
+    async def test_quotes(self):
+        """Test that quote modules look like yahooquery's, errors included"""
+        detail = await self.provider.summary_detail(["AAPL", "XYZ"])
+        self.assertEqual(
+            detail["AAPL"], {"fiftyTwoWeekLow": 164.08, "fiftyTwoWeekHigh": 237.49}
+        )
+        self.assertEqual(detail["XYZ"], "Quote not found for ticker symbol: XYZ")
+        price = await self.provider.fetch(["F"], "price")
+        self.assertEqual(price["F"]["exchangeName"], "NYSE")
+        # The cookie and crumb are set up once for the session
+        self.assertEqual(self.yahoo.crumbs, 1)
+
+    async def test_financial_data(self):
+        """Test that time series become a long-format frame indexed by symbol"""
+        annual = await self.provider.financial_data(
+            ["AAPL", "XYZ"], ["FreeCashFlow", "CommonStockEquity"]
+        )
+        self.assertEqual(annual.index.name, "symbol")
+        self.assertEqual(list(annual.index.unique()), ["AAPL"])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(annual["asOfDate"]))
+        self.assertEqual(list(annual["periodType"]), ["12M", "12M", "TTM"])
+        self.assertEqual(annual["CommonStockEquity"].iloc[1], 62146000000)
+        self.assertTrue(pd.isna(annual["CommonStockEquity"].iloc[2]))
+
+        quarterly = await self.provider.balance_sheet(["AAPL"], "Quarterly")
+        self.assertEqual(len(quarterly), 1)
+        self.assertEqual(quarterly["TotalDebt"].iloc[0], 10459000000)
+        self.assertEqual(
+            await self.provider.cash_flow(["XYZ"]), "Data unavailable for XYZ"
+        )
+
+    async def test_history(self):
+        """Test that charts become daily history indexed by symbol and date"""
+        history = await self.provider.history(["AAPL", "F", "XYZ"])
+        self.assertEqual(history.index.names, ["symbol", "date"])
+        self.assertEqual(list(history.index.unique(level=0)), ["AAPL", "F"])
+        self.assertEqual(
+            list(history.loc["F"].index), list(pd.date_range("2024-01-02", periods=4))
+        )
+        self.assertTrue(pd.isna(history.loc[("AAPL", "2024-01-04"), "close"]))
+        self.assertEqual(history.loc[("F", "2024-01-05"), "adjclose"], 11.93)
+
+        batch = TickerBatch(["AAPL", "F", "XYZ"], provider=self.provider)
+        await batch.prefetch("history")
+        realized = batch.realized_metrics()
+        self.assertAlmostEqual(realized.loc["AAPL", "low"], 181.18)
+        self.assertTrue(pd.isna(realized.loc["XYZ", "volatility"]))
+
+    async def test_connections_are_pooled(self):
+        """Test that many requests share the kept-alive connections"""
+        symbols = ["AAPL", "F"] * 10
+        await self.provider.summary_detail(symbols)
+        await self.provider.price(symbols)
+        self.assertEqual(len(self.yahoo.requests), 40)
+        self.assertLessEqual(len(self.yahoo.connections), 2)
+
+    async def test_server_error(self):
+        self.yahoo.fail = True
+        with self.assertRaises(ProviderError):
+            await self.provider.summary_detail(["AAPL"])
+
+    async def test_request_policy(self):
+        """Test that every HTTP request is rate limited and retried on its own"""
+        self.provider.policy = RequestPolicy(
+            limiter=TokenBucket(50, 1), retries=2, backoff=0.01
+        )
+        self.yahoo.failures = 2
+        start = time.monotonic()
+        detail = await self.provider.summary_detail(["AAPL", "F", "XYZ"])
+        self.assertEqual(detail["F"]["fiftyTwoWeekLow"], 9.49)
+        # Three requests and two retries took a token each, one per 20 ms
+        self.assertEqual(len(self.yahoo.requests), 5)
+        self.assertGreaterEqual(time.monotonic() - start, 0.07)
+        self.assertEqual(self.provider.policy.retried, 2)
+
+        args = parse_args(["--provider", "yahoo-http", "--rate-limit", "4"])
+        provider = make_provider(args)
+        self.assertEqual(provider.policy.limiter.rate, 4)
+        self.assertEqual(provider.policy.retries, args.retries)
+
+    async def test_breaker(self):
+        """Test that failing HTTP requests open the breaker, which pauses requests"""
+        breaker = CircuitBreaker(threshold=1.0, window=2, min_calls=2, cooldown=0.2)
+        self.provider.policy = RequestPolicy(retries=0, breaker=breaker)
+        self.yahoo.fail = True
+        for _ in range(2):
+            with self.assertRaises(ProviderError):
+                await self.provider.price(["AAPL"])
+        self.assertEqual(breaker.state, "open")
+
+        self.yahoo.fail = False
+        start = time.monotonic()
+        self.assertIn("AAPL", await self.provider.price(["AAPL"]))
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(breaker.state, "closed")
+
+    async def test_ticker_batch(self):
+        """Test that a batch awaits the provider and serves the usual views"""
+        batch = TickerBatch(["AAPL", "F", "XYZ"], provider=self.provider)
+        view = batch.view("AAPL")
+        volatile, volatility, low, high = await is_volatile(view, "AAPL", 0.4)
+        self.assertTrue(volatile)
+        self.assertEqual((low, high), (164.08, 237.49))
+        self.assertFalse((await is_volatile(batch.view("XYZ"), "XYZ"))[0])
+
+        await view.prefetch(("cash_flow", "Annual"))
+        # The planned balance sheet came with the same request per symbol
+        self.assertTrue(view.loaded(("balance_sheet", "Annual")))
+        self.assertEqual(len(view.cash_flow()), 3)
+        self.assertIsNone(batch.get("XYZ", "cash_flow", "Annual"))
+        with self.assertRaises(RuntimeError):
+            batch.fetch("price")
+
+    async def test_screen(self):
+        """Test a whole screening run over the shared session"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_file = os.path.join(tmpdir, "universe.csv")
+            with open(csv_file, "w") as f:
+                f.write("Symbol\nAAPL\nF\nXYZ\n")
+            args = parse_args(
+                [
+                    "-c",
+                    csv_file,
+                    "--provider",
+                    "yahoo-http",
+                    "--db-path",
+                    os.path.join(tmpdir, "screen.db"),
+                    "--rate-limit",
+                    "0",
+                    "--volatility-threshold",
+                    "0.5",
+                ]
+            )
+            results = await screen(args, provider=self.provider)
+        self.assertEqual([result["Symbol"] for result in results], ["F"])
+        self.assertEqual(results[0]["Market"], "NYSE")
+        self.assertTrue(self.provider._session.closed)
+        self.assertEqual(self.yahoo.crumbs, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+import asyncio
+import re
+import time
+
+import aiohttp
+import pandas as pd
+
+from providers import STATEMENT_TYPES, DataProvider, ProviderError
+
+BASE_URL = "https://query2.finance.yahoo.com"
+# Sets the cookie Yahoo expects along with the crumb
+COOKIE_URL = "https://fc.yahoo.com"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+}
+QUOTE_SUMMARY_PATH = "/v10/finance/quoteSummary/{symbol}"
+TIMESERIES_PATH = "/ws/fundamentals-timeseries/v1/finance/timeseries/{symbol}"
+CHART_PATH = "/v8/finance/chart/{symbol}"
+# Start of the fundamentals time series, as requested by yahooquery
+PERIOD_START = 493590046
+SERIES_PREFIX = re.compile(r"^(annual|quarterly|trailing)")
+
+
+class YahooHttpProvider(DataProvider):
+    """
+    Data from Yahoo Finance over one pooled aiohttp session.
+
+    Unlike YahooProvider, every method is a coroutine, awaited directly on the
+    event loop. The session lives until ``aclose``: connections are kept
+    alive, at most ``connections_per_host`` are open to each host, responses
+    are decompressed and the cookie and crumb are set up only once. Quote
+    modules, fundamentals and price history are requested per symbol,
+    concurrently, over the shared connections.
+
+    A resilience.RequestPolicy given as ``policy`` rate limits, retries and
+    hedges each of those requests, and its circuit breaker sees every one.
+    """
+
+    is_async = True
+
+    def __init__(
+        self,
+        base_url=BASE_URL,
+        cookie_url=COOKIE_URL,
+        connections_per_host=8,
+        timeout=30.0,
+        policy=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.cookie_url = cookie_url
+        self.connections_per_host = connections_per_host
+        self.timeout = timeout
+        self.policy = policy
+        self.requests = 0
+        self._session = None
+        self._crumb = None
+        self._crumb_lock = asyncio.Lock()
+
+    def session(self):
+        """The shared session, created on first use inside the event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.connections_per_host,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                auto_decompress=True,
+            )
+        return self._session
+
+    async def crumb(self):
+        async with self._crumb_lock:
+            if self._crumb is None:
+                try:
+                    # Only the cookie matters, the page itself is an error
+                    async with self.session().get(self.cookie_url) as response:
+                        await response.read()
+                    async with self.session().get(
+                        self.base_url + "/v1/test/getcrumb"
+                    ) as response:
+                        if response.status != 200:
+                            raise ProviderError(
+                                f"Crumb request failed with HTTP {response.status}"
+                            )
+                        self._crumb = await response.text()
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    raise ProviderError(f"Crumb request failed: {e!r}") from e
+            return self._crumb
+
+    async def _get(self, template, symbol, params):
+        """
+        GET a symbol's Yahoo JSON endpoint, through the request policy if there
+        is one; not found responses are returned too.
+        """
+        path = template.format(symbol=symbol)
+        if self.policy is None:
+            return await self._request(path, params)
+        return await self.policy.call(template, lambda: self._request(path, params))
+
+    async def _request(self, path, params):
+        params = {**params, "crumb": await self.crumb()}
+        self.requests += 1
+        try:
+            async with self.session().get(self.base_url + path, params=params) as r:
+                if r.status == 401:
+                    # The crumb expired, the next request gets a new one
+                    self._crumb = None
+                if r.status not in (200, 404):
+                    raise ProviderError(f"HTTP {r.status} from {path}")
+                return await r.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise ProviderError(f"Request to {path} failed: {e!r}") from e
+
+    async def _quote_module(self, symbols, module):
+        responses = await asyncio.gather(
+            *(
+                self._get(
+                    QUOTE_SUMMARY_PATH,
+                    symbol,
+                    {"modules": module, "formatted": "false"},
+                )
+                for symbol in symbols
+            )
+        )
+        result = {}
+        for symbol, response in zip(symbols, responses):
+            summary = response.get("quoteSummary") or {}
+            if summary.get("result"):
+                data = dict(summary["result"][0].get(module) or {})
+                data.pop("maxAge", None)
+                result[symbol] = data
+            else:
+                error = summary.get("error") or {}
+                result[symbol] = error.get(
+                    "description", f"Quote not found for ticker symbol: {symbol}"
+                )
+        return result
+
+    async def summary_detail(self, symbols):
+        return await self._quote_module(symbols, "summaryDetail")
+
+    async def price(self, symbols):
+        return await self._quote_module(symbols, "price")
+
+    async def cash_flow(self, symbols, frequency="Annual"):
+        return await self.financial_data(
+            symbols, STATEMENT_TYPES["cash_flow"], frequency
+        )
+
+    async def balance_sheet(self, symbols, frequency="Annual"):
+        return await self.financial_data(
+            symbols, STATEMENT_TYPES["balance_sheet"], frequency
+        )
+
+    async def financial_data(self, symbols, types, frequency="Annual"):
+        # Annual requests include the trailing twelve months, like yahooquery
+        prefixes = (
+            ["quarterly"] if frequency[:1].lower() == "q" else ["annual", "trailing"]
+        )
+        series = ",".join(prefix + name for prefix in prefixes for name in types)
+        params = {"type": series, "period1": PERIOD_START, "period2": int(time.time())}
+        responses = await asyncio.gather(
+            *(self._get(TIMESERIES_PATH, symbol, params) for symbol in symbols)
+        )
+        rows = {}
+        for symbol, response in zip(symbols, responses):
+            for result in (response.get("timeseries") or {}).get("result") or []:
+                name = result["meta"]["type"][0]
+                for point in result.get(name) or []:
+                    # Missing periods are padded with nulls
+                    if not point:
+                        continue
+                    row = rows.setdefault(
+                        (symbol, point["asOfDate"], point["periodType"]),
+                        {
+                            "symbol": symbol,
+                            "asOfDate": point["asOfDate"],
+                            "periodType": point["periodType"],
+                            "currencyCode": point.get("currencyCode"),
+                        },
+                    )
+                    row[SERIES_PREFIX.sub("", name)] = point["reportedValue"]["raw"]
+
+        if not rows:
+            return f"Data unavailable for {', '.join(symbols)}"
+        frame = pd.DataFrame(list(rows.values()))
+        frame["asOfDate"] = pd.to_datetime(frame["asOfDate"])
+        return frame.sort_values(["symbol", "asOfDate"], kind="stable").set_index(
+            "symbol"
+        )
+
+    async def history(self, symbols, period="1y", interval="1d"):
+        params = {"range": period, "interval": interval, "events": "div,split"}
+        responses = await asyncio.gather(
+            *(self._get(CHART_PATH, symbol, params) for symbol in symbols)
+        )
+        frames = []
+        for symbol, response in zip(symbols, responses):
+            for result in (response.get("chart") or {}).get("result") or []:
+                if not result.get("timestamp"):
+                    continue
+                quote = result["indicators"]["quote"][0]
+                adjclose = (result["indicators"].get("adjclose") or [{}])[0]
+                dates = pd.to_datetime(result["timestamp"], unit="s").normalize()
+                frames.append(
+                    pd.DataFrame(
+                        {
+                            "symbol": symbol,
+                            **{
+                                column: quote.get(column)
+                                for column in ("open", "high", "low", "close", "volume")
+                            },
+                            "adjclose": adjclose.get("adjclose", quote.get("close")),
+                        },
+                        index=pd.Index(dates, name="date"),
+                    )
+                )
+
+        if not frames:
+            return f"Data unavailable for {', '.join(symbols)}"
+        frame = pd.concat(frames).set_index("symbol", append=True).swaplevel()
+        # Missing prices come as nulls
+        return frame.astype(float)
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        if self._session is not None:
+            await self._session.close()